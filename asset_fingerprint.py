@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting
+Rewrites the image URLs in the travel website's HTML to include a hash of
+the file's content, so browsers can cache images for a year and still
+fetch a new copy the moment a file changes. This replaces a shared
+`?v=<timestamp>` that invalidates every image at once (or none).
+
+Two modes:
+    query   images/a.jpg  ->  images/a.jpg?v=3f2a9c01be
+    rename  images/a.jpg  ->  images/a.3f2a9c01be.jpg (a hard link or copy)
+
+Every reference keeps its own path, even when several files have identical
+content: pointing them all at one file would lose which image each page
+asked for, and a later fix to one of the copies would never show up.
+Identical files are reported so they can be merged by hand. Hashes are
+cached in asset-manifest.json by size and mtime, so unchanged files are
+not re-read.
+Already fingerprinted URLs are mapped back to their source and re-hashed,
+so the tool can be re-run after any edit.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+from atomic_file import write_atomic
+
+TRAVEL_WEBSITE_PATH = os.environ.get('TRAVEL_WEBSITE_PATH', "/Users/fudongli/clawd/travel-website")
+MANIFEST_NAME = 'asset-manifest.json'
+HASH_LENGTH = 10
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg')
+SKIP_DIRS = {'.git', 'node_modules'}
+IMMUTABLE = 'Cache-Control: public, max-age=31536000, immutable'
+
+# name.<hash>.ext as produced by rename mode
+FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.\w+)$' % HASH_LENGTH)
+
+# src/href/poster/data-bg="...", srcset="...", and CSS url(...)
+URL_REFERENCE = re.compile(r"""
+    (?P<attr>\b(?:src|href|poster|data-bg)\s*=\s*)(?P<quote>["'])(?P<url>[^"']*)(?P=quote)
+  | (?P<srcset_attr>\bsrcset\s*=\s*)(?P<srcset_quote>["'])(?P<srcset>[^"']*)(?P=srcset_quote)
+  | (?P<css>url\(\s*)(?P<css_quote>["']?)(?P<css_url>[^"')\s]+)(?P=css_quote)(?P<css_end>\s*\))
+""", re.VERBOSE | re.IGNORECASE)
+
+
+def _split_url(url):
+    """(path, suffix) where suffix is any ?query or #fragment."""
+    cut = min((index for index in (url.find('?'), url.find('#')) if index != -1), default=len(url))
+    return url[:cut], url[cut:]
+
+
+class Fingerprinter:
+    """Hashes referenced images and maps their URLs to fingerprinted ones."""
+
+    def __init__(self, site_root, mode=None, manifest_path=None):
+        """`mode` defaults to the one the manifest was written with, else 'query'."""
+        self.site_root = os.path.realpath(site_root)
+        self.manifest_path = manifest_path or os.path.join(self.site_root, MANIFEST_NAME)
+        self.referenced = set()
+        self.hashed = 0
+        manifest = {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"⚠️ Ignoring unreadable asset manifest: {e}")
+        # site-relative path -> {size, mtime_ns, sha256}
+        self.files = manifest.get('files', {})
+        self.mode = mode or manifest.get('mode', 'query')
+        if self.mode not in ('query', 'rename'):
+            raise ValueError(f"unknown mode {self.mode!r}")
+
+    def digest(self, rel):
+        path = os.path.join(self.site_root, rel)
+        stat = os.stat(path)
+        entry = self.files.get(rel)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self.hashed += 1
+        self.files[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                           'sha256': digest.hexdigest()}
+        return self.files[rel]['sha256']
+
+    def resolve(self, url, base_dir):
+        """Site-relative source path of a local image URL, or None."""
+        path, _ = _split_url(url.strip())
+        if not path or path.startswith(('/', '#')) or ':' in path.split('/')[0]:
+            # Absolute, protocol-relative, data: and http(s): URLs are left alone
+            return None
+        rel = os.path.normpath(os.path.join(base_dir, path)).replace(os.sep, '/')
+        if rel.startswith('../') or not rel.lower().endswith(IMAGE_EXTENSIONS):
+            return None
+        if not os.path.isfile(os.path.join(self.site_root, rel)):
+            directory, name = os.path.split(rel)
+            match = FINGERPRINTED.match(name)
+            if not match:
+                return None
+            rel = '/'.join(filter(None, (directory, match['stem'] + match['ext'])))
+        else:
+            name = os.path.basename(rel)
+            match = FINGERPRINTED.match(name)
+            if match and rel not in self.files:
+                # A rename-mode copy whose source still exists
+                source = '/'.join(filter(None, (os.path.dirname(rel), match['stem'] + match['ext'])))
+                if os.path.isfile(os.path.join(self.site_root, source)):
+                    rel = source
+        return rel if os.path.isfile(os.path.join(self.site_root, rel)) else None
+
+    def scan(self, document, base_dir=''):
+        """First pass: note every image a page references."""
+        for match in URL_REFERENCE.finditer(document):
+            for url in self._urls(match):
+                rel = self.resolve(url, base_dir)
+                if rel is not None:
+                    self.referenced.add(rel)
+                    self.digest(rel)
+
+    def _urls(self, match):
+        if match['url'] is not None:
+            return [match['url']]
+        if match['css_url'] is not None:
+            return [match['css_url']]
+        return [candidate.split()[0] for candidate in match['srcset'].split(',') if candidate.split()]
+
+    def duplicates(self):
+        """Groups (sorted lists) of referenced files with identical content."""
+        by_hash = {}
+        for rel in sorted(self.referenced):
+            by_hash.setdefault(self.files[rel]['sha256'], []).append(rel)
+        return [group for group in by_hash.values() if len(group) > 1]
+
+    def target(self, rel):
+        """Fingerprinted site-relative URL of a file (materialized in rename mode)."""
+        short = self.files[rel]['sha256'][:HASH_LENGTH]
+        if self.mode == 'query':
+            return f"{rel}?v={short}"
+        stem, ext = os.path.splitext(rel)
+        target = f"{stem}.{short}{ext}"
+        target_path = os.path.join(self.site_root, target)
+        if not os.path.exists(target_path):
+            try:
+                os.link(os.path.join(self.site_root, rel), target_path)
+            except OSError:
+                shutil.copy2(os.path.join(self.site_root, rel), target_path)
+        return target
+
+    def rewrite(self, document, base_dir='', targets=None):
+        """Second pass: return (document, references rewritten)."""
+        targets = targets if targets is not None else self.targets()
+        rewritten = 0
+
+        def url_for(url):
+            nonlocal rewritten
+            rel = self.resolve(url, base_dir)
+            if rel is None or rel not in targets:
+                return url
+            new = os.path.relpath(targets[rel], base_dir or '.').replace(os.sep, '/')
+            if new != url:
+                rewritten += 1
+            return new
+
+        def replace(match):
+            if match['url'] is not None:
+                return f"{match['attr']}{match['quote']}{url_for(match['url'])}{match['quote']}"
+            if match['css_url'] is not None:
+                return (f"{match['css']}{match['css_quote']}{url_for(match['css_url'])}"
+                        f"{match['css_quote']}{match['css_end']}")
+            candidates = []
+            for candidate in match['srcset'].split(','):
+                parts = candidate.split()
+                if parts:
+                    candidates.append(' '.join([url_for(parts[0])] + parts[1:]))
+            return f"{match['srcset_attr']}{match['srcset_quote']}{', '.join(candidates)}{match['srcset_quote']}"
+
+        return URL_REFERENCE.sub(replace, document), rewritten
+
+    def targets(self):
+        return {rel: self.target(rel) for rel in self.referenced}
+
+    def save(self):
+        write_atomic(self.manifest_path,
+                     json.dumps({'mode': self.mode, 'files': self.files}, indent=2, sort_keys=True))
+
+
+def find_pages(site_root):
+    pages = []
+    for directory, dirnames, filenames in os.walk(site_root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        pages.extend(os.path.join(directory, name) for name in sorted(filenames)
+                     if name.endswith('.html'))
+    return pages
+
+
+def fingerprint_site(site_root, pages=None, mode=None, dry_run=False):
+    """
+    Fingerprint every image reference in `pages` (default: all HTML under
+    the site). Returns (fingerprinter, {page: references rewritten}).
+    """
+    fingerprinter = Fingerprinter(site_root, mode)
+    pages = pages or find_pages(fingerprinter.site_root)
+    documents = {}
+    for page in pages:
+        with open(page, 'r') as f:
+            documents[page] = f.read()
+        base_dir = os.path.relpath(os.path.dirname(os.path.realpath(page)), fingerprinter.site_root)
+        fingerprinter.scan(documents[page], '' if base_dir == '.' else base_dir)
+
+    if dry_run:
+        return fingerprinter, {}
+    targets = fingerprinter.targets()
+    changes = {}
+    for page, document in documents.items():
+        base_dir = os.path.relpath(os.path.dirname(os.path.realpath(page)), fingerprinter.site_root)
+        new_document, rewritten = fingerprinter.rewrite(document, '' if base_dir == '.' else base_dir,
+                                                        targets)
+        if new_document != document:
+            write_atomic(page, new_document)
+            changes[page] = rewritten
+    fingerprinter.save()
+    return fingerprinter, changes
+
+
+def write_headers(site_root, fingerprinter):
+    """
+    A `_headers` file (Netlify / Cloudflare Pages format) marking the
+    fingerprinted images immutable. Query mode shares URLs paths with the
+    originals, so only rename mode can be marked safely.
+    """
+    targets = sorted(set(fingerprinter.targets().values()))
+    with open(os.path.join(site_root, '_headers'), 'w') as f:
+        for target in targets:
+            f.write(f"/{target}\n  {IMMUTABLE}\n")
+    return len(targets)
+
+
+def prune(site_root, fingerprinter):
+    """Remove rename-mode copies that no current reference points at."""
+    keep = set(fingerprinter.targets().values())
+    removed = 0
+    for directory, dirnames, filenames in os.walk(fingerprinter.site_root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if not FINGERPRINTED.match(name):
+                continue
+            rel = os.path.relpath(os.path.join(directory, name), fingerprinter.site_root).replace(os.sep, '/')
+            match = FINGERPRINTED.match(name)
+            source = os.path.join(directory, match['stem'] + match['ext'])
+            if rel not in keep and os.path.isfile(source):
+                os.remove(os.path.join(directory, name))
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-hash the image URLs in the website HTML')
+    parser.add_argument('pages', nargs='*', help='HTML files (default: every page under --site)')
+    parser.add_argument('--site', default=TRAVEL_WEBSITE_PATH, help='website repository')
+    parser.add_argument('--mode', choices=('query', 'rename'),
+                        help='default: the mode of the last run, else query')
+    parser.add_argument('--headers', action='store_true',
+                        help='write a _headers file marking fingerprinted files immutable (rename mode)')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete unreferenced rename-mode copies (only when scanning every page)')
+    parser.add_argument('--dry-run', action='store_true', help='hash and report, write nothing')
+    args = parser.parse_args()
+
+    fingerprinter, changes = fingerprint_site(args.site, args.pages, args.mode, args.dry_run)
+    duplicates = fingerprinter.duplicates()
+    extra = sum(fingerprinter.files[rel]['size'] for group in duplicates for rel in group[1:])
+    print(f"🔑 {len(fingerprinter.referenced)} image(s) referenced, {fingerprinter.hashed} hashed")
+    if duplicates:
+        print(f"♻️  {len(duplicates)} group(s) of identical files, {extra / 1024:.0f} KB downloaded "
+              f"more than once; point the pages at one copy to share it:")
+        for group in duplicates:
+            print(f"   {' = '.join(group)}")
+    if args.dry_run:
+        print("🔍 Dry run: nothing written")
+        return 0
+    for page, rewritten in sorted(changes.items()):
+        print(f"✅ {os.path.relpath(page, fingerprinter.site_root)}: {rewritten} URL(s) rewritten")
+    if not changes:
+        print("✅ All image URLs already fingerprinted")
+    if args.headers:
+        if fingerprinter.mode != 'rename':
+            print("⚠️ --headers needs --mode rename; query-mode URLs share paths with their sources")
+        else:
+            print(f"📝 _headers: {write_headers(fingerprinter.site_root, fingerprinter)} immutable file(s)")
+    if args.prune and fingerprinter.mode == 'rename' and not args.pages:
+        print(f"🧹 Removed {prune(args.site, fingerprinter)} stale fingerprinted copy(ies)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Atomic File Writes
+Replace a file in one step: the new content goes to a uniquely named temp
+file in the same directory, is fsynced, takes over the old file's
+permissions and is renamed over it with os.replace. Readers see the old
+file or the new one, never half of either, and concurrent writers (the
+checker, watch mode, pool workers) or a killed run's leftovers never share
+a temp file.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# mkstemp creates files 0600; new files get the usual umask-based mode instead
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_open(path, mode='w', **kwargs):
+    """
+    Open a temp file next to `path` for writing; it replaces `path` when
+    the block exits cleanly and is removed if the block raises.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.',
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            permissions = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            permissions = 0o666 & ~_UMASK
+        os.chmod(temp_path, permissions)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_atomic(path, data):
+    """Replace `path` with `data` (str or bytes)."""
+    with atomic_open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Travel Checker Scale Benchmark
+Seeds a throwaway task table and a synthetic image tree, runs
+travel_development_checker.py end to end at several backlog sizes, and
+reports tasks/second, DB round-trips, subprocesses started and peak RSS.
+
+Each backlog size runs in a fresh worker interpreter with its own website
+repository (pushing to a local bare remote), image manifest, journal and
+lock, so runs do not warm each other up. By default the database is a
+SQLite stand-in; --database-url may point at a scratch PostgreSQL
+database whose task table is empty (the benchmark deletes what it seeds).
+
+Requires Pillow and numpy for the synthetic images.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import travel_db
+
+SIZES = '1000,10000'
+
+
+def maxrss_mb(who):
+    """Peak RSS in MB; ru_maxrss is KB on Linux and bytes on macOS."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def cpu_seconds():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (self_usage.ru_utime + self_usage.ru_stime
+            + child_usage.ru_utime + child_usage.ru_stime)
+
+
+def make_images(directory, count, size=(1600, 1200)):
+    """Noisy camera-like JPEGs saved at quality 98, so the optimizer has work to do."""
+    import numpy as np
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(0)
+    width, height = size
+    # A smooth gradient plus noise compresses like a photo, not like pure noise
+    gradient = np.linspace(0, 160, width, dtype=np.float32)[None, :, None]
+    for index in range(count):
+        noise = rng.normal(0, 24, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(gradient + noise + index % 64, 0, 255).astype('uint8')
+        Image.fromarray(pixels).save(os.path.join(directory, f"photo_{index:04d}.jpg"), quality=98)
+
+
+def git(args, cwd):
+    subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_site(root, image_source):
+    """A website repository holding a copy of the images, with a bare 'origin'."""
+    site = os.path.join(root, 'site')
+    remote = os.path.join(root, 'remote.git')
+    shutil.copytree(image_source, os.path.join(site, 'images'))
+    git(['init', '-q', '--bare', remote], root)
+    git(['init', '-q', '-b', 'main'], site)
+    git(['config', 'user.email', 'bench@localhost'], site)
+    git(['config', 'user.name', 'bench'], site)
+    git(['add', '-A'], site)
+    git(['commit', '-q', '-m', 'Seed images'], site)
+    git(['remote', 'add', 'origin', remote], site)
+    git(['push', '-q', 'origin', 'main'], site)
+    return site
+
+
+def backlog(size, image_paths, missing_ratio):
+    """`size` unique ideas: one per image, some missing images, the rest other tasks."""
+    ideas = [f"Optimize image {path} for city Bench" for path in image_paths[:size]]
+    missing = min(size - len(ideas), int(size * missing_ratio))
+    ideas += [f"Optimize image images/missing_{index}.jpg for city Bench" for index in range(missing)]
+    ideas += [f"Add itinerary idea #{index} for city Bench"
+              for index in range(size - len(ideas))]
+    return ideas
+
+
+def seed(url, ideas):
+    db = travel_db.Database(url)
+    try:
+        db.create_schema()
+        existing = db.scalar(f"SELECT COUNT(*) FROM {travel_db.TASKS_TABLE}")
+        if existing:
+            raise SystemExit(f"❌ {travel_db.TASKS_TABLE} already has {existing} row(s); "
+                             "point --database-url at a scratch database")
+        travel_db.import_ideas(ideas, db)
+    finally:
+        db.close()
+
+
+def clear(url):
+    db = travel_db.Database(url)
+    try:
+        db.execute(f"DELETE FROM {travel_db.TASKS_TABLE}")
+    finally:
+        db.close()
+
+
+def run_worker():
+    """Run the checker once in this process; returns a result dict."""
+    import multiprocessing.process
+
+    counts = {'subprocesses': 0, 'worker_processes': 0}
+    popen_init = subprocess.Popen.__init__
+    process_start = multiprocessing.process.BaseProcess.start
+
+    def counting_popen(self, *args, **kwargs):
+        counts['subprocesses'] += 1
+        popen_init(self, *args, **kwargs)
+
+    def counting_start(self):
+        counts['worker_processes'] += 1
+        process_start(self)
+
+    subprocess.Popen.__init__ = counting_popen
+    multiprocessing.process.BaseProcess.start = counting_start
+
+    import travel_development_checker
+
+    db = travel_db.get_db()
+    pending_before = travel_db.count_pending_tasks(db)
+    db.round_trips = 0
+    cpu_before = cpu_seconds()
+    start = time.monotonic()
+    # The checker prints a line or two per task; keep stdout for the JSON
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        travel_development_checker.run_once()
+    elapsed = time.monotonic() - start
+    round_trips = db.round_trips
+    pending_after = travel_db.count_pending_tasks(db)
+
+    completed = pending_before - pending_after
+    return {
+        'tasks': pending_before,
+        'completed': completed,
+        'pending_after': pending_after,
+        'elapsed_s': round(elapsed, 3),
+        'tasks_per_s': round(completed / elapsed, 1) if elapsed else 0.0,
+        'db_round_trips': round_trips,
+        'round_trips_per_task': round(round_trips / pending_before, 3) if pending_before else 0.0,
+        'subprocesses': counts['subprocesses'],
+        'worker_processes': counts['worker_processes'],
+        'cpu_s': round(cpu_seconds() - cpu_before, 3),
+        'rss_mb': round(maxrss_mb(resource.RUSAGE_SELF), 1),
+        # The peak of the largest single child (a pool worker or git), not a
+        # total: that is all ru_maxrss reports for RUSAGE_CHILDREN
+        'largest_child_rss_mb': round(maxrss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def run_size(size, args, image_source, image_count):
+    """Seed one backlog, run the checker on it in a fresh interpreter."""
+    with tempfile.TemporaryDirectory(prefix='bench_checker_') as root:
+        site = make_site(root, image_source)
+        image_paths = [os.path.join(site, 'images', name)
+                       for name in sorted(os.listdir(os.path.join(site, 'images')))][:image_count]
+        url = args.database_url or f"sqlite:///{os.path.join(root, 'travel.db')}"
+        seed(url, backlog(size, image_paths, args.missing_ratio))
+
+        env = dict(os.environ,
+                   TRAVEL_DATABASE_URL=url,
+                   TRAVEL_WEBSITE_PATH=site,
+                   IMAGE_MANIFEST=os.path.join(root, 'data', 'image_manifest.json'),
+                   CHECKER_JOURNAL=os.path.join(root, 'data', 'checker_journal.jsonl'),
+                   CHECKER_LOCK=os.path.join(root, 'data', 'checker.lock'))
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker']
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=root,
+                                    timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            return {'size': size, 'error': [f"timed out after {args.timeout}s"]}
+        finally:
+            if args.database_url:
+                clear(url)
+    if result.returncode != 0:
+        return {'size': size,
+                'error': result.stderr.strip().splitlines()[-1:] or ['worker failed']}
+    return dict(json.loads(result.stdout.strip().splitlines()[-1]), size=size,
+                images=min(size, image_count))
+
+
+def print_table(results):
+    header = (f"{'tasks':>8} {'images':>6} {'done':>8} {'secs':>8} {'tasks/s':>9} "
+              f"{'DB trips':>9} {'trips/task':>10} {'procs':>6} {'rss MB':>7} {'child MB':>9}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        if 'error' in r:
+            print(f"{r['size']:>8}  ❌ {r['error'][0]}")
+            continue
+        procs = r['subprocesses'] + r['worker_processes']
+        print(f"{r['size']:>8} {r['images']:>6} {r['completed']:>8} {r['elapsed_s']:>8} "
+              f"{r['tasks_per_s']:>9} {r['db_round_trips']:>9} {r['round_trips_per_task']:>10} "
+              f"{procs:>6} {r['rss_mb']:>7.1f} {r['largest_child_rss_mb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the travel checker at several backlog sizes')
+    parser.add_argument('--sizes', default=SIZES, help='comma-separated backlog sizes')
+    parser.add_argument('--images', type=int, default=40,
+                        help='synthetic images; each backlog has one optimize task per image')
+    parser.add_argument('--missing-ratio', type=float, default=0.1,
+                        help='share of tasks pointing at images that do not exist')
+    parser.add_argument('--database-url', help='scratch PostgreSQL database (default: SQLite)')
+    parser.add_argument('--timeout', type=int, default=3600, help='per backlog size, in seconds')
+    parser.add_argument('--json', help='also write results to this JSON file')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker()))
+        return 0
+
+    try:
+        import numpy  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        print("❌ Pillow and numpy are needed for the synthetic images (pip install Pillow numpy)")
+        return 1
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print("🏋️ TRAVEL CHECKER BENCHMARK")
+    print(f"🗄️  Database: {args.database_url or 'SQLite stand-in'}")
+    print("=" * 60)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench_images_') as image_source:
+        print(f"🖼️  Generating {args.images} synthetic image(s)...")
+        make_images(image_source, args.images)
+        for size in sizes:
+            print(f"🔄 Backlog of {size} task(s)...")
+            results.append(run_size(size, args, image_source, args.images))
+
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'),
+                       'database': 'postgresql' if args.database_url else 'sqlite',
+                       'images': args.images, 'missing_ratio': args.missing_ratio,
+                       'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+        print(f"\n📁 Results written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
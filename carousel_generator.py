@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+City Carousel Generator
+Regenerates the "Explore N China Cities" carousel on the travel website's
+index.html from a city data file, instead of patching the markup by hand.
+
+The data file (carousel_cities.json in the website repository) lists each
+city's slug, name, tag, hero image and highlights. Cards are packed into
+slides of `cards_per_slide`, and the section title and "1 / N" counter are
+computed from the data. index.html carries marker comments around the
+generated parts:
+
+    <h2 class="section-title"><!-- carousel:title -->Explore 28 China Cities<!-- /carousel:title --></h2>
+    <!-- carousel:slides --> ... <!-- /carousel:slides -->
+    <div class="slide-counter"><!-- carousel:counter -->1 / 6<!-- /carousel:counter --></div>
+
+Rendering replaces every marked region in one pass over the document.
+Only the first slide is visible on load, so by default (`lazy_load`) the
+other slides carry their hero image in `data-bg` and a small script in the
+carousel:lazyload region (before </body>) sets the background when a slide
+comes into view, one slide ahead. The first slide's images are preloaded
+from the carousel:preload region in <head>. Both regions are added
+automatically if the page lacks them.
+Run once with --extract to build the data file from the current page and
+insert the markers; after that, add a city to the data file and run
+without arguments. If the site has an asset-manifest.json, the new cards'
+image URLs are content-hashed like the rest (see asset_fingerprint.py).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from html import escape
+from html.parser import HTMLParser
+
+from asset_fingerprint import MANIFEST_NAME, Fingerprinter
+from atomic_file import write_atomic
+
+TRAVEL_WEBSITE_PATH = os.environ.get('TRAVEL_WEBSITE_PATH', "/Users/fudongli/clawd/travel-website")
+DATA_NAME = 'carousel_cities.json'
+REGIONS = ('title', 'slides', 'counter')
+# Inserted before </head> and </body> when missing
+OPTIONAL_REGIONS = (('preload', '</head>'), ('lazyload', '</body>'))
+MARKER = re.compile(r'<!-- (/?)carousel:(\w+) -->')
+
+SLIDE_INDENT = ' ' * 20
+CARD_INDENT = ' ' * 24
+PAGE_INDENT = ' ' * 4
+
+# Swaps data-bg into the background of a slide's cards when the slide, or
+# the one before it, becomes visible; IntersectionObserver honours the
+# carousel's overflow clipping, so off-screen slides stay unloaded.
+LAZYLOAD_SCRIPT = """<script>
+(function () {
+    var slides = Array.prototype.slice.call(document.querySelectorAll(SLIDE_SELECTOR));
+    function load(slide) {
+        if (!slide) return;
+        slide.querySelectorAll('[data-bg]').forEach(function (el) {
+            el.style.backgroundImage = "url('" + el.getAttribute('data-bg') + "')";
+            el.removeAttribute('data-bg');
+        });
+    }
+    if (!('IntersectionObserver' in window)) {
+        slides.forEach(load);
+        return;
+    }
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            var index = slides.indexOf(entry.target);
+            load(slides[index]);
+            // The visitor is browsing the carousel: fetch the next slide too
+            if (index > 0) load(slides[index + 1]);
+            observer.unobserve(entry.target);
+        });
+    });
+    slides.forEach(function (slide) { observer.observe(slide); });
+    // Slide 2 waits until the page has loaded and the browser is idle
+    window.addEventListener('load', function () {
+        var idle = window.requestIdleCallback || function (callback) { setTimeout(callback, 200); };
+        idle(function () { load(slides[1]); });
+    });
+})();
+</script>"""
+
+
+def render_card(city, asset_version=None, lazy=False):
+    """
+    One city card, in the markup the page has always used; `lazy` moves the
+    hero image from the inline style to data-bg.
+    """
+    hero = city['hero_image']
+    if asset_version:
+        hero = f"{hero}?v={asset_version}"
+    pad = CARD_INDENT
+    if lazy:
+        header = f"{pad}    <div class=\"city-header\" data-bg=\"{escape(hero)}\">"
+    else:
+        header = f"{pad}    <div class=\"city-header\" style=\"background-image: url('{escape(hero)}');\">"
+    lines = [
+        f"{pad}<!-- {escape(city['name'], quote=False)} -->",
+        f"{pad}<div class=\"city-card\" onclick=\"window.location.href='cities/city-template.html"
+        f"?city={escape(city['slug'])}'\" style=\"cursor: pointer;\">",
+        header,
+        f"{pad}        <div class=\"city-name\">{escape(city['name'], quote=False)}</div>",
+        f"{pad}        <div class=\"city-tag\">{escape(city['tag'], quote=False)}</div>",
+        f"{pad}    </div>",
+        f"{pad}    <div class=\"city-details\">",
+    ]
+    lines += [f"{pad}        <p>{escape(highlight, quote=False)}</p>"
+              for highlight in city.get('highlights', ())]
+    lines += [f"{pad}    </div>", f"{pad}</div>"]
+    return '\n'.join(lines)
+
+
+def pack_slides(cities, per_slide):
+    """Cities in order, `per_slide` to a slide (the last may be short)."""
+    return [cities[start:start + per_slide] for start in range(0, len(cities), per_slide)]
+
+
+def render_regions(data):
+    """The generated markup for every marked region, keyed by region name."""
+    cities = data['cities']
+    slides = pack_slides(cities, data.get('cards_per_slide', 5))
+    slide_class = data.get('slide_class', 'carousel-slide')
+    first_class = data.get('first_slide_class', slide_class)
+
+    lazy = data.get('lazy_load', True)
+
+    rendered = []
+    for index, slide in enumerate(slides):
+        cards = '\n'.join(render_card(city, data.get('asset_version'), lazy=lazy and index > 0)
+                          for city in slide)
+        rendered.append(f"{SLIDE_INDENT}<!-- SLIDE -->\n"
+                        f"{SLIDE_INDENT}<div class=\"{first_class if index == 0 else slide_class}\">\n"
+                        f"{cards}\n"
+                        f"{SLIDE_INDENT}</div>\n")
+    return {
+        'title': escape(data.get('title', 'Explore {count} China Cities').format(count=len(cities)),
+                        quote=False),
+        # The markers sit on their own lines, indented like the slides
+        'slides': '\n' + ''.join(rendered) + SLIDE_INDENT,
+        'counter': f"1 / {len(slides)}",
+        'preload': render_preload(slides[0] if slides else [], data.get('asset_version')),
+        'lazyload': render_lazyload(slide_class) if lazy and len(slides) > 1 else '',
+    }
+
+
+def render_preload(first_slide, asset_version=None):
+    """Preload hints for the hero images visible on first paint."""
+    heroes = []
+    for city in first_slide:
+        hero = city['hero_image'] + (f"?v={asset_version}" if asset_version else '')
+        if hero not in heroes:
+            heroes.append(hero)
+    if not heroes:
+        return ''
+    links = ''.join(f'{PAGE_INDENT}<link rel="preload" as="image" href="{escape(hero)}" '
+                    f'fetchpriority="high">\n' for hero in heroes)
+    return '\n' + links + PAGE_INDENT
+
+
+def render_lazyload(slide_class):
+    selector = json.dumps('.' + slide_class.split()[0])
+    script = LAZYLOAD_SCRIPT.replace('SLIDE_SELECTOR', selector)
+    return '\n' + ''.join(f'{PAGE_INDENT}{line}\n' if line else '\n'
+                          for line in script.split('\n')) + PAGE_INDENT
+
+
+def add_optional_markers(document):
+    """
+    Add empty preload/lazyload regions before </head> and </body> if the
+    page has none. Returns (document, names of regions that could not be placed).
+    """
+    unplaced = []
+    for name, tag in OPTIONAL_REGIONS:
+        if f'<!-- carousel:{name} -->' in document:
+            continue
+        at = document.lower().rfind(tag)
+        if at == -1:
+            unplaced.append(name)
+            continue
+        markers = f'<!-- carousel:{name} --><!-- /carousel:{name} -->'
+        line_start = document.rfind('\n', 0, at) + 1
+        if document[line_start:at].strip():
+            document = document[:at] + markers + document[at:]
+        else:
+            document = document[:line_start] + PAGE_INDENT + markers + '\n' + document[line_start:]
+    return document, unplaced
+
+
+def replace_regions(document, rendered):
+    """
+    Copy `document`, swapping the body of each marked region for its
+    rendered markup. One left-to-right pass over the markers. Returns
+    (new document, names of the regions found).
+    """
+    out = []
+    found = []
+    position = 0
+    open_name = None
+    for match in MARKER.finditer(document):
+        closing, name = match.group(1) == '/', match.group(2)
+        if name not in rendered:
+            continue
+        if not closing:
+            if open_name is not None:
+                raise ValueError(f"carousel:{name} starts inside carousel:{open_name}")
+            out.append(document[position:match.end()])
+            open_name = name
+        else:
+            if open_name != name:
+                raise ValueError(f"/carousel:{name} without a matching start marker")
+            out.append(rendered[name])
+            found.append(name)
+            open_name = None
+            position = match.start()
+    if open_name is not None:
+        raise ValueError(f"carousel:{open_name} is never closed")
+    out.append(document[position:])
+    return ''.join(out), found
+
+
+class _CarouselScanner(HTMLParser):
+    """Finds the city cards and the title, slides and counter in an unmarked page."""
+
+    def __init__(self, document):
+        super().__init__()
+        self.line_starts = [0]
+        for line in document.splitlines(keepends=True):
+            self.line_starts.append(self.line_starts[-1] + len(line))
+        self.document = document
+        self.stack = []             # (tag, classes, start offset)
+        self.cities = []
+        self.city = None
+        self.field = None
+        self.slides = []            # (start, end) offsets of each carousel-slide div
+        self.slide_classes = []
+        self.title = None           # (start, end, text)
+        self.counter = None         # (start, end, text)
+        self.text_start = None
+        self.text = ''
+
+    def position(self):
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        start = self.position()
+        if tag not in ('br', 'img', 'meta', 'link', 'input', 'source'):
+            self.stack.append((tag, classes, start))
+        self.text_start, self.text = self.position() + len(self.get_starttag_text()), ''
+        if 'carousel-slide' in classes:
+            self.slide_classes.append(attrs['class'])
+        elif 'city-card' in classes:
+            slug = re.search(r'city=([\w-]+)', attrs.get('onclick') or '')
+            self.city = {'slug': slug.group(1) if slug else '', 'name': '', 'tag': '',
+                         'hero_image': '', 'highlights': []}
+        elif self.city is not None and 'city-header' in classes:
+            url = re.search(r"url\(['\"]?([^'\")]+)", attrs.get('style') or '')
+            if url:
+                self.city['hero_image'] = url.group(1)
+            elif attrs.get('data-bg'):
+                self.city['hero_image'] = attrs['data-bg']
+        elif self.city is not None and 'city-name' in classes:
+            self.field = 'name'
+        elif self.city is not None and 'city-tag' in classes:
+            self.field = 'tag'
+        elif self.city is not None and tag == 'p':
+            self.field = 'highlight'
+
+    def handle_data(self, data):
+        self.text += data
+        if self.field == 'highlight':
+            self.city['highlights'].append(data)
+        elif self.field:
+            self.city[self.field] += data
+
+    def handle_endtag(self, tag):
+        end = self.position()
+        while self.stack and self.stack[-1][0] != tag:
+            self.stack.pop()
+        if not self.stack:
+            return
+        _, classes, start = self.stack.pop()
+        text = self.text.strip()
+        if tag == 'h2' and 'section-title' in classes and self.title is None and re.search(r'\d', text):
+            self.title = (self.text_start, end, text)
+        elif re.fullmatch(r'1\s*/\s*\d+', text) and self.counter is None:
+            self.counter = (self.text_start, end, text)
+        if 'carousel-slide' in classes:
+            self.slides.append((start, self.document.index('>', end) + 1))
+        elif 'city-card' in classes and self.city is not None:
+            self.city['highlights'] = [h.strip() for h in self.city['highlights'] if h.strip()]
+            self.city['name'] = self.city['name'].strip()
+            self.city['tag'] = self.city['tag'].strip()
+            self.cities.append(self.city)
+            self.city = None
+        self.field = None
+        self.text_start, self.text = self.document.index('>', end) + 1, ''
+
+
+def extract(document):
+    """
+    Read the cities out of an unmarked page and insert the markers.
+    Returns (data, marked document).
+    """
+    scanner = _CarouselScanner(document)
+    scanner.feed(document)
+    scanner.close()
+    if not scanner.cities or not scanner.slides:
+        raise ValueError("no carousel slides with city cards found")
+
+    versions = set()
+    for city in scanner.cities:
+        path, _, query = city['hero_image'].partition('?')
+        city['hero_image'] = path
+        match = re.search(r'(?:^|&)v=([^&]+)', query)
+        if match:
+            versions.add(match.group(1))
+    first_slide_cards = sum(1 for _ in re.finditer(r'class="city-card"',
+                                                   document[slice(*scanner.slides[0])]))
+    data = {
+        'title': 'Explore {count} China Cities',
+        'cards_per_slide': first_slide_cards or 5,
+        'first_slide_class': scanner.slide_classes[0],
+        'slide_class': scanner.slide_classes[-1] if len(scanner.slide_classes) > 1
+        else 'carousel-slide',
+        'asset_version': versions.pop() if len(versions) == 1 else None,
+        'lazy_load': True,
+        'cities': scanner.cities,
+    }
+    if scanner.title:
+        number = re.search(r'\d+', scanner.title[2]).group()
+        data['title'] = scanner.title[2].replace(number, '{count}', 1)
+
+    # The slides region runs from the line of the first "<!-- SLIDE -->"
+    # (or the first slide) to the end of the last slide's line
+    start = scanner.slides[0][0]
+    comment = document.rfind('<!-- SLIDE -->', 0, start)
+    if comment != -1 and not document[comment + len('<!-- SLIDE -->'):start].strip():
+        start = comment
+    start = document.rfind('\n', 0, start) + 1
+    end = document.find('\n', scanner.slides[-1][1])
+    end = len(document) if end == -1 else end + 1
+
+    inserts = [(start, SLIDE_INDENT + '<!-- carousel:slides -->\n'),
+               (end, SLIDE_INDENT + '<!-- /carousel:slides -->\n')]
+    for name, found in (('title', scanner.title), ('counter', scanner.counter)):
+        if found:
+            inserts += [(found[0], f'<!-- carousel:{name} -->'), (found[1], f'<!-- /carousel:{name} -->')]
+        else:
+            print(f"⚠️ No {name} found; add <!-- carousel:{name} --> markers by hand")
+    out = []
+    position = 0
+    for offset, text in sorted(inserts, key=lambda insert: insert[0]):
+        out.append(document[position:offset])
+        out.append(text)
+        position = offset
+    out.append(document[position:])
+    return data, ''.join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate the city carousel from its data file')
+    parser.add_argument('--site', default=TRAVEL_WEBSITE_PATH, help='website repository')
+    parser.add_argument('--page', default='index.html', help='page with the carousel, relative to --site')
+    parser.add_argument('--data', help=f'city data file (default: SITE/{DATA_NAME})')
+    parser.add_argument('--extract', action='store_true',
+                        help='build the data file from the current page and insert the markers')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change, write nothing')
+    args = parser.parse_args()
+
+    page = os.path.join(args.site, args.page)
+    data_path = args.data or os.path.join(args.site, DATA_NAME)
+    with open(page, 'r') as f:
+        document = f.read()
+
+    if args.extract:
+        if MARKER.search(document):
+            print(f"❌ {page} already has carousel markers; edit {data_path} instead")
+            return 1
+        try:
+            data, document = extract(document)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"📝 Found {len(data['cities'])} cities, {data['cards_per_slide']} per slide")
+        if not args.dry_run:
+            write_atomic(data_path, json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+            print(f"✅ Wrote {data_path}")
+
+    else:
+        try:
+            with open(data_path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ No data file {data_path}; run with --extract first")
+            return 1
+    document_with_markers, unplaced = add_optional_markers(document)
+    rendered = render_regions(data)
+    if 'preload' in unplaced:
+        print("⚠️ No </head> for the first slide's preload hints")
+    if 'lazyload' in unplaced and rendered['lazyload']:
+        # Without the swap script the data-bg images would never load
+        print("⚠️ No </body> for the lazy-load script; rendering every slide eagerly")
+        rendered = render_regions(dict(data, lazy_load=False))
+    try:
+        new_document, found = replace_regions(document_with_markers, rendered)
+    except ValueError as e:
+        print(f"❌ {page}: {e}")
+        return 1
+    fingerprinter = None
+    if os.path.exists(os.path.join(args.site, MANIFEST_NAME)):
+        # The site uses content-hashed image URLs (asset_fingerprint.py); keep new cards in line
+        fingerprinter = Fingerprinter(args.site)
+        base_dir = os.path.dirname(args.page)
+        fingerprinter.scan(new_document, base_dir)
+        new_document, _ = fingerprinter.rewrite(new_document, base_dir)
+
+    missing = [name for name in REGIONS if name not in found]
+    if missing:
+        print(f"⚠️ No markers for: {', '.join(missing)}")
+    if 'slides' not in found:
+        print(f"❌ {page} has no carousel:slides markers; run with --extract first")
+        return 1
+
+    slides = rendered['counter'].split(' / ')[1]
+    print(f"🎠 {len(data['cities'])} cities on {slides} slide(s): {rendered['title']}")
+    if args.dry_run:
+        print("🔍 Dry run: " + ("page would change" if new_document != document else "no changes"))
+        return 0
+    if new_document == document:
+        print("✅ Carousel already up to date")
+        return 0
+    write_atomic(page, new_document)
+    if fingerprinter is not None:
+        fingerprinter.save()
+    print(f"✅ Regenerated the carousel in {page}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Columnar Export
+Writes the silver price history as date-partitioned Parquet (or Arrow IPC)
+for analytics jobs: timestamp[ns], float64 prices, dictionary-encoded
+source/url. Exports are incremental - only partitions with new rows are
+written, using a manifest that remembers how much of the CSV was consumed.
+
+Partitions are replaced atomically and the manifest is saved last, so a
+crash in between only means the next run reads the same rows again; they
+are merged into the partition by timestamp, never appended twice.
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from atomic_file import atomic_open
+
+MANIFEST_NAME = '_manifest.json'
+EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def load_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def schema(pa):
+    return pa.schema([
+        ('timestamp', pa.timestamp('ns')),
+        ('price_usd', pa.float64()),
+        ('source', pa.dictionary(pa.int32(), pa.string())),
+        ('url', pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with atomic_open(path) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def read_new_rows(csv_path, offset):
+    """
+    Read CSV rows appended after byte `offset`.
+    Returns (rows, new_offset); only complete lines are consumed, so a row
+    that is still being written is picked up next time.
+    """
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+
+    # Leave a trailing partial line for the next export
+    end = data.rfind(b'\n') + 1
+    text = header.decode() + data[:end].decode()
+    rows = list(csv.DictReader(io.StringIO(text)))
+    return rows, start + end
+
+
+def partition_path(out_dir, date_str, fmt):
+    return os.path.join(out_dir, f"date={date_str}", f"part-0{EXTENSIONS[fmt]}")
+
+
+def read_partition(pa, path, fmt):
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    import pyarrow.ipc as ipc
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def write_partition(pa, table, path, fmt):
+    """Write one partition atomically (unique temp file + rename)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_open(path, 'wb') as f:
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, f, compression='zstd')
+        else:
+            import pyarrow.ipc as ipc
+            with ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+
+
+def merge_partition(pa, existing, table):
+    """
+    Append the rows of `table` whose timestamp `existing` does not have yet.
+    The result has one chunk and one dictionary per column: the Arrow IPC
+    file format cannot store a dictionary that changes between batches.
+    """
+    import pyarrow.compute as pc
+    seen = pc.is_in(table['timestamp'], value_set=existing['timestamp'])
+    merged = pa.concat_tables([existing, table.filter(pc.invert(seen))])
+    return merged.unify_dictionaries().combine_chunks()
+
+
+def clear_export(out_dir):
+    """Remove the partitions and manifest a previous export left in `out_dir`."""
+    if not os.path.isdir(out_dir):
+        return
+    for name in os.listdir(out_dir):
+        path = os.path.join(out_dir, name)
+        if name.startswith('date=') and os.path.isdir(path):
+            shutil.rmtree(path)
+        elif name == MANIFEST_NAME:
+            os.remove(path)
+
+
+def rows_to_table(pa, rows):
+    timestamps = [datetime.fromisoformat(row['timestamp']) for row in rows]
+    return pa.table({
+        'timestamp': pa.array(timestamps, type=pa.timestamp('ns')),
+        'price_usd': pa.array([float(row['price_usd']) for row in rows], type=pa.float64()),
+        'source': pa.array([row['source'] for row in rows]).dictionary_encode(),
+        'url': pa.array([row['url'] for row in rows]).dictionary_encode(),
+    }).cast(schema(pa))
+
+
+def export_history(csv_path='data/silver_prices.csv', out_dir='exports/silver_prices',
+                   fmt='parquet', full=False):
+    """
+    Export new CSV rows into date partitions.
+    Returns a dict with the partitions written and rows exported.
+    """
+    pa = load_pyarrow()
+    if pa is None:
+        return {'success': False, 'error': 'pyarrow not available (pip install pyarrow)'}
+    if not os.path.exists(csv_path):
+        return {'success': False, 'error': f'CSV not found: {csv_path}'}
+
+    manifest = None if full else load_manifest(out_dir)
+    csv_size = os.path.getsize(csv_path)
+    # A different format or a CSV that shrank (rewritten) means starting over
+    if (manifest is None or manifest.get('format') != fmt
+            or csv_size < manifest.get('csv_offset', 0)):
+        # Partitions from an earlier export would otherwise be merged into
+        clear_export(out_dir)
+        manifest = {'format': fmt, 'csv_offset': 0, 'partitions': {}}
+
+    rows, new_offset = read_new_rows(csv_path, manifest['csv_offset'])
+
+    by_date = {}
+    for row in rows:
+        by_date.setdefault(row['date'], []).append(row)
+
+    written = []
+    for date_str, date_rows in sorted(by_date.items()):
+        table = rows_to_table(pa, date_rows)
+        path = partition_path(out_dir, date_str, fmt)
+        if os.path.exists(path):
+            # The day already has a partition (e.g. today's, or one written
+            # by a run that crashed before saving the manifest); extend it
+            table = merge_partition(pa, read_partition(pa, path, fmt), table)
+        write_partition(pa, table, path, fmt)
+        manifest['partitions'][date_str] = {'rows': table.num_rows}
+        written.append(date_str)
+
+    manifest['csv_offset'] = new_offset
+    os.makedirs(out_dir, exist_ok=True)
+    save_manifest(out_dir, manifest)
+    return {'success': True, 'rows': len(rows), 'partitions': written}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export silver prices to Parquet/Arrow')
+    parser.add_argument('--csv', default='data/silver_prices.csv')
+    parser.add_argument('--out', default='exports/silver_prices')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='parquet')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the manifest and rewrite every partition')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='keep running and export new rows every SECONDS')
+    args = parser.parse_args()
+
+    full = args.full
+    while True:
+        result = export_history(args.csv, args.out, args.format, full)
+        full = False
+        if not result['success']:
+            print(f"❌ Export failed: {result['error']}")
+            return 1
+        if result['rows']:
+            print(f"✅ Exported {result['rows']} row(s) into "
+                  f"{len(result['partitions'])} partition(s): {', '.join(result['partitions'])}")
+        elif not args.watch:
+            print("✅ Export up to date")
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
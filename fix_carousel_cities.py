@@ -3,15 +3,10 @@
 Fix carousel cities - add Tianjin and Xi'an, create new slide 6
 """
 
-import re
+import sys
 
-def read_file(filename):
-    with open(filename, 'r') as f:
-        return f.read()
-
-def write_file(filename, content):
-    with open(filename, 'w') as f:
-        f.write(content)
+from html_transform import (InsertAfter, Match, Remove, ReplaceText, TransformError,
+                            contains, transform_file)
 
 def create_tianjin_card():
     """Create HTML for Tianjin city card."""
@@ -45,33 +40,9 @@ def create_xian_card():
                             </div>
                         </div>'''
 
-def fix_carousel(content):
-    """Fix the carousel by adding Tianjin and Xi'an in new slide 6."""
-    
-    # 1. Update title from 25 to 28 China Cities
-    content = content.replace(
-        '<h2 class="section-title">Explore 25 China Cities</h2>',
-        '<h2 class="section-title">Explore 28 China Cities</h2>'
-    )
-    
-    # 2. Find slide 5 and remove Kaifeng from it
-    # Slide 5 starts with: "<!-- SLIDE -->" then "<div class="carousel-slide">"
-    # We need to find the Kaifeng card and remove it from slide 5
-    
-    # First, let's find the position of the Kaifeng card in slide 5
-    kaifeng_pattern = r'(<!-- Kaifeng -->\s*<div class="city-card" onclick="window\.location\.href=\'cities/city-template\.html\?city=kaifeng\'.*?</div>\s*</div>\s*</div>\s*)'
-    
-    # Remove Kaifeng from slide 5
-    content = re.sub(kaifeng_pattern, '', content, flags=re.DOTALL)
-    
-    # 3. Find where to insert new slide 6 (after slide 5, before navigation)
-    # Look for the closing div of slide 5 and the navigation section
-    slide_5_end_pattern = r'(</div>\s*</div>\s*</div>\s*</div>\s*\s*<!-- Navigation -->)'
-    
-    # Create new slide 6 with Kaifeng, Tianjin, and Xi'an
-    new_slide_6 = '''                    <!-- SLIDE -->
-                    <div class="carousel-slide">
-                        <!-- Kaifeng -->
+def create_kaifeng_card():
+    """Create HTML for Kaifeng city card."""
+    return '''                        <!-- Kaifeng -->
                         <div class="city-card" onclick="window.location.href='cities/city-template.html?city=kaifeng'" style="cursor: pointer;">
                             <div class="city-header" style="background-image: url('images/user_photos/kaifeng_hero_bg.jpg?v=1771184412');">
                                 <div class="city-name">Kaifeng</div>
@@ -83,23 +54,32 @@ def fix_carousel(content):
                                 <p>🏰 Iron Pagoda - 900+ years old</p>
                                 
                             </div>
-                        </div>
-''' + create_tianjin_card() + '\n' + create_xian_card() + '''
-                    </div>
-                
-                <!-- Navigation -->'''
-    
-    # Replace the pattern with new slide 6
-    content = re.sub(slide_5_end_pattern, new_slide_6, content, flags=re.DOTALL)
-    
-    # 4. Update slide counter from "1 / 5" to "1 / 6"
-    content = content.replace('1 / 5</div>', '1 / 6</div>')
-    
-    return content
+                        </div>'''
+
+def carousel_edits():
+    """
+    Edits that add Tianjin and Xi'an in a new slide 6. They are applied in
+    one streaming pass, so the order here does not matter; each edit's
+    `applied` count says whether it found its target.
+    """
+    new_slide_6 = ('''
+                    <!-- SLIDE -->
+                    <div class="carousel-slide">
+''' + create_kaifeng_card() + '\n' + create_tianjin_card() + '\n' + create_xian_card() + '''
+                    </div>''')
+
+    return {
+        'title': ReplaceText('Explore 25 China Cities', 'Explore 28 China Cities',
+                             inside=Match('h2', classes=['section-title'])),
+        # Kaifeng moves from slide 5 to the new slide 6
+        'kaifeng': Remove(Match('div', classes=['city-card'],
+                                attrs={'onclick': contains('city=kaifeng')})),
+        'slide_6': InsertAfter(Match('div', classes=['carousel-slide'], nth=5), new_slide_6),
+        'counter': ReplaceText('1 / 5', '1 / 6', count=1),
+    }
 
 def main():
-    input_file = '/Users/fudongli/clawd/travel-website/index.html'
-    output_file = '/Users/fudongli/clawd/travel-website/index.html'
+    input_file = sys.argv[1] if len(sys.argv) > 1 else '/Users/fudongli/clawd/travel-website/index.html'
     
     print("📝 Fixing carousel cities...")
     print("  - Adding Tianjin and Xi'an")
@@ -107,17 +87,20 @@ def main():
     print("  - Updating title to '28 China Cities'")
     print("  - Updating slide counter to '1 / 6'")
     
-    # Read the file
-    content = read_file(input_file)
-    
-    # Fix the carousel
-    fixed_content = fix_carousel(content)
-    
-    # Write the file
-    write_file(output_file, fixed_content)
-    
+    # One pass over the page; it is only replaced if every edit found its target
+    edits = carousel_edits()
+    try:
+        transform_file(input_file, list(edits.values()), require_all=True)
+    except TransformError:
+        missed = [name for name, edit in edits.items() if not edit.applied]
+        print(f"❌ No match for: {', '.join(missed)}; {input_file} left unchanged "
+              f"(already fixed?)")
+        return 1
     print("✅ Carousel fixed successfully!")
     
+    with open(input_file, 'r') as f:
+        fixed_content = f.read()
+    
     # Verify the changes
     print("\n🔍 Verifying changes:")
     
@@ -146,4 +129,4 @@ def main():
     print("  - Total: 28 cities")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML Transformer
+Applies a batch of declarative edits to an HTML file in one pass over its
+tokens, and writes the result to a temporary file that atomically
+replaces the original, so readers never see a truncated page.
+
+The file is read in chunks and tokenized into comments, tags, and text.
+Markup that no edit touches is copied byte for byte. Edits name the
+elements they apply to with Match:
+
+    Match('div', classes=['carousel-slide'], nth=5)           5th slide
+    Match('div', classes=['city-card'], attrs={'onclick': contains('city=kaifeng')})
+    Match('div', classes=['city-header'], inside=Match('div', classes=['carousel-slide'], after=1))
+
+and are one of:
+
+    Remove(match)                      drop the element (and its comment/line)
+    ReplaceContent(match, html)        keep the element, swap what is inside
+    InsertBefore(match, html)          html goes verbatim before the element
+    InsertAfter(match, html)           ... or after its end tag
+    SetAttributes(match, set, remove, update)
+    ReplaceText(old, new, inside=None) in text between tags
+
+Every edit records how often it applied in `edit.applied`, so a script can
+tell when the page no longer looks the way it expected.
+"""
+
+import io
+import os
+import re
+import sys
+from html import escape, unescape
+
+from atomic_file import atomic_open
+
+CHUNK_SIZE = 64 * 1024
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                 'param', 'source', 'track', 'wbr'}
+RAW_TEXT_ELEMENTS = {'script', 'style'}
+
+# How far to read ahead for the end of a tag or comment. Past this, the '<'
+# is plain text (data: URIs make megabyte-sized tags legitimate, so it is large)
+MAX_TAG_LENGTH = 1024 * 1024
+
+TOKEN = re.compile(r"""
+    (?P<comment><!--.*?-->)
+  | (?P<declaration><![^>]*>|<\?[^>]*>)
+  | (?P<endtag></(?P<end_name>[A-Za-z][\w:-]*)\s*>)
+  | (?P<starttag><(?P<start_name>[A-Za-z][\w:-]*)(?P<attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>)
+  | (?P<text>[^<]+)
+  | (?P<lt><)
+""", re.VERBOSE | re.DOTALL)
+
+# A '<' followed by something that cannot start markup ("a < b", "3<4")
+STRAY_LT = re.compile(r'<[^A-Za-z/!?]')
+
+ATTRIBUTE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+
+
+def parse_attributes(text):
+    """Attribute text of a start tag -> dict in source order (values unescaped)."""
+    attrs = {}
+    for match in ATTRIBUTE.finditer(text):
+        name = match.group(1).lower()
+        value = next((group for group in match.groups()[1:] if group is not None), None)
+        attrs[name] = unescape(value) if value is not None else None
+    return attrs
+
+
+def format_start_tag(name, attrs, self_closing=False):
+    parts = [name]
+    for attr, value in attrs.items():
+        parts.append(attr if value is None else f'{attr}="{escape(value)}"')
+    return f"<{' '.join(parts)}{' /' if self_closing else ''}>"
+
+
+def tokenize(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield (kind, text, name) from a text stream: kind is 'comment',
+    'declaration', 'starttag', 'endtag' or 'text'. Concatenating every
+    `text` reproduces the input exactly.
+    """
+    buffer = ''
+    pos = 0
+    eof = False
+    raw_end = None          # inside <script>/<style>: everything up to the end tag is text
+
+    while True:
+        if not eof and (len(buffer) - pos < chunk_size):
+            chunk = stream.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+        if pos >= len(buffer):
+            return
+
+        if raw_end is not None:
+            end = raw_end.search(buffer, pos)
+            if end is None and not eof:
+                chunk_size += CHUNK_SIZE      # read on until the end tag is buffered
+                continue
+            stop = end.start() if end else len(buffer)
+            if stop > pos:
+                yield 'text', buffer[pos:stop], None
+            pos = stop
+            raw_end = None
+            continue
+
+        match = TOKEN.match(buffer, pos)
+        kind = match.lastgroup
+        # A token that runs to the end of the buffer, a '<' that may still
+        # start a tag, or an unterminated comment may continue in the next
+        # chunk; markup is only read ahead up to MAX_TAG_LENGTH
+        incomplete = (match.end() == len(buffer)
+                      or (kind == 'lt' and not STRAY_LT.match(buffer, pos))
+                      or (kind == 'declaration' and buffer.startswith('<!--', pos)))
+        if incomplete and not eof and (kind == 'text' or len(buffer) - pos < MAX_TAG_LENGTH):
+            chunk_size += CHUNK_SIZE
+            continue
+
+        text = match.group(0)
+        pos = match.end()
+        if kind == 'lt':
+            yield 'text', text, None
+        elif kind in ('starttag', 'endtag'):
+            name = match.group('start_name' if kind == 'starttag' else 'end_name').lower()
+            yield kind, text, name
+            if kind == 'starttag' and name in RAW_TEXT_ELEMENTS and not text.endswith('/>'):
+                raw_end = re.compile(rf'</{name}\s*>', re.IGNORECASE)
+        else:
+            yield kind, text, None
+
+
+def contains(substring):
+    """Attribute predicate for Match(attrs=...): value contains `substring`."""
+    return lambda value: value is not None and substring in value
+
+
+class TransformError(Exception):
+    """The result was not written; `missed` lists the edits that applied nowhere."""
+
+    def __init__(self, message, missed=()):
+        super().__init__(message)
+        self.missed = list(missed)
+
+
+class Match:
+    """
+    Which elements an edit applies to. `attrs` maps a name to a value, a
+    predicate, or True (present). `nth` picks one occurrence (1-based);
+    `after` skips the first occurrences. `inside` requires an ancestor.
+    """
+
+    def __init__(self, tag=None, classes=(), attrs=None, nth=None, after=0, inside=None):
+        self.tag = tag.lower() if tag else None
+        self.classes = set(classes)
+        self.attrs = attrs or {}
+        self.nth = nth
+        self.after = after
+        self.inside = inside
+        self.seen = 0
+
+    def test(self, name, attrs, open_matches):
+        """Check one start tag; counts occurrences, so call once per tag."""
+        if self.tag is not None and name != self.tag:
+            return False
+        if self.classes and not self.classes <= set((attrs.get('class') or '').split()):
+            return False
+        for attr, expected in self.attrs.items():
+            value = attrs.get(attr)
+            if expected is True:
+                if attr not in attrs:
+                    return False
+            elif callable(expected):
+                if not expected(value):
+                    return False
+            elif value != expected:
+                return False
+        if self.inside is not None and self.inside not in open_matches:
+            return False
+        self.seen += 1
+        if self.nth is not None:
+            return self.seen == self.nth
+        return self.seen > self.after
+
+
+class Edit:
+    def __init__(self, match):
+        self.match = match
+        self.applied = 0
+
+
+class Remove(Edit):
+    """Drop the element; with `comment`, also the comment on the line above it."""
+
+    def __init__(self, match, comment=True):
+        super().__init__(match)
+        self.comment = comment
+
+
+class ReplaceContent(Edit):
+    def __init__(self, match, html):
+        super().__init__(match)
+        self.html = html
+
+
+class InsertBefore(Edit):
+    def __init__(self, match, html):
+        super().__init__(match)
+        self.html = html
+
+
+class InsertAfter(Edit):
+    def __init__(self, match, html):
+        super().__init__(match)
+        self.html = html
+
+
+class SetAttributes(Edit):
+    """
+    Change a start tag's attributes: `set` adds or overwrites, `remove`
+    drops, and `update(attrs)` may return a new dict for anything else.
+    """
+
+    def __init__(self, match, set=None, remove=(), update=None):
+        super().__init__(match)
+        self.set = set or {}
+        self.remove = remove
+        self.update = update
+
+
+class ReplaceText:
+    """Replace `old` with `new` in text, optionally only inside a Match."""
+
+    def __init__(self, old, new, inside=None, count=None):
+        self.old = old
+        self.new = new
+        self.inside = inside
+        self.count = count
+        self.applied = 0
+
+
+class _Element:
+    __slots__ = ('name', 'matches', 'on_end', 'suppress')
+
+    def __init__(self, name, matches):
+        self.name = name
+        self.matches = matches
+        self.on_end = []        # html to emit after the end tag
+        self.suppress = None    # 'all' (Remove) or 'content' (ReplaceContent)
+
+
+def _all_matches(edits):
+    matches = []
+    for edit in edits:
+        match = edit.match if isinstance(edit, Edit) else edit.inside
+        while match is not None and match not in matches:
+            matches.append(match)
+            match = match.inside
+    # Ancestors first, so `inside` sees them already evaluated
+    return list(reversed(matches))
+
+
+def _trim_line(text):
+    """Drop the trailing indentation and the newline before it."""
+    stripped = text.rstrip(' \t')
+    if stripped.endswith('\n'):
+        stripped = stripped[:-1]
+        if stripped.endswith('\r'):
+            stripped = stripped[:-1]
+    return stripped
+
+
+def transform_tokens(tokens, edits, write):
+    """Apply `edits` to a token stream, passing output text to write()."""
+    matchers = _all_matches(edits)
+    element_edits = [edit for edit in edits if isinstance(edit, Edit)]
+    text_edits = [edit for edit in edits if isinstance(edit, ReplaceText)]
+    stack = []
+    held = []               # whitespace and comments not yet written
+    suppressing = None      # the _Element whose content is being dropped
+
+    def flush_held():
+        for text in held:
+            write(text)
+        held.clear()
+
+    for kind, text, name in tokens:
+        if suppressing is not None:
+            if kind == 'starttag' and name not in VOID_ELEMENTS and not text.endswith('/>'):
+                stack.append(_Element(name, set()))
+            elif kind == 'endtag' and any(element.name == name for element in stack):
+                while stack[-1].name != name:
+                    stack.pop()
+                element = stack.pop()
+                if element is suppressing:
+                    suppressing = None
+                    if element.suppress == 'content':
+                        write(text)
+                    for html in element.on_end:
+                        write(html)
+            continue
+
+        if kind == 'comment' or (kind == 'text' and not text.strip()):
+            held.append(text)
+            continue
+
+        if kind == 'text':
+            open_matches = set().union(*(element.matches for element in stack)) if stack else set()
+            for edit in text_edits:
+                if edit.old in text and (edit.inside is None or edit.inside in open_matches):
+                    if edit.count is not None:
+                        remaining = edit.count - edit.applied
+                        if remaining <= 0:
+                            continue
+                        edit.applied += min(remaining, text.count(edit.old))
+                        text = text.replace(edit.old, edit.new, remaining)
+                    else:
+                        edit.applied += text.count(edit.old)
+                        text = text.replace(edit.old, edit.new)
+            flush_held()
+            write(text)
+            continue
+
+        if kind == 'endtag':
+            flush_held()
+            write(text)
+            if any(element.name == name for element in stack):
+                while stack[-1].name != name:
+                    stack.pop()
+                for html in stack.pop().on_end:
+                    write(html)
+            continue
+
+        if kind != 'starttag':
+            flush_held()
+            write(text)
+            continue
+
+        attrs = None
+        open_matches = set().union(*(element.matches for element in stack)) if stack else set()
+        matched = set()
+        if matchers:
+            attr_text = text[len(name) + 1:-1]
+            attrs = parse_attributes(attr_text)
+            for matcher in matchers:
+                if matcher.test(name, attrs, open_matches | matched):
+                    matched.add(matcher)
+        is_void = name in VOID_ELEMENTS or text.endswith('/>')
+        element = _Element(name, matched)
+
+        tag_text = text
+        for edit in element_edits:
+            if edit.match not in matched:
+                continue
+            edit.applied += 1
+            if isinstance(edit, Remove):
+                element.suppress = 'all'
+                comment_index = max((i for i, held_text in enumerate(held)
+                                     if held_text.startswith('<!--')), default=None)
+                if edit.comment and comment_index is not None:
+                    del held[comment_index:]
+                if held and not held[-1].startswith('<!--'):
+                    held[-1] = _trim_line(held[-1])
+            elif isinstance(edit, InsertBefore):
+                flush_held()
+                write(edit.html)
+            elif isinstance(edit, InsertAfter):
+                element.on_end.append(edit.html)
+            elif isinstance(edit, ReplaceContent):
+                element.suppress = element.suppress or 'content'
+                element.on_end.insert(0, edit.html)
+            elif isinstance(edit, SetAttributes):
+                new_attrs = {key: value for key, value in attrs.items() if key not in edit.remove}
+                new_attrs.update(edit.set)
+                if edit.update is not None:
+                    new_attrs = edit.update(new_attrs) or new_attrs
+                if new_attrs != attrs:
+                    tag_text = format_start_tag(name, new_attrs, text.endswith('/>'))
+                    attrs = new_attrs
+
+        if element.suppress == 'all':
+            if is_void:
+                for html in element.on_end:
+                    write(html)
+            else:
+                stack.append(element)
+                suppressing = element
+            continue
+
+        flush_held()
+        write(tag_text)
+        if element.suppress == 'content' and not is_void:
+            # ReplaceContent: new content now, then drop the old up to the end tag
+            write(element.on_end.pop(0))
+            stack.append(element)
+            suppressing = element
+            continue
+        if is_void:
+            for html in element.on_end:
+                write(html)
+        else:
+            stack.append(element)
+    flush_held()
+
+
+def transform(text, edits):
+    """Apply `edits` to an HTML string; returns the new string."""
+    out = []
+    transform_tokens(tokenize(io.StringIO(text)), edits, out.append)
+    return ''.join(out)
+
+
+def transform_file(path, edits, output=None, require_all=False, validate=None):
+    """
+    Stream `path` through `edits` into a temp file next to the output and
+    atomically rename it over `output` (default: `path`). Returns the
+    edits so callers can check `applied`.
+
+    Checks run before the rename, so a failed one leaves `output` as it
+    was: with `require_all`, any edit that applied nowhere raises
+    TransformError; `validate(edits)` may raise or return False to refuse.
+    """
+    with open(path, 'r', newline='') as source, \
+            atomic_open(output or path, 'w', newline='') as target:
+        transform_tokens(tokenize(source), edits, target.write)
+        # Raising here discards the temp file and leaves the output alone
+        missed = [edit for edit in edits if not edit.applied]
+        if require_all and missed:
+            raise TransformError(f"{len(missed)} edit(s) matched nothing", missed)
+        if validate is not None and validate(edits) is False:
+            raise TransformError("rejected by validation", missed)
+    return edits
+
+
+if __name__ == '__main__':
+    # Round-trip check: with no edits the output must equal the input.
+    # Without files, check pages with a stray '<' and a tag that never closes
+    pages = {path: None for path in sys.argv[1:]} or {
+        'bare <': '<p>1 < 2, a<b? x < y</p><!-- c --><div class="k">3<4</div><',
+        'unclosed tag': '<p>a <b and no close' + ' ' * MAX_TAG_LENGTH + '</p><div>after</div>',
+    }
+    for path, original in pages.items():
+        if original is None:
+            with open(path, 'r', newline='') as f:
+                original = f.read()
+        print(f"{'✅' if transform(original, []) == original else '❌'} {path}")
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Image Optimizer
+Re-encodes travel website images in their own format (JPEG stays JPEG, PNG
+stays PNG) and remembers the result in a manifest keyed by content hash and
+encoder settings. An image whose bytes were already produced or accepted
+by an earlier run is skipped without being decoded, and a JPEG that was
+already saved at or below the target quality is left alone instead of
+losing another generation.
+
+Requires Pillow (pip install Pillow).
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+from atomic_file import atomic_open, write_atomic
+
+MANIFEST_PATH = os.environ.get('IMAGE_MANIFEST', 'data/image_manifest.json')
+DEFAULT_QUALITY = 85
+
+# Bump when the encoding below changes so old manifest entries stop matching
+ENCODER_VERSION = 1
+
+# Per-job limits: images above MAX_PIXELS are refused, and a full-size decode
+# must fit in the memory budget. Images are never downscaled to fit: the
+# original is the site's only copy (image_variants.py makes smaller ones)
+MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', '100000000'))
+MEMORY_BUDGET_MB = int(os.environ.get('IMAGE_MEMORY_BUDGET_MB', '256'))
+
+BYTES_PER_PIXEL = {'1': 1, 'L': 1, 'P': 1, 'LA': 2, 'I;16': 2, 'RGB': 3, 'YCbCr': 3,
+                   'RGBA': 4, 'CMYK': 4, 'I': 4, 'F': 4}
+
+# A JPEG whose estimated quality is at most target + margin was already
+# re-encoded; another pass costs quality and saves next to nothing
+REENCODE_MARGIN = 5
+
+# IJG standard luminance quantization table (quality 50)
+STD_LUMINANCE = [
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99,
+]
+
+
+def settings_key(quality):
+    return f"v{ENCODER_VERSION}:q{quality}"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scaled_table_sum(quality):
+    scale = 5000 / quality if quality < 50 else 200 - 2 * quality
+    return sum(min(max(int((value * scale + 50) / 100), 1), 255) for value in STD_LUMINANCE)
+
+
+_TABLE_SUMS = {quality: _scaled_table_sum(quality) for quality in range(1, 101)}
+
+
+def estimate_jpeg_quality(img):
+    """
+    Estimate the IJG quality a JPEG was saved with from its luminance
+    quantization table. Returns None for non-JPEGs or missing tables.
+    """
+    tables = getattr(img, 'quantization', None)
+    if not tables or 0 not in tables:
+        return None
+    total = sum(tables[0])
+    return min(_TABLE_SUMS, key=lambda quality: (abs(_TABLE_SUMS[quality] - total), -quality))
+
+
+def decode_cost(size, mode, scale=1):
+    """
+    Bytes needed to decode an image at 1/scale: the pixels plus one working
+    copy for mode conversion and encoding.
+    """
+    width = -(-size[0] // scale)
+    height = -(-size[1] // scale)
+    return width * height * BYTES_PER_PIXEL.get(mode, 4) * 2
+
+
+def image_decode_cost(image_path):
+    """Full-size decode cost in bytes, read from the header alone (0 if unreadable)."""
+    try:
+        from PIL import Image
+        with Image.open(image_path) as img:
+            return decode_cost(img.size, img.mode)
+    except Exception:
+        return 0
+
+
+class OptimizationManifest:
+    """
+    Content hashes known to be optimal for given settings.
+    Entries are {"status": "optimized" | "kept", "size": bytes}.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, entries=None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        try:
+            with open(path, 'r') as f:
+                return cls(path, json.load(f))
+        except FileNotFoundError:
+            return cls(path)
+        except ValueError as e:
+            print(f"⚠️ Ignoring unreadable image manifest {path}: {e}")
+            return cls(path)
+
+    def lookup(self, content_hash, quality):
+        return self.entries.get(f"{content_hash}:{settings_key(quality)}")
+
+    def record(self, content_hash, quality, entry):
+        self.entries[f"{content_hash}:{settings_key(quality)}"] = entry
+
+    def update(self, result):
+        """Merge the records an optimize_image() result carries."""
+        for content_hash, quality, entry in result.get('records', ()):
+            self.record(content_hash, quality, entry)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_open(self.path) as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+
+
+def _encode(img, quality):
+    """Re-encode in the image's own format; returns (bytes, format) or (None, format)."""
+    fmt = img.format
+    options = {}
+    if img.info.get('icc_profile'):
+        options['icc_profile'] = img.info['icc_profile']
+    if fmt == 'JPEG':
+        if img.info.get('exif'):
+            options['exif'] = img.info['exif']
+        if img.mode not in ('RGB', 'L', 'CMYK'):
+            img = img.convert('RGB')
+        options.update(quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        # Lossless: keep the mode (palette, alpha) and only squeeze the deflate stream
+        options.update(optimize=True)
+    else:
+        return None, fmt
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **options)
+    return buffer.getvalue(), fmt
+
+
+def optimize_image(image_path, quality=DEFAULT_QUALITY, manifest=None,
+                   memory_budget_mb=MEMORY_BUDGET_MB):
+    """
+    Optimize a single image in place.
+    The result dict carries 'records' for the manifest; the caller merges
+    them with OptimizationManifest.update() and saves. 'timings' holds the
+    decode and encode seconds when the image was actually re-encoded. An
+    image whose full decode does not fit `memory_budget_mb` fails with
+    'oversized' set (the checker runs those in its large-image pool); the
+    file is only ever replaced by a re-encode at the same dimensions.
+    """
+    if not os.path.exists(image_path):
+        return {'success': False, 'error': 'File not found'}
+
+    original_size = os.path.getsize(image_path)
+    content_hash = file_sha256(image_path)
+
+    if manifest is not None:
+        entry = manifest.lookup(content_hash, quality)
+        if entry is not None:
+            return {
+                'success': True,
+                'original_size': original_size,
+                'optimized_size': original_size,
+                'savings': 0,
+                'savings_percent': 0,
+                'cached': True,
+                'records': [],
+                'message': "Already optimized (cached)"
+            }
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return {'success': False, 'error': 'PIL/Pillow not available'}
+    # Pillow's own decompression-bomb guard, in line with ours
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+    kept = {'status': 'kept', 'size': original_size}
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size
+            unchanged = {
+                'success': True,
+                'original_size': original_size,
+                'optimized_size': original_size,
+                'savings': 0,
+                'savings_percent': 0,
+                'dimensions': f"{width}x{height}",
+                'records': [(content_hash, quality, kept)],
+            }
+
+            if width * height > MAX_PIXELS:
+                return {'success': False,
+                        'error': f"{width}x{height} is over the {MAX_PIXELS / 1e6:.0f} MP limit"}
+
+            if img.format == 'JPEG':
+                # Header only: the quantization tables are read without decoding
+                estimated = estimate_jpeg_quality(img)
+                if estimated is not None and estimated <= quality + REENCODE_MARGIN:
+                    return dict(unchanged, message=f"Already compressed (~q{estimated}), left as is")
+
+            needed = decode_cost(img.size, img.mode)
+            if needed > memory_budget_mb * 1024 * 1024:
+                return {'success': False, 'oversized': True,
+                        'error': f"needs {needed / (1024 * 1024):.0f} MB to decode, "
+                                 f"budget is {memory_budget_mb} MB"}
+
+            started = time.monotonic()
+            img.load()
+            decoded = time.monotonic()
+            data, fmt = _encode(img, quality)
+            timings = {'decode_s': decoded - started, 'encode_s': time.monotonic() - decoded}
+            new_width, new_height = img.size
+            if data is None:
+                return dict(unchanged, message=f"Unsupported format {fmt}, left as is")
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+    if (new_width, new_height) != (width, height):
+        # Never write fewer pixels over the original
+        return {'success': False,
+                'error': f"decoded at {new_width}x{new_height}, expected {width}x{height}; left as is"}
+    if len(data) >= original_size:
+        return dict(unchanged, timings=timings, message="Already optimized")
+
+    # write_atomic uses a unique temp name next to the image: two workers (or a
+    # leftover from a killed run) never share one, and the image keeps its mode
+    try:
+        write_atomic(image_path, data)
+    except OSError as e:
+        return {'success': False, 'error': str(e)}
+
+    savings = original_size - len(data)
+    savings_percent = savings / original_size * 100
+    output_hash = hashlib.sha256(data).hexdigest()
+    return {
+        'success': True,
+        'original_size': original_size,
+        'optimized_size': len(data),
+        'savings': savings,
+        'savings_percent': savings_percent,
+        'dimensions': f"{new_width}x{new_height}",
+        # The new bytes are what a later run will see; don't touch them again
+        'records': [(output_hash, quality, {'status': 'optimized', 'size': len(data)})],
+        'touched': [os.path.abspath(image_path)],
+        'timings': timings,
+        'message': f"Reduced by {savings_percent:.1f}%"
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: image_optimizer.py IMAGE [IMAGE ...]")
+        return 1
+    manifest = OptimizationManifest.load()
+    for path in sys.argv[1:]:
+        result = optimize_image(path, manifest=manifest)
+        if result['success']:
+            manifest.update(result)
+            print(f"✅ {path}: {result['message']}")
+        else:
+            print(f"❌ {path}: {result['error']}")
+    manifest.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
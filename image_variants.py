@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Variants
+Turns each travel website photo into several widths in AVIF, WebP and JPEG
+from a single decode, and records them in a manifest the HTML tooling
+reads to emit `srcset`, `<picture>` and CSS `image-set()` markup.
+
+JPEG sources are decoded with draft mode (the decoder's own 1/2, 1/4, 1/8
+scaling) at the smallest scale that still covers the largest variant, and
+each width is resized from the next larger one with a reducing gap, so the
+expensive full-size decode happens at most once per image.
+
+Requires Pillow (pip install Pillow); AVIF needs Pillow 11.2+ with libavif
+or the pillow-avif-plugin package and is skipped when unavailable.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from atomic_file import atomic_open
+from image_optimizer import MEMORY_BUDGET_MB, decode_cost, file_sha256
+
+VARIANTS_DIR = 'variants'
+MANIFEST_NAME = 'variants.json'
+WIDTHS = (480, 768, 1200, 1920)
+
+# Listed best first: <picture> and image-set() offer formats in this order
+FORMATS = {
+    'avif': {'pil': 'AVIF', 'ext': '.avif', 'mime': 'image/avif',
+             'options': {'quality': 55, 'speed': 6}},
+    'webp': {'pil': 'WEBP', 'ext': '.webp', 'mime': 'image/webp',
+             'options': {'quality': 80, 'method': 4}},
+    'jpeg': {'pil': 'JPEG', 'ext': '.jpg', 'mime': 'image/jpeg',
+             'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+
+def available_formats():
+    """Formats this Pillow build can write, best first."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return []
+    try:
+        import pillow_avif  # noqa: F401 - registers AVIF on older Pillow
+    except ImportError:
+        pass
+    Image.init()
+    return [name for name, spec in FORMATS.items() if spec['pil'] in Image.SAVE]
+
+
+def target_widths(source_width, widths=WIDTHS):
+    """Widths to generate; never upscale, and always offer at least one."""
+    chosen = [width for width in widths if width < source_width]
+    if source_width <= max(widths):
+        chosen.append(source_width)
+    return sorted(set(chosen)) or [source_width]
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with atomic_open(path) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _decode(image_path, max_width, memory_budget_mb=MEMORY_BUDGET_MB):
+    """
+    Open and decode once, letting the JPEG decoder downscale when it can.
+    Returns the upright image and its full-size (width, height); raises
+    ValueError if even the reduced decode would exceed the memory budget.
+    """
+    from PIL import Image, ImageOps
+
+    img = Image.open(image_path)
+    width, height = img.size
+    # EXIF orientations 5-8 are rotated by 90 degrees: the page width is the file's height
+    rotated = img.getexif().get(0x0112) in (5, 6, 7, 8)
+    if rotated:
+        width, height = height, width
+    if img.format == 'JPEG' and max_width < width:
+        # draft() picks the smallest DCT scale that is still >= the request
+        scaled = (max_width, max(1, height * max_width // width))
+        img.draft('RGB', scaled[::-1] if rotated else scaled)
+    # After draft() the size is what will actually be decoded
+    needed = decode_cost(img.size, img.mode)
+    if needed > memory_budget_mb * 1024 * 1024:
+        img.close()
+        raise ValueError(f"needs {needed / (1024 * 1024):.0f} MB to decode, "
+                         f"budget is {memory_budget_mb} MB")
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+    return img, (width, height)
+
+
+def generate_variants(image_path, out_dir, site_root='.', widths=WIDTHS, formats=None,
+                      content_hash=None):
+    """
+    Write every width x format variant of one image into `out_dir`.
+    Returns the manifest entry (paths are relative to `site_root`).
+    """
+    from PIL import Image
+
+    formats = formats or available_formats()
+    with Image.open(image_path) as probe:
+        rotated = probe.getexif().get(0x0112) in (5, 6, 7, 8)
+        source_width = probe.size[1] if rotated else probe.size[0]
+    sizes = target_widths(source_width, widths)
+
+    img, (width, height) = _decode(image_path, max(sizes))
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+
+    entry = {
+        'sha256': content_hash or file_sha256(image_path),
+        'width': width,
+        'height': height,
+        'variants': {name: [] for name in formats},
+    }
+    current = img
+    for size in sorted(sizes, reverse=True):
+        variant_height = max(1, round(height * size / width))
+        if current.size != (size, variant_height):
+            # reducing_gap lets Pillow reduce() by whole factors before the
+            # final Lanczos pass; each width is cut from the previous one
+            current = current.resize((size, variant_height), Image.LANCZOS, reducing_gap=3.0)
+        for name in formats:
+            spec = FORMATS[name]
+            frame = current.convert('RGB') if name == 'jpeg' and current.mode != 'RGB' else current
+            path = os.path.join(out_dir, f"{stem}-{size}w{spec['ext']}")
+            with atomic_open(path, 'wb') as f:
+                frame.save(f, spec['pil'], **spec['options'])
+            entry['variants'][name].append({
+                'width': size,
+                'height': variant_height,
+                'path': os.path.relpath(path, site_root).replace(os.sep, '/'),
+                'bytes': os.path.getsize(path),
+            })
+    for variants in entry['variants'].values():
+        variants.sort(key=lambda variant: variant['width'])
+    return entry
+
+
+def srcset(entry, fmt='jpeg'):
+    """`srcset` value for one format: "a-480w.jpg 480w, a-768w.jpg 768w"."""
+    return ', '.join(f"{variant['path']} {variant['width']}w"
+                     for variant in entry['variants'].get(fmt, []))
+
+
+def pick_variant(entry, fmt, min_width):
+    """Smallest variant of `fmt` at least `min_width` wide (else the largest)."""
+    variants = entry['variants'].get(fmt, [])
+    for variant in variants:
+        if variant['width'] >= min_width:
+            return variant
+    return variants[-1] if variants else None
+
+
+def image_set(entry, min_width):
+    """CSS image-set() offering every format at roughly `min_width` pixels."""
+    candidates = []
+    for fmt in FORMATS:
+        variant = pick_variant(entry, fmt, min_width)
+        if variant:
+            candidates.append(f"url('{variant['path']}') type('{FORMATS[fmt]['mime']}')")
+    return f"image-set({', '.join(candidates)})"
+
+
+def background_css(selector, entry, breakpoints=(480, 768, 1200)):
+    """
+    background-image rules for `selector` that serve a small file to small
+    screens: a JPEG fallback first, then image-set() per breakpoint.
+    """
+    fallback = pick_variant(entry, 'jpeg', breakpoints[0])
+    rules = []
+    if fallback:
+        rules.append(f"{selector} {{ background-image: url('{fallback['path']}'); }}")
+    previous = 0
+    for width in breakpoints:
+        media = f"(min-width: {previous + 1}px)" if previous else None
+        rule = f"{selector} {{ background-image: {image_set(entry, width)}; }}"
+        rules.append(f"@media {media} {{ {rule} }}" if media else rule)
+        previous = width
+    rule = f"{selector} {{ background-image: {image_set(entry, max(WIDTHS))}; }}"
+    rules.append(f"@media (min-width: {previous + 1}px) {{ {rule} }}")
+    return '\n'.join(rules)
+
+
+def picture_html(entry, alt='', sizes='100vw', css_class=None):
+    """<picture> element with one <source> per modern format and a JPEG <img>."""
+    sources = [f'<source type="{FORMATS[fmt]["mime"]}" srcset="{srcset(entry, fmt)}" sizes="{sizes}">'
+               for fmt in FORMATS if fmt != 'jpeg' and entry['variants'].get(fmt)]
+    fallback = pick_variant(entry, 'jpeg', 768) or {'path': ''}
+    class_attr = f' class="{css_class}"' if css_class else ''
+    img = (f'<img src="{fallback["path"]}" srcset="{srcset(entry, "jpeg")}" sizes="{sizes}" '
+           f'width="{entry["width"]}" height="{entry["height"]}" alt="{alt}"{class_attr}>')
+    return '<picture>' + ''.join(sources) + img + '</picture>'
+
+
+def build_variants(paths, site_root='.', manifest_path=None, widths=WIDTHS, force=False):
+    """
+    Generate variants for every image in `paths` (files or directories),
+    skipping sources whose hash matches the manifest. Returns the manifest.
+    """
+    manifest_path = manifest_path or os.path.join(site_root, 'images', MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    formats = available_formats()
+    if not formats:
+        print("❌ PIL/Pillow not available (pip install Pillow)")
+        return manifest
+
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, dirnames, filenames in os.walk(path):
+                # Don't treat earlier output as sources
+                dirnames[:] = [d for d in dirnames if d != VARIANTS_DIR]
+                sources.extend(os.path.join(directory, name) for name in sorted(filenames)
+                               if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+        else:
+            sources.append(path)
+
+    for source in sources:
+        key = os.path.relpath(source, site_root).replace(os.sep, '/')
+        previous = manifest.get(key)
+        content_hash = file_sha256(source)
+        if (not force and previous and previous['sha256'] == content_hash
+                and set(previous['variants']) == set(formats)):
+            continue
+        try:
+            out_dir = os.path.join(os.path.dirname(source), VARIANTS_DIR)
+            manifest[key] = generate_variants(source, out_dir, site_root, widths, formats,
+                                              content_hash)
+        except Exception as e:
+            print(f"❌ {key}: {e}")
+            continue
+        original = os.path.getsize(source)
+        smallest = min(variants[0]['bytes'] for variants in manifest[key]['variants'].values())
+        print(f"✅ {key}: {len(formats)} format(s) x {len(manifest[key]['variants'][formats[0]])} "
+              f"width(s); smallest {smallest / 1024:.0f} KB vs {original / 1024:.0f} KB original")
+    save_manifest(manifest_path, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate responsive image variants')
+    parser.add_argument('paths', nargs='+', help='images or directories of images')
+    parser.add_argument('--site-root', default='.', help='paths in the manifest are relative to this')
+    parser.add_argument('--manifest', help='default: SITE_ROOT/images/variants.json')
+    parser.add_argument('--widths', default=','.join(map(str, WIDTHS)))
+    parser.add_argument('--force', action='store_true', help='regenerate unchanged sources')
+    args = parser.parse_args()
+
+    widths = tuple(int(width) for width in args.widths.split(','))
+    build_variants(args.paths, args.site_root, args.manifest, widths, args.force)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
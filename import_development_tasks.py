@@ -3,135 +3,223 @@
 Import development tasks from SQL files into the database
 """
 
+import argparse
+import hashlib
+import json
 import os
-import subprocess
-import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def run_command(cmd):
-    """Run a shell command and return output."""
+import travel_db
+from atomic_file import atomic_open
+from sql_insert_parser import iter_insert_ideas
+from travel_db import DatabaseError
+
+DEFAULT_SQL_FILES = [
+    "/Users/fudongli/clawd/travel-website/insert_layout_tasks.sql",
+    "/Users/fudongli/clawd/travel-website/insert_new_ideas.sql",
+    "/Users/fudongli/clawd/travel-website/insert_more_new_ideas.sql",
+    "/Users/fudongli/clawd/travel-website/insert_beijing_layout_ideas.sql"
+]
+
+# Above this much SQL in total, parse in worker processes instead of threads
+PROCESS_POOL_THRESHOLD = 4 * 1024 * 1024
+
+# Remembers how far each SQL file has been imported
+MANIFEST_PATH = os.environ.get('IMPORT_MANIFEST', 'data/import_manifest.json')
+
+def load_manifest(path=MANIFEST_PATH):
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return 1, "", str(e)
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"⚠️ Ignoring unreadable import manifest {path}: {e}")
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with atomic_open(path) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
 
-def extract_ideas_from_sql(filepath):
-    """Extract development ideas from SQL file."""
+def hash_prefix(filepath, length):
+    """sha256 of the first `length` bytes of a file."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def plan_file(filepath, stat, entry):
+    """
+    Compare a file (and its os.stat result) with its manifest entry.
+    Returns ('unchanged', None), ('append', offset) or ('full', 0).
+    """
+    if not entry:
+        return 'full', 0
+    if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+        return 'unchanged', None
+    # Only appended to: the part already imported is byte-for-byte the same
+    offset = entry['offset']
+    if stat.st_size >= offset and hash_prefix(filepath, offset) == entry['sha256']:
+        if stat.st_size == offset:
+            return 'unchanged', None
+        return 'append', offset
+    return 'full', 0
+
+def extract_ideas_from_sql(filepath, start=0):
+    """
+    Extract development ideas from SQL file, starting at byte `start`.
+    Returns (ideas, offset) where offset is just past the last complete
+    statement, i.e. where the next incremental import should resume.
+    """
     ideas = []
-    
+    offset = start
     if not os.path.exists(filepath):
-        return ideas
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Find all INSERT statements
-    insert_pattern = r"INSERT INTO.*VALUES\s*\(('[^']+')\)"
-    matches = re.findall(insert_pattern, content, re.IGNORECASE | re.DOTALL)
-    
-    for match in matches:
-        # Remove quotes and clean up
-        idea = match.strip("'")
-        ideas.append(idea)
-    
-    return ideas
+        return ideas, offset
+    with open(filepath, 'rb') as f:
+        for idea, statement_end in iter_insert_ideas(f, start):
+            ideas.append(idea)
+            if statement_end is not None:
+                offset = statement_end
+    return ideas, offset
 
-def check_if_idea_exists(idea):
-    """Check if an idea already exists in the database."""
-    # Escape single quotes for SQL
-    escaped_idea = idea.replace("'", "''")
-    
-    cmd = f"""
-    psql -d travel_website -U fudongli -h localhost -c "
-    SELECT COUNT(*) 
-    FROM travel.travel_development_ideas 
-    WHERE idea = '{escaped_idea}';" -t -A
+def _extract_job(job):
+    return extract_ideas_from_sql(*job)
+
+def extract_ideas_from_files(jobs):
     """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    
-    if returncode == 0 and stdout.strip().isdigit():
-        return int(stdout.strip()) > 0
-    return False
-
-def import_idea_to_database(idea):
-    """Import a single idea into the database."""
-    # Escape single quotes for SQL
-    escaped_idea = idea.replace("'", "''")
-    
-    cmd = f"""
-    psql -d travel_website -U fudongli -h localhost -c "
-    INSERT INTO travel.travel_development_ideas (idea) 
-    VALUES ('{escaped_idea}');"
+    Parse several (path, start) jobs concurrently; returns one
+    (ideas, offset) result per job, in the same order. Tokenizing is
+    CPU-bound, so big inputs go to worker processes; small ones are not
+    worth the process start-up.
     """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    return returncode == 0
+    if len(jobs) < 2:
+        return [_extract_job(job) for job in jobs]
+    total_size = sum(os.path.getsize(path) - start for path, start in jobs)
+    workers = min(len(jobs), os.cpu_count() or 1)
+    if total_size >= PROCESS_POOL_THRESHOLD and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    with executor:
+        return list(executor.map(_extract_job, jobs))
+
+def manifest_entry(filepath, stat, offset):
+    # `stat` is taken before parsing, so a write racing the import is
+    # noticed on the next run
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'offset': offset,
+        'sha256': hash_prefix(filepath, offset),
+    }
+
+def import_ideas_to_database(ideas):
+    """Import all ideas in one bulk statement; returns (imported, skipped) or None."""
+    try:
+        return travel_db.import_ideas(ideas)
+    except DatabaseError as e:
+        print(f"   ❌ Database error: {e}")
+        return None
 
 def main():
+    parser = argparse.ArgumentParser(description='Import development ideas from SQL files')
+    parser.add_argument('sql_files', nargs='*', default=DEFAULT_SQL_FILES,
+                        help='SQL files to import (default: the travel website task files)')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the import manifest and re-read every file')
+    args = parser.parse_args()
+
     print("📥 IMPORTING DEVELOPMENT TASKS FROM SQL FILES")
     print("=" * 50)
     
-    # SQL files to check
-    sql_files = [
-        "/Users/fudongli/clawd/travel-website/insert_layout_tasks.sql",
-        "/Users/fudongli/clawd/travel-website/insert_new_ideas.sql",
-        "/Users/fudongli/clawd/travel-website/insert_more_new_ideas.sql",
-        "/Users/fudongli/clawd/travel-website/insert_beijing_layout_ideas.sql"
-    ]
-    
-    total_imported = 0
-    total_skipped = 0
+    manifest = {} if args.full else load_manifest()
+    all_ideas = []
     
-    for sql_file in sql_files:
+    jobs = []
+    stats = {}
+    refreshed = False
+    for sql_file in args.sql_files:
         if not os.path.exists(sql_file):
             print(f"❌ File not found: {sql_file}")
             continue
-        
+        stat = os.stat(sql_file)
+        action, offset = plan_file(sql_file, stat, manifest.get(os.path.abspath(sql_file)))
+        if action == 'unchanged':
+            print(f"⏭️  Unchanged: {os.path.basename(sql_file)}")
+            entry = manifest[os.path.abspath(sql_file)]
+            if (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+                # Touched but not changed: store the new mtime so the next
+                # run skips it without hashing it again
+                entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+                refreshed = True
+            continue
+        jobs.append((sql_file, offset))
+        stats[sql_file] = stat
+    
+    if not jobs:
+        if refreshed:
+            save_manifest(manifest)
+        print("\n✅ All SQL files unchanged since the last import, nothing to do")
+        print("=" * 50)
+        return
+    
+    offsets = {}
+    for (sql_file, start), (ideas, offset) in zip(jobs, extract_ideas_from_files(jobs)):
         print(f"\n📋 Processing: {os.path.basename(sql_file)}")
-        ideas = extract_ideas_from_sql(sql_file)
+        if start:
+            print(f"   Resuming after byte {start} (file was appended to)")
+        offsets[sql_file] = offset
         
         if not ideas:
             print("   No ideas found in file")
             continue
         
         print(f"   Found {len(ideas)} idea(s)")
-        
-        for idea in ideas:
-            # Check if already exists
-            if check_if_idea_exists(idea):
-                print(f"   ⏭️  Skipping (already in DB): {idea[:60]}...")
-                total_skipped += 1
-            else:
-                # Import to database
-                if import_idea_to_database(idea):
-                    print(f"   ✅ Imported: {idea[:60]}...")
-                    total_imported += 1
-                else:
-                    print(f"   ❌ Failed to import: {idea[:60]}...")
+        all_ideas.extend(ideas)
+    
+    # One set-based import for every file: existing ideas are skipped in SQL
+    total_imported = 0
+    total_skipped = 0
+    imported_ok = True
+    if all_ideas:
+        print(f"\n📥 Importing {len(all_ideas)} candidate idea(s)...")
+        result = import_ideas_to_database(all_ideas)
+        if result is None:
+            print("   ❌ Import failed, nothing was imported")
+            imported_ok = False
+        else:
+            total_imported, total_skipped = result
+    
+    # Only remember files whose ideas are safely in the database
+    if imported_ok:
+        for sql_file, offset in offsets.items():
+            manifest[os.path.abspath(sql_file)] = manifest_entry(sql_file, stats[sql_file], offset)
+    if imported_ok or refreshed:
+        save_manifest(manifest)
     
     # Print summary
     print("\n" + "=" * 50)
     print("📊 IMPORT SUMMARY")
     print(f"✅ Imported: {total_imported} new idea(s)")
-    print(f"⏭️  Skipped: {total_skipped} existing idea(s)")
+    print(f"⏭️  Skipped: {total_skipped} existing or duplicate idea(s)")
     
     # Show current database status
     print("\n📊 DATABASE STATUS AFTER IMPORT:")
-    cmd = """
-    psql -d travel_website -U fudongli -h localhost -c "
-    SELECT 
-        COUNT(*) as total_tasks,
-        COUNT(CASE WHEN is_fixed THEN 1 END) as completed,
-        COUNT(CASE WHEN NOT is_fixed THEN 1 END) as pending
-    FROM travel.travel_development_ideas;"
-    """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if returncode == 0:
-        print(stdout.strip())
+    try:
+        print(travel_db.format_task_status(travel_db.get_task_status()))
+    except DatabaseError as e:
+        print(f"❌ Could not read database status: {e}")
     
     print("=" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local Kitco Stand-in
+Serves recorded (or built-in sample) Kitco silver pages with injected delays,
+errors, padding and bandwidth throttling, so the scrapers, the fetch layer and
+load_test_scraper.py can be exercised without hitting kitco.com.
+POST requests are recorded, so it also stands in for an alert webhook.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Live Silver Price | Kitco</title></head>
+<body>
+<h2>Live Charts</h2>
+<div class="bid">Bid
+<h3>85.03</h3>
++5.91 (+7.47%)
+</div>
+<div class="ask">Ask 85.28</div>
+<ul>
+<li>ounce85.03+5.91</li>
+<li>gram2.73+0.19</li>
+<li>Kilo2,733.82+190.11</li>
+</ul>
+</body>
+</html>
+"""
+
+
+class StandinConfig:
+    """Failure and latency knobs shared by all request handlers."""
+
+    def __init__(self, delay=0.0, slow_rate=0.0, slow_delay=5.0,
+                 error_rate=0.0, error_status=503, seed=None,
+                 pages=None, pad_bytes=0, bandwidth=0, max_inflight=0):
+        self.delay = delay
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.served = 0                     # pages handed out by next_body()
+        self.throttled = 0
+        self.inflight = 0
+        self.max_inflight = max_inflight    # 0 = unlimited, else 429 above it
+        self.bandwidth = bandwidth          # bytes/second per response, 0 = unlimited
+        self.bodies = [pad_page(page, pad_bytes).encode()
+                       for page in (pages or [SAMPLE_PAGE])]
+        self.webhooks = []                  # JSON bodies POSTed to the stand-in
+
+    def next_body(self):
+        """Recorded pages are served round-robin."""
+        with self.lock:
+            self.served += 1
+            return self.bodies[(self.served - 1) % len(self.bodies)]
+
+    def enter(self):
+        """Count an in-flight request; False if it should be throttled."""
+        with self.lock:
+            if self.max_inflight and self.inflight >= self.max_inflight:
+                self.throttled += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.inflight -= 1
+
+    def next_outcome(self):
+        """Return (delay_seconds, error_status_or_None) for the next request."""
+        with self.lock:
+            self.requests += 1
+            roll_slow = self.random.random()
+            roll_error = self.random.random()
+        delay = self.delay
+        if roll_slow < self.slow_rate:
+            delay += self.slow_delay
+        status = self.error_status if roll_error < self.error_rate else None
+        return delay, status
+
+
+def pad_page(page, pad_bytes):
+    """Grow a page to roughly real Kitco size with filler placed before the price."""
+    if pad_bytes <= 0:
+        return page
+    lines = ('x' * 70 + '\n') * (pad_bytes // 71 + 1)
+    filler = '<!--\n' + lines[:pad_bytes] + '-->\n'
+    return page.replace('<body>', '<body>\n' + filler, 1)
+
+
+def load_recorded_pages(directory):
+    """Return the text of every recorded *.html page in a directory."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    config = StandinConfig()
+
+    def do_GET(self):
+        if not self.config.enter():
+            self._send(429, b"too many requests\n")
+            return
+        try:
+            delay, status = self.config.next_outcome()
+            if delay:
+                time.sleep(delay)
+            if status:
+                self._send(status, f"injected error {status}\n".encode())
+            else:
+                self._send(200, self.config.next_body())
+        finally:
+            self.config.leave()
+
+    def do_POST(self):
+        """Webhook stand-in: record the JSON body for later inspection."""
+        length = int(self.headers.get('Content-Length', 0))
+        payload = self.rfile.read(length)
+        delay, status = self.config.next_outcome()
+        if delay:
+            time.sleep(delay)
+        if status:
+            self._send(status, f"injected error {status}\n".encode())
+            return
+        try:
+            record = json.loads(payload or b'null')
+        except ValueError:
+            record = payload.decode('utf-8', errors='replace')
+        with self.config.lock:
+            self.config.webhooks.append(record)
+        self._send(200, b"ok\n")
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            if not self.config.bandwidth:
+                self.wfile.write(body)
+                return
+            # Throttle in 100 ms slices to simulate a slow link
+            step = max(1, self.config.bandwidth // 10)
+            for offset in range(0, len(body), step):
+                self.wfile.write(body[offset:offset + step])
+                self.wfile.flush()
+                time.sleep(0.1)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(config=None, host='127.0.0.1', port=0):
+    """Start the stand-in in a background thread; returns (server, base_url)."""
+    handler = type('ConfiguredStandinHandler', (StandinHandler,),
+                   {'config': config or StandinConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/charts/livesilver.html"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Kitco stand-in server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='base delay added to every response (seconds)')
+    parser.add_argument('--slow-rate', type=float, default=0.0,
+                        help='fraction of requests that get --slow-delay extra')
+    parser.add_argument('--slow-delay', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--pages', help='directory of recorded Kitco *.html pages')
+    parser.add_argument('--pad-bytes', type=int, default=0,
+                        help='filler added before the price to enlarge each page')
+    parser.add_argument('--bandwidth', type=int, default=0,
+                        help='per-response throughput limit in bytes/second')
+    parser.add_argument('--max-inflight', type=int, default=0,
+                        help='answer 429 when more requests than this are in flight')
+    args = parser.parse_args()
+
+    pages = load_recorded_pages(args.pages) if args.pages else None
+    if args.pages and not pages:
+        print(f"❌ No *.html pages found in {args.pages}")
+        return 1
+    config = StandinConfig(args.delay, args.slow_rate, args.slow_delay,
+                           args.error_rate, args.error_status, args.seed,
+                           pages, args.pad_bytes, args.bandwidth, args.max_inflight)
+    server, url = start_server(config, port=args.port)
+    print(f"🧪 Kitco stand-in serving {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Scraper Load Test
+Runs each scraping engine against the local Kitco stand-in at increasing
+concurrency and reports throughput, latency percentiles, CPU and peak RSS,
+so the engine for a given poll rate can be picked from data.
+
+Each (engine, concurrency) pair runs in its own worker process, so CPU and
+RSS numbers are not polluted by the stand-in server or other engines.
+Circuit breakers are off in the workers: injected errors would otherwise
+open one and the rest of the run would measure instant refusals.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import kitco_standin
+
+ENGINES = ['requests', 'curl', 'stream', 'async']
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def maxrss_mb(who):
+    """Peak RSS in MB; ru_maxrss is KB on Linux and bytes on macOS."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def cpu_seconds():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (self_usage.ru_utime + self_usage.ru_stime
+            + child_usage.ru_utime + child_usage.ru_stime)
+
+
+def sync_engine(engine):
+    """Return a `url -> price` callable for a thread-based engine."""
+    if engine == 'requests':
+        import silver_scraper_clawdbot
+        return silver_scraper_clawdbot.get_silver_price
+    import silver_scraper_minimal
+    if engine == 'curl':
+        return silver_scraper_minimal.get_silver_price_curl
+    return silver_scraper_minimal.get_silver_price_stream
+
+
+async def async_get_price(url, timeout=10):
+    """Fetch a page with a bare asyncio HTTP/1.1 client and extract the price."""
+    from silver_scraper_minimal import extract_price_from_html
+
+    parsed = urlparse(url)
+    secure = parsed.scheme == 'https'
+    port = parsed.port or (443 if secure else 80)
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parsed.hostname, port, ssl=secure or None), timeout)
+    try:
+        request = (f"GET {path} HTTP/1.1\r\nHost: {parsed.netloc}\r\n"
+                   "User-Agent: Mozilla/5.0\r\nConnection: close\r\n\r\n")
+        writer.write(request.encode())
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+
+    head, _, body = raw.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    if status != 200:
+        return None
+    return extract_price_from_html(body.decode('utf-8', errors='replace'))
+
+
+def run_sync(engine, url, concurrency, total):
+    get_price = sync_engine(engine)
+
+    def one(_):
+        start = time.monotonic()
+        try:
+            ok = get_price(url) is not None
+        except Exception:
+            ok = False
+        return ok, time.monotonic() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(total)))
+
+
+def run_async(url, concurrency, total):
+    async def drive():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with limit:
+                start = time.monotonic()
+                try:
+                    ok = await async_get_price(url) is not None
+                except Exception:
+                    ok = False
+                return ok, time.monotonic() - start
+
+        return await asyncio.gather(*(one() for _ in range(total)))
+
+    return asyncio.run(drive())
+
+
+def run_worker(engine, url, concurrency, total):
+    """Run one engine at one concurrency level; returns a result dict."""
+    cpu_before = cpu_seconds()
+    start = time.monotonic()
+    # The scrapers print progress and errors; keep the worker's stdout for JSON
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if engine == 'async':
+            outcomes = run_async(url, concurrency, total)
+        else:
+            outcomes = run_sync(engine, url, concurrency, total)
+    elapsed = time.monotonic() - start
+
+    latencies = [latency for ok, latency in outcomes if ok]
+    succeeded = len(latencies)
+    return {
+        'engine': engine,
+        'concurrency': concurrency,
+        'requests': total,
+        'succeeded': succeeded,
+        'failed': total - succeeded,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(succeeded / elapsed, 2) if elapsed else 0.0,
+        'latency_p50_ms': _ms(percentile(latencies, 50)),
+        'latency_p95_ms': _ms(percentile(latencies, 95)),
+        'latency_p99_ms': _ms(percentile(latencies, 99)),
+        'cpu_s': round(cpu_seconds() - cpu_before, 3),
+        'rss_mb': round(maxrss_mb(resource.RUSAGE_SELF), 1),
+        # RUSAGE_CHILDREN reports the peak of the largest single child (a curl
+        # process), not the sum over children, so it is kept separate. On Linux
+        # that peak includes the forked interpreter from before the exec
+        'largest_child_rss_mb': round(maxrss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def engine_available(engine):
+    if engine != 'requests':
+        return True
+    try:
+        import requests  # noqa: F401
+        import bs4  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def spawn_worker(engine, url, concurrency, total):
+    """Run a worker in a fresh interpreter with its own fetch state file and no breaker."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        env = dict(os.environ, SILVER_FETCH_STATE=os.path.join(state_dir, 'fetch_state.json'),
+                   SILVER_FETCH_FAILURE_THRESHOLD='0')
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker', engine,
+               '--url', url, '--concurrency', str(concurrency), '--requests', str(total)]
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        return {'engine': engine, 'concurrency': concurrency,
+                'error': result.stderr.strip().splitlines()[-1:] or ['worker failed']}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def print_table(results):
+    header = (f"{'engine':<9} {'conc':>5} {'ok':>6} {'fail':>5} {'req/s':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu s':>7} {'rss MB':>7} {'child MB':>9}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        if 'error' in r:
+            print(f"{r['engine']:<9} {r['concurrency']:>5}  ❌ {r['error'][0]}")
+            continue
+        print(f"{r['engine']:<9} {r['concurrency']:>5} {r['succeeded']:>6} {r['failed']:>5} "
+              f"{r['throughput_rps']:>8} {str(r['latency_p50_ms']):>8} "
+              f"{str(r['latency_p95_ms']):>8} {str(r['latency_p99_ms']):>8} "
+              f"{r['cpu_s']:>7} {r['rss_mb']:>7.1f} {r['largest_child_rss_mb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the silver scrapers')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f"comma-separated subset of {', '.join(ENGINES)}")
+    parser.add_argument('--concurrency', default='1,4,16,64',
+                        help='comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='requests per (engine, concurrency) run')
+    parser.add_argument('--url', help='target an already running server instead')
+    parser.add_argument('--json', help='also write results to this JSON file')
+    # Stand-in server knobs (see kitco_standin.py)
+    parser.add_argument('--pages')
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-delay', type=float, default=2.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--pad-bytes', type=int, default=0)
+    parser.add_argument('--bandwidth', type=int, default=0)
+    parser.add_argument('--max-inflight', type=int, default=0)
+    parser.add_argument('--worker', choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.url, levels[0], args.requests)))
+        return 0
+
+    url = args.url
+    if not url:
+        pages = kitco_standin.load_recorded_pages(args.pages) if args.pages else None
+        config = kitco_standin.StandinConfig(
+            args.delay, args.slow_rate, args.slow_delay, args.error_rate,
+            pages=pages, pad_bytes=args.pad_bytes, bandwidth=args.bandwidth,
+            max_inflight=args.max_inflight)
+        server, url = kitco_standin.start_server(config)
+
+    print("🏋️ SCRAPER LOAD TEST")
+    print(f"🎯 Target: {url}")
+    print("=" * 60)
+
+    results = []
+    for engine in args.engines.split(','):
+        if not engine_available(engine):
+            print(f"⏭️  Skipping {engine}: requests/BeautifulSoup not installed")
+            continue
+        for level in levels:
+            print(f"🔄 {engine} @ concurrency {level}...")
+            results.append(spawn_worker(engine, url, level, args.requests))
+
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'url': url, 'results': results}, f, indent=2)
+        print(f"\n📁 Results written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
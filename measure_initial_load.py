@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Initial Load Measurement
+Adds up the bytes a browser requests when it first loads a travel website
+page, using the files in the local site checkout, and compares it with an
+earlier version of the page.
+
+Counted at initial load: the page, stylesheets, scripts, preload/icon
+links, <img> without loading="lazy", and url() images in style attributes
+and <style> blocks. Deferred: data-bg backgrounds (swapped in by the
+carousel's lazy-load script) and lazy <img>. Each distinct URL is one
+request. Files referenced from inside stylesheets are not followed, and
+<noscript> content is skipped.
+
+    python3 measure_initial_load.py                         # index.html under TRAVEL_WEBSITE_PATH
+    python3 measure_initial_load.py --before HEAD~1         # vs. the page at a git revision
+    python3 measure_initial_load.py --before old.html --json
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+from urllib.parse import unquote, urlsplit
+
+from html_transform import parse_attributes, tokenize
+
+TRAVEL_WEBSITE_PATH = os.environ.get('TRAVEL_WEBSITE_PATH', "/Users/fudongli/clawd/travel-website")
+CSS_URL = re.compile(r"""url\(\s*["']?([^"')\s]+)["']?\s*\)""")
+CATEGORIES = {
+    '.css': 'css', '.js': 'js', '.mjs': 'js',
+    '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.gif': 'image', '.webp': 'image',
+    '.avif': 'image', '.svg': 'image', '.ico': 'image',
+    '.woff': 'font', '.woff2': 'font', '.ttf': 'font', '.otf': 'font',
+}
+# <link rel=...> values the browser fetches during load
+FETCHED_LINKS = {'stylesheet', 'preload', 'icon', 'shortcut', 'apple-touch-icon', 'modulepreload'}
+
+
+def find_requests(document):
+    """
+    (initial, deferred, images without dimensions): URL lists in document
+    order, from one pass over the page's tokens.
+    """
+    initial, deferred = [], []
+    undimensioned = 0
+    raw = None              # 'script' or 'style' while inside one
+    noscript = 0
+
+    for kind, text, name in tokenize(io.StringIO(document)):
+        if kind == 'text':
+            if raw == 'style' and not noscript:
+                initial.extend(CSS_URL.findall(text))
+            continue
+        if kind == 'endtag':
+            if name == 'noscript':
+                noscript = max(0, noscript - 1)
+            if name == raw:
+                raw = None
+            continue
+        if kind != 'starttag':
+            continue
+        if name == 'noscript':
+            noscript += 1
+            continue
+        if name in ('script', 'style'):
+            raw = name
+        if noscript:
+            continue
+
+        attrs = parse_attributes(text[len(name) + 1:-1])
+        if attrs.get('style'):
+            initial.extend(CSS_URL.findall(attrs['style']))
+        if attrs.get('data-bg'):
+            deferred.append(attrs['data-bg'])
+        if name == 'link' and attrs.get('href'):
+            rel = set((attrs.get('rel') or '').lower().split())
+            if rel & FETCHED_LINKS:
+                initial.append(attrs['href'])
+        elif name == 'script' and attrs.get('src'):
+            initial.append(attrs['src'])
+        elif name == 'img' and attrs.get('src'):
+            if (attrs.get('loading') or '').lower() == 'lazy':
+                deferred.append(attrs['src'])
+            else:
+                initial.append(attrs['src'])
+            if not (attrs.get('width') and attrs.get('height')):
+                undimensioned += 1
+    return initial, deferred, undimensioned
+
+
+def resolve(url, site_root, base_dir):
+    """Local file for `url`, or None for remote / data URLs."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or url.startswith('data:'):
+        return None
+    path = unquote(parts.path)
+    if path.startswith('/'):
+        return os.path.join(site_root, path.lstrip('/'))
+    return os.path.normpath(os.path.join(site_root, base_dir, path))
+
+
+def measure(document, site_root, page_path):
+    """Bytes and requests at initial load for `document` served as `page_path`."""
+    base_dir = os.path.dirname(page_path)
+    initial, deferred, undimensioned = find_requests(document)
+
+    def tally(urls):
+        seen = set()
+        stats = {'requests': 0, 'bytes': 0, 'by_category': {}, 'remote': [], 'missing': []}
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            stats['requests'] += 1
+            path = resolve(url, site_root, base_dir)
+            if path is None:
+                stats['remote'].append(url)
+                continue
+            if not os.path.isfile(path):
+                stats['missing'].append(url)
+                continue
+            size = os.path.getsize(path)
+            category = CATEGORIES.get(os.path.splitext(path)[1].lower(), 'other')
+            totals = stats['by_category'].setdefault(category, {'requests': 0, 'bytes': 0})
+            totals['requests'] += 1
+            totals['bytes'] += size
+            stats['bytes'] += size
+        return stats
+
+    page_bytes = len(document.encode('utf-8'))
+    loaded = tally(initial)
+    loaded['requests'] += 1
+    loaded['bytes'] += page_bytes
+    loaded['by_category']['page'] = {'requests': 1, 'bytes': page_bytes}
+    initial_urls = set(initial)
+    later = tally(url for url in deferred if url not in initial_urls)
+    return {'page': page_path, 'initial': loaded, 'deferred': later,
+            'images_without_dimensions': undimensioned}
+
+
+def load_before(before, site_root, page_path):
+    """An earlier page: a file path, or a git revision of the site repository."""
+    if os.path.isfile(before):
+        with open(before, 'r') as f:
+            return f.read()
+    result = subprocess.run(['git', '-C', site_root, 'show', f'{before}:{page_path}'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(f"{before} is neither a file nor a revision with {page_path}: "
+                         f"{result.stderr.strip()}")
+    return result.stdout
+
+
+def format_kb(size):
+    return f"{size / (1024 * 1024):.2f} MB" if size >= 1024 * 1024 else f"{size / 1024:.1f} KB"
+
+
+def print_measurement(label, result):
+    initial, deferred = result['initial'], result['deferred']
+    print(f"📄 {label}: {initial['requests']} request(s), {format_kb(initial['bytes'])} at initial load"
+          f" (+ {deferred['requests']} deferred, {format_kb(deferred['bytes'])})")
+    print('   ' + ' | '.join(f"{category} {format_kb(totals['bytes'])} ({totals['requests']})"
+                             for category, totals in sorted(initial['by_category'].items())))
+    if initial['remote']:
+        print(f"   🌐 {len(initial['remote'])} remote request(s) not sized")
+    if initial['missing']:
+        print(f"   ⚠️ {len(initial['missing'])} missing file(s): {', '.join(initial['missing'][:5])}")
+    if result['images_without_dimensions']:
+        print(f"   📐 {result['images_without_dimensions']} <img> without width/height (layout shift)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bytes requested at initial page load, before and after')
+    parser.add_argument('page', nargs='?', default='index.html', help='page, relative to --site')
+    parser.add_argument('--site', default=TRAVEL_WEBSITE_PATH, help='website repository')
+    parser.add_argument('--before', help='earlier version of the page: a file or a git revision')
+    parser.add_argument('--json', action='store_true', help='print the measurements as JSON')
+    args = parser.parse_args()
+
+    with open(os.path.join(args.site, args.page), 'r') as f:
+        document = f.read()
+    results = {'after': measure(document, args.site, args.page)}
+    if args.before:
+        try:
+            results['before'] = measure(load_before(args.before, args.site, args.page),
+                                        args.site, args.page)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    if 'before' in results:
+        print_measurement(f"{args.page} @ {args.before}", results['before'])
+    print_measurement(args.page, results['after'])
+    if 'before' in results:
+        before, after = results['before']['initial'], results['after']['initial']
+        change = (after['bytes'] - before['bytes']) / before['bytes'] * 100 if before['bytes'] else 0.0
+        print(f"{'📉' if after['bytes'] <= before['bytes'] else '📈'} Initial load "
+              f"{format_kb(before['bytes'])} → {format_kb(after['bytes'])} ({change:+.0f}%), "
+              f"{before['requests']} → {after['requests']} request(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
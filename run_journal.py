@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Run Journal and Lock
+Keeps travel_development_checker.py runs from overlapping and lets an
+interrupted run be resumed instead of redone.
+
+RunLock is an exclusive flock() on a pid file, held for the whole run.
+The kernel drops it when the holder exits or is killed, so a dead run
+never leaves a stale lock behind and there is no takeover to race over;
+the file's pid/host only say who holds it.
+
+RunJournal is an append-only JSON-lines checkpoint file:
+    {"event": "start", "time": ...}                    one per run
+    {"event": "claimed", "ids": [...]}                 tasks taken by the run
+    {"event": "started", "id": 7}                      task handed to a worker
+    {"event": "done", "id": 7, "result": {...}}        task finished
+    {"event": "drained"}                               claims released, none in flight
+    {"event": "committed"}                             touched files are in git
+A run that finishes cleanly deletes the journal. If it is still there at
+start-up, the previous run was interrupted (or could not commit): its
+finished tasks are replayed without redoing the work, its touched files
+are committed, and tasks that had started (not merely been claimed) in
+several interrupted runs are given up on, i.e. set aside for review,
+instead of taking every run down with them.
+"""
+
+import fcntl
+import json
+import os
+import socket
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+JOURNAL_PATH = os.environ.get('CHECKER_JOURNAL', 'data/checker_journal.jsonl')
+LOCK_PATH = os.environ.get('CHECKER_LOCK', 'data/checker.lock')
+
+# Tasks in flight during this many interrupted runs are given up on
+MAX_INTERRUPTED_ATTEMPTS = 3
+
+
+class LockHeld(Exception):
+    """Another live run holds the lock; `info` describes it."""
+
+    def __init__(self, info):
+        self.info = info
+        super().__init__(f"pid {info.get('pid')} on {info.get('host')} since {info.get('started')}")
+
+
+# Lock files held by this process. A forked worker (ProcessPoolExecutor on
+# Linux) would otherwise share the lock and keep it alive after we die.
+_held_fds = set()
+
+
+def _close_in_child():
+    for fd in _held_fds:
+        os.close(fd)
+    _held_fds.clear()
+
+
+os.register_at_fork(after_in_child=_close_in_child)
+
+
+class RunLock:
+    """Single-instance lock: flock() on a pid file."""
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self.held = False
+        self._fd = None
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # The holder has not written its pid yet
+            return {}
+
+    def acquire(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                raise LockHeld(self._read() or {})
+            # The previous holder removes the file on release; if that happened
+            # between open() and flock(), this lock is on an unlinked file
+            try:
+                current = os.path.samestat(os.fstat(fd), os.stat(self.path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            os.close(fd)
+
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps({'pid': os.getpid(), 'host': socket.gethostname(),
+                                 'started': datetime.now().isoformat(timespec='seconds'),
+                                 'timestamp': time.time()}).encode())
+        self._fd = fd
+        _held_fds.add(fd)
+        self.held = True
+        return self
+
+    def release(self):
+        if self.held:
+            self.held = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            _held_fds.discard(self._fd)
+            os.close(self._fd)  # drops the flock
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class RunJournal:
+    """
+    Per-task checkpoints for the current run plus what an interrupted run
+    left. With `readonly`, only loads what is there: no start event is
+    written and the checkpoint methods cannot be used.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, readonly=False):
+        self.path = path
+        self.done = {}          # task id -> result saved by an earlier, interrupted run
+        self.attempts = Counter()
+        self.uncommitted = set()
+        self._file = None
+        self._load()
+        if readonly:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a')
+        self._write({'event': 'start', 'time': datetime.now().isoformat(timespec='seconds'),
+                     'pid': os.getpid()})
+
+    @property
+    def resumed(self):
+        return bool(self.done or self.attempts or self.uncommitted)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        in_flight = set()
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # a torn last line from the kill
+            kind = event.get('event')
+            if kind == 'start':
+                # The run before this one was interrupted
+                self.attempts.update(in_flight)
+                in_flight = set()
+            elif kind == 'started':
+                # Only tasks a worker actually picked up can have caused the crash
+                in_flight.add(event['id'])
+            elif kind == 'done':
+                self.done[event['id']] = event['result']
+                in_flight.discard(event['id'])
+                self.uncommitted.update(event['result'].get('touched', ()))
+            elif kind == 'drained':
+                in_flight = set()
+            elif kind == 'committed':
+                self.uncommitted.clear()
+        self.attempts.update(in_flight)
+        for task_id in self.done:
+            self.attempts.pop(task_id, None)
+
+    def _write(self, event):
+        if self._file is None:
+            raise ValueError(f"{self.path} was opened read-only")
+        # Flushed per line: a killed process loses nothing it wrote
+        self._file.write(json.dumps(event) + '\n')
+        self._file.flush()
+
+    def claimed(self, task_ids):
+        self._write({'event': 'claimed', 'ids': list(task_ids)})
+
+    def started(self, task_id):
+        self._write({'event': 'started', 'id': task_id})
+
+    def task_done(self, task_id, result):
+        keep = {key: result[key] for key in ('message', 'note', 'touched', 'records', 'savings')
+                if key in result}
+        self.done[task_id] = keep
+        self._write({'event': 'done', 'id': task_id, 'result': keep})
+
+    def drained(self):
+        self._write({'event': 'drained'})
+
+    def committed(self):
+        self.uncommitted.clear()
+        self._write({'event': 'committed'})
+
+    def gave_up(self, task_id):
+        """True if this task had started in too many interrupted runs."""
+        return self.attempts[task_id] >= MAX_INTERRUPTED_ATTEMPTS
+
+    def finish(self):
+        """Clean end of run: nothing left to resume."""
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Stop writing but keep the journal (e.g. the run failed)."""
+        self._file.close()
+
+
+if __name__ == '__main__':
+    # Show what an interrupted run left behind
+    if not os.path.exists(JOURNAL_PATH):
+        print("✅ No journal: the last run finished cleanly")
+        sys.exit(0)
+    journal = RunJournal(readonly=True)
+    print(f"🔄 Interrupted run: {len(journal.done)} finished task(s) to replay, "
+          f"{len(journal.attempts)} in flight, {len(journal.uncommitted)} uncommitted file(s)")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Checker Run Reports
+Machine-readable report of one travel_development_checker.py run, plus
+rolling statistics over recent runs.
+
+Each run writes its full report (every task with its type, duration and
+bytes saved) to data/checker_reports/run-<timestamp>.json and appends a
+one-line summary to data/checker_runs.jsonl. The summaries are what the
+rolling stats read: whether the backlog is shrinking, throughput, and
+where the time goes (task work, image decode/encode, DB, git).
+
+    python3 run_report.py [--window 20] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORT_DIR = os.environ.get('CHECKER_REPORTS', 'data/checker_reports')
+RUNS_PATH = os.environ.get('CHECKER_RUNS', 'data/checker_runs.jsonl')
+# Full reports kept on disk; the summaries in RUNS_PATH are kept for good
+REPORTS_KEPT = 50
+TIMERS = ('db', 'git')
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class RunReport:
+    """Collects what one run did; `finish()` turns it into a dict."""
+
+    def __init__(self, mode='once'):
+        self.mode = mode
+        self.started = datetime.now()
+        self._start = time.monotonic()
+        self.pending_before = None
+        self.pending_after = None
+        self.claimed = 0
+        self.tasks = []
+        self.timers = {name: 0.0 for name in TIMERS}
+
+    @contextmanager
+    def timer(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.monotonic() - start
+
+    def add_task(self, task, type_name, result):
+        timings = result.get('timings', {})
+        self.tasks.append({
+            'id': task['id'],
+            'type': type_name,
+            'success': bool(result.get('success')),
+            'duration_s': round(result.get('duration_s', 0.0), 4),
+            'decode_s': round(timings.get('decode_s', 0.0), 4),
+            'encode_s': round(timings.get('encode_s', 0.0), 4),
+            'bytes_saved': result.get('savings', 0) if result.get('success') else 0,
+            'cached': bool(result.get('cached')),
+            'error': None if result.get('success') else result.get('error'),
+        })
+
+    def finish(self):
+        """The full report; 'summary' is what goes into the runs file."""
+        elapsed = time.monotonic() - self._start
+        completed = [task for task in self.tasks if task['success']]
+        by_type = {}
+        for task in self.tasks:
+            stats = by_type.setdefault(task['type'] or 'unmatched',
+                                       {'count': 0, 'failed': 0, 'total_s': 0.0, 'durations': []})
+            stats['count'] += 1
+            stats['failed'] += not task['success']
+            stats['total_s'] += task['duration_s']
+            stats['durations'].append(task['duration_s'])
+        for stats in by_type.values():
+            durations = stats.pop('durations')
+            stats['total_s'] = round(stats['total_s'], 3)
+            stats['p50_s'] = percentile(durations, 50)
+            stats['p95_s'] = percentile(durations, 95)
+
+        summary = {
+            'started': self.started.isoformat(timespec='seconds'),
+            'mode': self.mode,
+            'elapsed_s': round(elapsed, 3),
+            'pending_before': self.pending_before,
+            'pending_after': self.pending_after,
+            'claimed': self.claimed,
+            'completed': len(completed),
+            'failed': len(self.tasks) - len(completed),
+            'tasks_per_s': round(len(completed) / elapsed, 2) if elapsed else 0.0,
+            'bytes_saved': sum(task['bytes_saved'] for task in completed),
+            'task_s': round(sum(task['duration_s'] for task in self.tasks), 3),
+            'decode_s': round(sum(task['decode_s'] for task in self.tasks), 3),
+            'encode_s': round(sum(task['encode_s'] for task in self.tasks), 3),
+            'db_s': round(self.timers['db'], 3),
+            'git_s': round(self.timers['git'], 3),
+            'by_type': by_type,
+        }
+        return {'summary': summary, 'tasks': self.tasks}
+
+    def save(self, report_dir=REPORT_DIR, runs_path=RUNS_PATH):
+        """Write the full report and append its summary; returns the report path."""
+        report = self.finish()
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"run-{self.started.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        directory = os.path.dirname(runs_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(runs_path, 'a') as f:
+            f.write(json.dumps(dict(report['summary'], report=path)) + '\n')
+
+        reports = sorted(name for name in os.listdir(report_dir) if name.startswith('run-'))
+        for name in reports[:-REPORTS_KEPT]:
+            os.remove(os.path.join(report_dir, name))
+        return path
+
+
+def format_summary(summary):
+    """A few human-readable lines for the end of a run."""
+    lines = [f"⏱️  {summary['elapsed_s']:.1f}s wall: tasks {summary['task_s']:.1f}s "
+             f"(decode {summary['decode_s']:.1f}s, encode {summary['encode_s']:.1f}s), "
+             f"DB {summary['db_s']:.1f}s, git {summary['git_s']:.1f}s"]
+    if summary['pending_before'] is not None and summary['pending_after'] is not None:
+        lines.append(f"📉 Backlog: {summary['pending_before']} → {summary['pending_after']} pending")
+    lines.append(f"💾 Saved {summary['bytes_saved'] / 1024:.0f} KB; "
+                 f"{summary['tasks_per_s']} task(s)/s")
+    return '\n'.join(lines)
+
+
+def load_runs(runs_path=RUNS_PATH, window=20):
+    """The last `window` run summaries, oldest first."""
+    try:
+        with open(runs_path, 'r') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    runs = []
+    for line in lines[-window:]:
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            continue
+    return runs
+
+
+def rolling_stats(runs):
+    """Aggregate run summaries: backlog trend, throughput and the time split."""
+    if not runs:
+        return {'runs': 0}
+    depths = [(run['pending_before'], run['pending_after']) for run in runs
+              if run.get('pending_before') is not None and run.get('pending_after') is not None]
+    elapsed = sum(run['elapsed_s'] for run in runs)
+    completed = sum(run['completed'] for run in runs)
+    time_split = {key: round(sum(run.get(f"{key}_s", 0.0) for run in runs), 3)
+                  for key in ('task', 'decode', 'encode', 'db', 'git')}
+    by_type = {}
+    for run in runs:
+        for name, stats in run.get('by_type', {}).items():
+            total = by_type.setdefault(name, {'count': 0, 'failed': 0, 'total_s': 0.0, 'max_p95_s': 0.0})
+            total['count'] += stats['count']
+            total['failed'] += stats['failed']
+            total['total_s'] += stats['total_s']
+            total['max_p95_s'] = max(total['max_p95_s'], stats.get('p95_s') or 0.0)
+    for total in by_type.values():
+        total['mean_s'] = round(total['total_s'] / total['count'], 4) if total['count'] else 0.0
+        total['total_s'] = round(total['total_s'], 3)
+
+    stats = {
+        'runs': len(runs),
+        'first': runs[0]['started'],
+        'last': runs[-1]['started'],
+        'completed': completed,
+        'failed': sum(run['failed'] for run in runs),
+        'tasks_per_s': round(completed / elapsed, 2) if elapsed else 0.0,
+        'bytes_saved': sum(run['bytes_saved'] for run in runs),
+        'time_s': dict(time_split, wall=round(elapsed, 3)),
+        'by_type': by_type,
+    }
+    if depths:
+        stats['backlog_first'] = depths[0][0]
+        stats['backlog_last'] = depths[-1][1]
+        # Net change per run; new imports between runs count against it
+        stats['backlog_change_per_run'] = round((depths[-1][1] - depths[0][0]) / len(depths), 1)
+        stats['backlog_shrinking'] = depths[-1][1] < depths[0][0]
+    return stats
+
+
+def print_stats(stats):
+    if not stats['runs']:
+        print("📊 No checker runs recorded yet")
+        return
+    print(f"📊 Last {stats['runs']} run(s), {stats['first']} → {stats['last']}")
+    print(f"   ✅ {stats['completed']} completed, ❌ {stats['failed']} failed, "
+          f"{stats['tasks_per_s']} task(s)/s, {stats['bytes_saved'] / (1024 * 1024):.1f} MB saved")
+    if 'backlog_first' in stats:
+        trend = '📉 shrinking' if stats['backlog_shrinking'] else '📈 not shrinking'
+        print(f"   {trend}: {stats['backlog_first']} → {stats['backlog_last']} pending "
+              f"({stats['backlog_change_per_run']:+} per run)")
+    split = stats['time_s']
+    print(f"   ⏱️  wall {split['wall']:.1f}s: tasks {split['task']:.1f}s (decode {split['decode']:.1f}s, "
+          f"encode {split['encode']:.1f}s), DB {split['db']:.1f}s, git {split['git']:.1f}s")
+    for name, total in sorted(stats['by_type'].items(), key=lambda item: -item[1]['total_s']):
+        print(f"   🏷️  {name}: {total['count']} task(s), mean {total['mean_s']}s, "
+              f"worst p95 {total['max_p95_s']}s, {total['failed']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling statistics over recent checker runs')
+    parser.add_argument('--window', type=int, default=20, help='number of recent runs')
+    parser.add_argument('--json', action='store_true', help='print the stats as JSON')
+    args = parser.parse_args()
+
+    stats = rolling_stats(load_runs(window=args.window))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print_stats(stats)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
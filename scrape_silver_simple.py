@@ -11,6 +11,8 @@ from datetime import datetime
 import re
 import sys
 
+from silver_alerts import notify_price
+
 def extract_price_from_web_fetch_output(content):
     """
     Extract silver price from web_fetch output.
@@ -99,6 +101,9 @@ def save_to_csv(price, filename='data/silver_prices.csv'):
             writer.writerow(price_data)
             
         print(f"✅ Price ${price:.2f} saved to {filename}")
+        
+        # Evaluate alert rules; delivery happens in the background
+        notify_price(price, timestamp)
         return True
         
     except Exception as e:
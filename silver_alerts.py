@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Silver Price Alerts
+Evaluates alert rules on every saved price and delivers messages through a
+background queue that batches and rate-limits sends to a pluggable sink
+(webhook, Telegram, or stdout). Capture never waits on delivery.
+"""
+
+import atexit
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from urllib.request import Request, urlopen
+
+from atomic_file import atomic_open
+
+STATE_PATH = os.environ.get('SILVER_ALERT_STATE', 'data/alert_state.json')
+RULES_PATH = os.environ.get('SILVER_ALERT_RULES', 'alert_rules.json')
+
+DEFAULT_RULES = {
+    'above': None,          # Alert when the price crosses above this
+    'below': None,          # Alert when the price crosses below this
+    'percent_move': 2.0,    # Alert when a tick moves this many percent
+    'new_high_low': True,   # Alert on all-time highs and lows
+}
+
+
+class ThresholdRule:
+    """Fires when the price crosses a fixed level, not on every tick past it."""
+
+    def __init__(self, above=None, below=None):
+        self.above = above
+        self.below = below
+
+    def check(self, price, state):
+        last = state.last_price
+        if last is None:
+            return None
+        if self.above is not None and last <= self.above < price:
+            return f"📈 Silver crossed above ${self.above:.2f}: now ${price:.2f}"
+        if self.below is not None and last >= self.below > price:
+            return f"📉 Silver crossed below ${self.below:.2f}: now ${price:.2f}"
+        return None
+
+
+class PercentMoveRule:
+    """Fires when a tick moves at least `percent` from the previous tick."""
+
+    def __init__(self, percent):
+        self.percent = percent
+
+    def check(self, price, state):
+        last = state.last_price
+        if not last:
+            return None
+        change = (price - last) / last * 100
+        if abs(change) >= self.percent:
+            arrow = '🔺' if change > 0 else '🔻'
+            return f"{arrow} Silver moved {change:+.2f}%: ${last:.2f} → ${price:.2f}"
+        return None
+
+
+class NewHighLowRule:
+    """Fires when the price beats the highest or lowest price seen so far."""
+
+    def check(self, price, state):
+        if state.high is not None and price > state.high:
+            return f"🏆 New silver high: ${price:.2f} (previous ${state.high:.2f})"
+        if state.low is not None and price < state.low:
+            return f"🕳️ New silver low: ${price:.2f} (previous ${state.low:.2f})"
+        return None
+
+
+class AlertState:
+    """Running state the rules need: last price plus high/low watermarks."""
+
+    def __init__(self, last_price=None, high=None, low=None, last_timestamp=None):
+        self.last_price = last_price
+        self.high = high
+        self.low = low
+        self.last_timestamp = last_timestamp
+
+    def update(self, price, timestamp):
+        self.last_price = price
+        self.last_timestamp = timestamp
+        self.high = price if self.high is None else max(self.high, price)
+        self.low = price if self.low is None else min(self.low, price)
+
+    @classmethod
+    def load(cls, path=STATE_PATH, csv_path='data/silver_prices.csv', skip_timestamp=None):
+        """
+        Load saved state; seed it from the CSV history on first use.
+        `skip_timestamp` leaves out the row for the tick being evaluated.
+        """
+        try:
+            with open(path, 'r') as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Rebuilding unreadable alert state {path}: {e}")
+
+        state = cls()
+        if os.path.exists(csv_path):
+            with open(csv_path, 'r', newline='') as f:
+                for row in csv.DictReader(f):
+                    if row.get('timestamp') == skip_timestamp:
+                        continue
+                    try:
+                        state.update(float(row['price_usd']), row['timestamp'])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        return state
+
+    def save(self, path=STATE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_open(path) as f:
+            json.dump(self.__dict__, f, indent=2)
+
+
+def load_rules(path=RULES_PATH):
+    """Build rule objects from a JSON file, falling back to DEFAULT_RULES."""
+    config = dict(DEFAULT_RULES)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            config.update(json.load(f))
+
+    rules = []
+    if config['above'] is not None or config['below'] is not None:
+        rules.append(ThresholdRule(config['above'], config['below']))
+    if config['percent_move']:
+        rules.append(PercentMoveRule(config['percent_move']))
+    if config['new_high_low']:
+        rules.append(NewHighLowRule())
+    return rules
+
+
+class PrintSink:
+    def send(self, messages):
+        for message in messages:
+            print(f"🔔 {message}")
+
+
+class WebhookSink:
+    """POSTs {"messages": [...]} as JSON to a URL."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, messages):
+        body = json.dumps({'messages': messages}).encode()
+        request = Request(self.url, data=body, method='POST',
+                          headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class TelegramSink:
+    """Sends a batch as one Telegram message via the Bot API."""
+
+    def __init__(self, token, chat_id, timeout=10):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def send(self, messages):
+        body = json.dumps({'chat_id': self.chat_id, 'text': '\n'.join(messages)}).encode()
+        request = Request(self.url, data=body, method='POST',
+                          headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def sink_from_env():
+    """Pick a sink from SILVER_ALERT_WEBHOOK or TELEGRAM_BOT_TOKEN/TELEGRAM_CHAT_ID."""
+    if os.environ.get('SILVER_ALERT_WEBHOOK'):
+        return WebhookSink(os.environ['SILVER_ALERT_WEBHOOK'])
+    if os.environ.get('TELEGRAM_BOT_TOKEN') and os.environ.get('TELEGRAM_CHAT_ID'):
+        return TelegramSink(os.environ['TELEGRAM_BOT_TOKEN'], os.environ['TELEGRAM_CHAT_ID'])
+    return PrintSink()
+
+
+class AlertDispatcher:
+    """
+    Background delivery queue.
+
+    Messages are collected for up to `batch_window` seconds (or `batch_size`
+    messages) and sent as one batch, at most one send per `min_interval`
+    seconds. `submit` never blocks: when the queue is full the message is
+    dropped and counted.
+    """
+
+    def __init__(self, sink, batch_size=20, batch_window=0.5, min_interval=1.0,
+                 max_queue=1000, retries=2):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.min_interval = min_interval
+        self.retries = retries
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._last_send = 0.0
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, message):
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=10):
+        """Flush what is queued, waiting at most `timeout` seconds."""
+        self._closing.set()
+        self._thread.join(timeout)
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._closing.is_set():
+                    return
+                continue
+
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            for attempt in range(self.retries + 1):
+                try:
+                    self.sink.send(batch)
+                    self.sent += len(batch)
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        self.failed += len(batch)
+                        print(f"⚠️ Alert delivery failed: {e}")
+                    else:
+                        time.sleep(0.5 * (attempt + 1))
+            self._last_send = time.monotonic()
+
+
+class AlertPipeline:
+    """Rules plus state plus delivery; call on_tick for each saved price."""
+
+    def __init__(self, rules=None, dispatcher=None, state=None, state_path=STATE_PATH):
+        self.rules = load_rules() if rules is None else rules
+        self.dispatcher = dispatcher or AlertDispatcher(sink_from_env())
+        self.state = state
+        self.state_path = state_path
+
+    def on_tick(self, price, timestamp):
+        """Evaluate every rule against this tick and queue any alerts."""
+        if self.state is None:
+            # The tick is usually already in the CSV; don't compare it to itself
+            self.state = AlertState.load(self.state_path, skip_timestamp=timestamp)
+        messages = []
+        for rule in self.rules:
+            message = rule.check(price, self.state)
+            if message:
+                messages.append(message)
+                self.dispatcher.submit(message)
+        self.state.update(price, timestamp)
+        self.state.save(self.state_path)
+        return messages
+
+    def close(self, timeout=10):
+        self.dispatcher.close(timeout)
+
+
+_pipeline = None
+
+
+def notify_price(price, timestamp):
+    """
+    Alert hook for the scrapers' write path.
+    Errors are reported but never propagate into price capture.
+    """
+    global _pipeline
+    try:
+        if _pipeline is None:
+            _pipeline = AlertPipeline()
+            atexit.register(_pipeline.close)
+        return _pipeline.on_tick(price, timestamp)
+    except Exception as e:
+        print(f"⚠️ Alert evaluation failed: {e}")
+        return []
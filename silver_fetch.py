@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Resilient Fetch Layer
+Hedged requests and per-source circuit breakers for the silver scrapers.
+Latency samples and breaker state persist between runs in a small JSON file,
+so a cron job that runs once a day still learns from earlier runs.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+from atomic_file import atomic_open
+
+STATE_PATH = os.environ.get('SILVER_FETCH_STATE', 'data/fetch_state.json')
+
+MAX_SAMPLES = 200           # Latency samples kept per source
+MIN_SAMPLES = 20            # Samples needed before trusting the observed p95
+DEFAULT_HEDGE_DELAY = 2.0   # Seconds to wait before hedging with no history
+MIN_HEDGE_DELAY = 0.05      # Never hedge faster than this
+# Consecutive failures that open the breaker; 0 turns breakers off
+FAILURE_THRESHOLD = int(os.environ.get('SILVER_FETCH_FAILURE_THRESHOLD', '3'))
+RESET_TIMEOUT = 15 * 60     # Seconds an open breaker waits before a trial call
+
+
+class FetchError(Exception):
+    """Raised when no attempt for a source returned a page."""
+
+
+class CircuitOpenError(FetchError):
+    """Raised when a source's circuit breaker is open."""
+
+
+class SourceStats:
+    """Latency history and circuit breaker state for one source."""
+
+    def __init__(self, samples=None, failures=0, opened_at=None,
+                 successes=0, total_failures=0, hedges=0):
+        self.samples = list(samples or [])
+        self.failures = failures
+        self.opened_at = opened_at
+        self.successes = successes
+        self.total_failures = total_failures
+        self.hedges = hedges
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return {
+            'samples': self.samples[-MAX_SAMPLES:],
+            'failures': self.failures,
+            'opened_at': self.opened_at,
+            'successes': self.successes,
+            'total_failures': self.total_failures,
+            'hedges': self.hedges,
+        }
+
+    def percentile(self, pct):
+        """Return the given latency percentile, or None without enough history."""
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def hedge_delay(self):
+        """Seconds to wait on the first request before sending a hedge."""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, p95)
+
+    def state(self, now=None):
+        """Return 'closed', 'open' or 'half-open'."""
+        if self.opened_at is None:
+            return 'closed'
+        now = time.time() if now is None else now
+        if now - self.opened_at >= RESET_TIMEOUT:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self, now=None):
+        return not FAILURE_THRESHOLD or self.state(now) != 'open'
+
+    def record_success(self, latency):
+        self.samples.append(round(latency, 4))
+        del self.samples[:-MAX_SAMPLES]
+        self.failures = 0
+        self.opened_at = None
+        self.successes += 1
+
+    def record_failure(self, now=None):
+        now = time.time() if now is None else now
+        self.failures += 1
+        self.total_failures += 1
+        if not FAILURE_THRESHOLD:
+            return
+        # A failed half-open trial re-opens the breaker for another full period
+        if self.opened_at is not None or self.failures >= FAILURE_THRESHOLD:
+            self.opened_at = now
+
+
+class FetchState:
+    """Per-source stats, loaded from and saved to a JSON file."""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.sources = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        state = cls(path)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            for name, stats in data.get('sources', {}).items():
+                state.sources[name] = SourceStats.from_dict(stats)
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable fetch state {path}: {e}")
+        return state
+
+    def source(self, name):
+        with self._lock:
+            if name not in self.sources:
+                self.sources[name] = SourceStats()
+            return self.sources[name]
+
+    def save(self):
+        """Write state atomically so a crash never leaves a half-written file."""
+        with self._lock:
+            data = {'sources': {name: stats.to_dict()
+                                for name, stats in self.sources.items()}}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # atomic_open uses a unique temp name, so concurrent fetches save independently
+        try:
+            with atomic_open(self.path) as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not save fetch state: {e}")
+
+
+def source_key(url):
+    """Breakers and latency stats are tracked per host."""
+    return urlparse(url).netloc or url
+
+
+def _attempt(fetcher, url, timeout, results):
+    start = time.monotonic()
+    try:
+        text = fetcher(url, timeout)
+        results.put((True, text, time.monotonic() - start))
+    except Exception as e:
+        results.put((False, e, time.monotonic() - start))
+
+
+def _launch(fetcher, url, timeout, results):
+    # Daemon threads: a losing attempt must not hold the process open at exit
+    thread = threading.Thread(target=_attempt, args=(fetcher, url, timeout, results),
+                              daemon=True)
+    thread.start()
+
+
+def fetch_page(url, fetcher, timeout=10, hedge=True, state=None):
+    """
+    Fetch a page through `fetcher(url, timeout) -> text`.
+
+    A second, hedged request is sent if the first one is still running after
+    the source's observed p95 latency, or straight away if the first one fails.
+    The first successful response wins. Raises CircuitOpenError while the
+    source's breaker is open and FetchError when every attempt failed.
+    """
+    if state is None:
+        state = FetchState.load()
+    name = source_key(url)
+    stats = state.source(name)
+
+    if not stats.allow_request():
+        retry_in = RESET_TIMEOUT - (time.time() - stats.opened_at)
+        raise CircuitOpenError(
+            f"circuit open for {name} after {stats.failures} failures, "
+            f"retrying in {retry_in:.0f}s"
+        )
+
+    results = queue.Queue()
+    deadline = time.monotonic() + timeout
+    _launch(fetcher, url, timeout, results)
+    in_flight = 1
+    # Half-open breakers get a single trial request, never a hedge
+    can_hedge = hedge and stats.state() == 'closed'
+    hedge_at = time.monotonic() + stats.hedge_delay()
+    errors = []
+
+    try:
+        while in_flight:
+            now = time.monotonic()
+            if now >= deadline:
+                errors.append(TimeoutError(f"no response within {timeout}s"))
+                break
+            wait_until = min(deadline, hedge_at) if can_hedge else deadline
+            try:
+                ok, value, latency = results.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if can_hedge and time.monotonic() >= hedge_at:
+                    _launch(fetcher, url, max(0.0, deadline - time.monotonic()), results)
+                    in_flight += 1
+                    can_hedge = False
+                    stats.hedges += 1
+                continue
+
+            in_flight -= 1
+            if ok:
+                stats.record_success(latency)
+                return value
+
+            errors.append(value)
+            if can_hedge:
+                # The first attempt failed fast; use the hedge as a retry
+                _launch(fetcher, url, max(0.0, deadline - time.monotonic()), results)
+                in_flight += 1
+                can_hedge = False
+                stats.hedges += 1
+
+        stats.record_failure()
+        raise FetchError(f"all attempts for {name} failed: "
+                         + '; '.join(str(e) for e in errors))
+    finally:
+        state.save()
+
+
+def describe_sources(state=None):
+    """Return printable lines summarising each source's stats."""
+    if state is None:
+        state = FetchState.load()
+    lines = []
+    for name, stats in sorted(state.sources.items()):
+        p50 = stats.percentile(50)
+        p95 = stats.percentile(95)
+        lines.append(
+            f"{name}: {stats.state()}, {stats.successes} ok / "
+            f"{stats.total_failures} failed, {stats.hedges} hedged, "
+            f"p50={'n/a' if p50 is None else f'{p50:.3f}s'} "
+            f"p95={'n/a' if p95 is None else f'{p95:.3f}s'}"
+        )
+    return lines
+
+
+if __name__ == '__main__':
+    for line in describe_sources() or ['No fetch statistics recorded yet']:
+        print(line)
@@ -13,7 +13,23 @@ from datetime import datetime
 import subprocess
 import sys
 
-def get_silver_price():
+from silver_alerts import notify_price
+from silver_fetch import fetch_page
+
+KITCO_URL = "https://www.kitco.com/charts/livesilver.html"
+
+def fetch_with_requests(url, timeout):
+    """Fetch a page with requests; raises on HTTP errors."""
+    import requests
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    }
+    response = requests.get(url, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+def get_silver_price(url=KITCO_URL):
     """
     Get silver price using Clawdbot's web_fetch tool.
     Returns price in USD/ounce or None if failed.
@@ -27,13 +43,9 @@ def get_silver_price():
             import requests
             from bs4 import BeautifulSoup
             
-            url = "https://www.kitco.com/charts/livesilver.html"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Hedged, circuit-broken fetch (see silver_fetch.py)
+            html = fetch_page(url, fetch_with_requests, timeout=10)
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Look for price in page text
             page_text = soup.get_text()
@@ -104,6 +116,9 @@ def save_price_to_csv(price, csv_path='data/silver_prices.csv'):
             writer.writerow(data)
         
         print(f"✅ Saved ${price:.2f} to {csv_path}")
+        
+        # Evaluate alert rules; delivery happens in the background
+        notify_price(price, timestamp)
         return True
         
     except Exception as e:
@@ -11,57 +11,102 @@ import subprocess
 from datetime import datetime
 import sys
 
-def get_silver_price_curl():
+from silver_alerts import notify_price
+from silver_fetch import FetchError, fetch_page
+
+KITCO_URL = "https://www.kitco.com/charts/livesilver.html"
+
+def fetch_with_curl(url, timeout):
+    """Fetch a page with curl; raises FetchError on failure."""
+    # --fail turns HTTP errors into a non-zero exit so the breaker sees them
+    cmd = ['curl', '-s', '-S', '-L', '--fail', '-H', 'User-Agent: Mozilla/5.0', url]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    
+    if result.returncode != 0:
+        raise FetchError(f"curl failed: {result.stderr.strip()}")
+    
+    return result.stdout
+
+# Extraction patterns, in priority order
+PRICE_PATTERNS = [
+    r'Bid\s*[\n\s]*\$?(\d+\.\d+)',      # Bid 85.03
+    r'ounce(\d+\.\d+)',                 # ounce85.03
+    r'gram(\d+\.\d+)',                  # gram2.73
+    r'Kilo([\d,]+\.\d+)',               # Kilo2,733.82
+    r'\$(\d+\.\d+)\s*USD.*oz',          # $85.03 USD/oz
+    r'(\d+\.\d+)\s*USD.*ounce',         # 85.03 USD/ounce
+]
+
+BID_PATTERN = re.compile(PRICE_PATTERNS[0], re.IGNORECASE)
+
+def extract_price_from_html(html):
+    """Extract the silver price in USD/ounce from page HTML, or None."""
+    for pattern in PRICE_PATTERNS:
+        matches = re.findall(pattern, html, re.IGNORECASE)
+        if matches:
+            price_str = matches[0].replace(',', '')
+            price = float(price_str)
+            
+            # Convert if needed
+            if 'gram' in pattern:
+                price = price * 28.3495  # grams to ounces
+            elif 'Kilo' in pattern:
+                price = price * 0.0311035  # kilos to ounces
+            
+            return price
+    
+    # Fallback: look for any number that looks like a silver price
+    all_numbers = re.findall(r'\b(\d+\.\d+)\b', html)
+    for num in all_numbers:
+        price = float(num)
+        if 50 < price < 150:  # Reasonable silver price range
+            return price
+    
+    return None
+
+def get_silver_price_curl(url=KITCO_URL):
     """Get silver price using curl and grep."""
     try:
-        url = "https://www.kitco.com/charts/livesilver.html"
-        
-        # Use curl to fetch the page
-        cmd = ['curl', '-s', '-L', '-H', 'User-Agent: Mozilla/5.0', url]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        
-        if result.returncode != 0:
-            print(f"❌ Curl failed: {result.stderr}")
+        # Hedged, circuit-broken fetch (see silver_fetch.py)
+        try:
+            html = fetch_page(url, fetch_with_curl, timeout=10)
+        except FetchError as e:
+            print(f"❌ {e}")
             return None
         
-        html = result.stdout
-        
-        # Try multiple extraction patterns
-        patterns = [
-            r'Bid\s*[\n\s]*\$?(\d+\.\d+)',      # Bid 85.03
-            r'ounce(\d+\.\d+)',                 # ounce85.03
-            r'gram(\d+\.\d+)',                  # gram2.73
-            r'Kilo([\d,]+\.\d+)',               # Kilo2,733.82
-            r'\$(\d+\.\d+)\s*USD.*oz',          # $85.03 USD/oz
-            r'(\d+\.\d+)\s*USD.*ounce',         # 85.03 USD/ounce
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            if matches:
-                price_str = matches[0].replace(',', '')
-                price = float(price_str)
-                
-                # Convert if needed
-                if 'gram' in pattern:
-                    price = price * 28.3495  # grams to ounces
-                elif 'Kilo' in pattern:
-                    price = price * 0.0311035  # kilos to ounces
-                
-                return price
-        
-        # Fallback: look for any number that looks like a silver price
-        all_numbers = re.findall(r'\b(\d+\.\d+)\b', html)
-        for num in all_numbers:
-            price = float(num)
-            if 50 < price < 150:  # Reasonable silver price range
-                return price
+        return extract_price_from_html(html)
         
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return None
+
+def get_silver_price_stream(url=KITCO_URL, timeout=10, chunk_size=16384):
+    """
+    Get silver price with a streaming urllib read, no subprocess.
+    Stops reading as soon as the Bid price is complete; otherwise reads the
+    whole page and falls back to extract_price_from_html.
+    """
+    from urllib.request import Request, urlopen
+    
+    try:
+        request = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with urlopen(request, timeout=timeout) as response:
+            charset = response.headers.get_content_charset() or 'utf-8'
+            buffer = ''
+            scanned = 0
+            while True:
+                chunk = response.read(chunk_size)
+                if not chunk:
+                    break
+                buffer += chunk.decode(charset, errors='replace')
+                # Rescan a small overlap so a match split across chunks is found
+                match = BID_PATTERN.search(buffer, max(0, scanned - 256))
+                scanned = len(buffer)
+                # A match touching the end of the buffer may be a cut-off number
+                if match and match.end() < len(buffer):
+                    return float(match.group(1))
+        return extract_price_from_html(buffer)
         
-    except subprocess.TimeoutExpired:
-        print("❌ Request timeout")
-        return None
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
@@ -104,6 +149,9 @@ def save_to_csv(price, primary_filename='/Users/fudongli/data/silver_prices.csv'
             writer.writerow(data)
         
         print(f"✅ Also saved to repository: {repo_filename}")
+        
+        # Evaluate alert rules; delivery happens in the background
+        notify_price(price, timestamp)
         return True
         
     except Exception as e:
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Streaming SQL INSERT Parser
+Walks a SQL file once, in chunks, and yields the idea from every row of
+every INSERT ... VALUES statement. Handles multi-row VALUES lists, ''
+escapes, E'' strings, -- and /* */ comments, quoted identifiers and
+dollar-quoted strings.
+
+Works on bytes: every token delimiter is ASCII, so UTF-8 text inside
+strings never confuses the tokenizer, and offsets are byte offsets.
+"""
+
+import re
+import sys
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading whitespace is folded into each token to keep the scan loop short
+TOKEN = re.compile(rb"""
+  \s*(?:
+    (?P<line_comment>--[^\n]*(?:\n|\Z))
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<estring>[eE]'(?:[^'\\]|\\.|'')*')
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<dollar>\$\$.*?\$\$|\$(?P<tag>[A-Za-z_]\w*)\$.*?\$(?P=tag)\$)
+  | (?P<ident>"(?:[^"]|"")*")
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<number>\d+(?:\.\d*)?)
+  | (?P<punct>[(),;.])
+  | (?P<other>.)
+  )""", re.VERBOSE | re.DOTALL)
+
+# Characters that start a token which may be incomplete at the end of a chunk
+_OPEN_ENDED = {b"'", b'$', b'-', b'/', b'"'}
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+
+def _unescape_e_string(body):
+    return re.sub(r"\\(.)|''", lambda m: _ESCAPES.get(m.group(1), m.group(1))
+                  if m.group(1) is not None else "'", body)
+
+
+class SqlTokenizer:
+    """
+    Iterator of (kind, value) tokens from a binary stream, skipping
+    whitespace and comments. Strings are decoded and unescaped.
+    `offset` is the stream offset just past the last token returned;
+    `start` is the offset the stream is currently positioned at.
+    """
+
+    def __init__(self, stream, start=0, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.offset = start
+        self.chunk_size = chunk_size
+        self._tokens = self._scan()
+
+    def __iter__(self):
+        # Hand out the generator itself: no extra call per token
+        return self._tokens
+
+    def _scan(self):
+        buffer = b''
+        base = self.offset      # stream offset of buffer[0]
+        pos = 0
+        eof = False
+        chunk_size = self.chunk_size
+
+        while True:
+            match = TOKEN.match(buffer, pos)
+            if match is not None:
+                kind = match.lastgroup
+                end = match.end()
+            # A token at the end of the buffer may continue in the next chunk
+            if not eof and (match is None or end == len(buffer)
+                            or (kind == 'other' and buffer[end - 1:end] in _OPEN_ENDED)
+                            or (kind == 'word' and buffer[end - 1:end + 1] in (b"e'", b"E'"))
+                            # 'it' + "'" may be the start of 'it''s'
+                            or (kind in ('string', 'estring', 'ident')
+                                and buffer[end:end + 1] == buffer[end - 1:end])):
+                chunk = self.stream.read(chunk_size)
+                if not chunk:
+                    eof = True
+                buffer = buffer[pos:] + chunk
+                base += pos
+                pos = 0
+                # Grow the read size so one huge token is not rescanned per chunk
+                chunk_size = max(chunk_size, len(buffer) - len(chunk))
+                continue
+            if match is None:
+                return
+
+            pos = end
+            if kind in ('line_comment', 'block_comment'):
+                continue
+            raw = match.group(kind)
+
+            self.offset = base + pos
+            if kind == 'string':
+                yield 'string', raw[1:-1].decode('utf-8', errors='replace').replace("''", "'")
+            elif kind == 'estring':
+                yield 'string', _unescape_e_string(raw[2:-1].decode('utf-8', errors='replace'))
+            elif kind == 'dollar':
+                tag_length = raw.index(b'$', 1) + 1
+                yield 'string', raw[tag_length:-tag_length].decode('utf-8', errors='replace')
+            elif kind == 'ident':
+                yield 'ident', raw[1:-1].decode('utf-8', errors='replace').replace('""', '"')
+            elif kind == 'word':
+                yield 'word', raw.decode().lower()
+            else:
+                yield kind, raw.decode('utf-8', errors='replace')
+
+
+def _parse_values(tokens, idea_index, ideas):
+    """
+    Consume `(...), (...)` rows after VALUES, appending each row's idea.
+    Returns True if the statement's ';' was reached, False at end of input.
+    """
+    depth = 0
+    row = []
+    slot = []
+    for kind, value in tokens:
+        if kind == 'punct' and value == ';' and depth == 0:
+            return True
+        if kind == 'punct' and value == '(':
+            depth += 1
+            if depth == 1:
+                row, slot = [], []
+                continue
+        elif kind == 'punct' and value == ')':
+            depth -= 1
+            if depth == 0:
+                row.append(slot)
+                if idea_index < len(row):
+                    idea_slot = row[idea_index]
+                    # Only a plain string literal is an idea; skip expressions
+                    if len(idea_slot) == 1 and idea_slot[0][0] == 'string':
+                        ideas.append(idea_slot[0][1])
+                continue
+        elif kind == 'punct' and value == ',' and depth == 1:
+            row.append(slot)
+            slot = []
+            continue
+        if depth >= 1:
+            slot.append((kind, value))
+        elif kind == 'word':
+            # ON CONFLICT, RETURNING, ...: nothing more to read in this statement
+            return _skip_statement(tokens)
+    return False
+
+
+def _skip_statement(tokens):
+    for kind, value in tokens:
+        if kind == 'punct' and value == ';':
+            return True
+    return False
+
+
+def iter_insert_ideas(stream, start=0, column='idea'):
+    """
+    Yield (idea, statement_end) for every row of every INSERT in a binary
+    stream, starting at byte offset `start`. With a column list the
+    `column` value is used; without one, the first value of each row.
+    `statement_end` is the byte offset just past the statement's ';', or
+    None if the input ended before the statement was complete.
+    """
+    if start:
+        stream.seek(start)
+    tokens = SqlTokenizer(stream, start)
+    for kind, value in tokens:
+        if kind == 'punct' and value == ';':
+            continue
+        if kind != 'word' or value != 'insert':
+            _skip_statement(tokens)
+            continue
+
+        # INSERT INTO <table> [(columns)] VALUES ...
+        idea_index = 0
+        columns = None
+        found_values = False
+        for kind, value in tokens:
+            if kind == 'punct' and value == ';':
+                break
+            if kind == 'punct' and value == '(' and columns is None:
+                columns = []
+                for kind, value in tokens:
+                    if kind == 'punct' and value == ')':
+                        break
+                    if kind in ('word', 'ident'):
+                        columns.append(value.lower())
+                if column in columns:
+                    idea_index = columns.index(column)
+                continue
+            if kind == 'word' and value == 'values':
+                found_values = True
+                break
+            if kind == 'word' and value == 'select':
+                # INSERT ... SELECT has no literal rows to import
+                _skip_statement(tokens)
+                break
+        if not found_values:
+            continue
+
+        ideas = []
+        complete = _parse_values(tokens, idea_index, ideas)
+        statement_end = tokens.offset if complete else None
+        for idea in ideas:
+            yield idea, statement_end
+
+
+def iter_ideas_from_sql(filepath):
+    """Yield every idea inserted by a SQL file, in order."""
+    with open(filepath, 'rb') as f:
+        for idea, _ in iter_insert_ideas(f):
+            yield idea
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        for idea in iter_ideas_from_sql(path):
+            print(idea)
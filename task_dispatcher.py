@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Task Dispatcher
+Registry of travel development task types and a scheduler that runs them
+on executors suited to their work:
+
+    cpu  - a process pool per task type (own initializer, e.g. memory limits)
+    io   - one shared thread pool (file checks, DB-only tasks, HTTP)
+
+Each task type also has a concurrency cap; the dispatcher keeps at most
+that many of its tasks in flight, so different types overlap instead of
+running in one serial loop. Results are handed back in the calling thread
+as they finish, which keeps DB and git bookkeeping out of the workers.
+
+A worker process that dies (killed at its memory limit, a segfault)
+breaks its whole pool. The tasks that were running on it fail, and the
+pool is rebuilt for the rest of that type's queue. After
+MAX_POOL_RESTARTS the type's remaining tasks fail instead.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                wait)
+from concurrent.futures.process import BrokenProcessPool
+
+KINDS = ('cpu', 'io')
+MAX_POOL_RESTARTS = 3
+
+
+class TaskType:
+    """
+    One kind of task.
+
+    `match(idea)` returns the task's parameters, or None if the idea is not
+    of this type. `run(params)` does the work and returns a result dict
+    with 'success' and 'message' (or 'error'), plus optionally 'note' to
+    append to the idea and 'touched' for files it changed. For cpu types
+    `run` must be a module-level function so it can be pickled. The
+    dispatcher adds 'duration_s', the time `run` took in its worker.
+    """
+
+    def __init__(self, name, kind, match, run, max_concurrency=1,
+                 initializer=None, initargs=()):
+        if kind not in KINDS:
+            raise ValueError(f"unknown task kind {kind!r}, expected one of {KINDS}")
+        self.name = name
+        self.kind = kind
+        self.match = match
+        self.run = run
+        self.max_concurrency = max(1, max_concurrency)
+        self.initializer = initializer
+        self.initargs = initargs
+
+
+class TaskRegistry:
+    """Task types in priority order; the first whose match() accepts an idea wins."""
+
+    def __init__(self):
+        self.types = []
+
+    def register(self, task_type):
+        self.types.append(task_type)
+        return task_type
+
+    def parse(self, idea):
+        """Return (task_type, params), or (None, None) if nothing matches."""
+        for task_type in self.types:
+            params = task_type.match(idea)
+            if params is not None:
+                return task_type, params
+        return None, None
+
+
+def _timed_run(run, params):
+    # Measured inside the worker, so queueing time is not counted
+    start = time.monotonic()
+    result = run(params)
+    result['duration_s'] = time.monotonic() - start
+    return result
+
+
+class TaskDispatcher:
+    """Runs parsed tasks on per-kind executors within per-type caps."""
+
+    def __init__(self, registry, io_workers=8):
+        self.registry = registry
+        self.io_workers = io_workers
+        self._executors = {}
+
+    def _key(self, task_type):
+        return ('cpu', task_type.name) if task_type.kind == 'cpu' else ('io',)
+
+    def _executor(self, task_type):
+        key = self._key(task_type)
+        if key not in self._executors:
+            if task_type.kind == 'cpu':
+                self._executors[key] = ProcessPoolExecutor(
+                    max_workers=task_type.max_concurrency,
+                    initializer=task_type.initializer, initargs=task_type.initargs)
+            else:
+                self._executors[key] = ThreadPoolExecutor(max_workers=self.io_workers)
+        return self._executors[key]
+
+    def run(self, tasks, on_result, on_start=None):
+        """
+        Dispatch `tasks` (dicts with 'id' and 'idea') and call
+        on_result(task, task_type, result) for each as it finishes.
+        Tasks no type matches are reported with task_type None.
+        on_start(task, task_type) is called as each task is handed to its
+        executor; tasks still queued behind the caps have not started.
+        """
+        queues = {}
+        types = {}
+        for task in tasks:
+            task_type, params = self.registry.parse(task['idea'])
+            if task_type is None:
+                on_result(task, None, {'success': False, 'error': 'no handler for this task'})
+                continue
+            types[task_type.name] = task_type
+            queues.setdefault(task_type.name, deque()).append((task, params))
+
+        in_flight = {name: 0 for name in queues}
+        restarts = {name: 0 for name in queues}
+        futures = {}
+
+        def pool_broken(task_type, executor):
+            """Drop a pool a dead worker broke; False once it has broken too often."""
+            if self._executors.get(self._key(task_type)) is executor:
+                del self._executors[self._key(task_type)]
+                executor.shutdown(wait=False, cancel_futures=True)
+                restarts[task_type.name] += 1
+                if restarts[task_type.name] <= MAX_POOL_RESTARTS:
+                    print(f"⚠️ A {task_type.name} worker died; restarting its pool "
+                          f"({restarts[task_type.name]}/{MAX_POOL_RESTARTS})")
+                else:
+                    print(f"❌ The {task_type.name} pool died {restarts[task_type.name]} times; "
+                          f"failing the rest of its queue")
+            return restarts[task_type.name] <= MAX_POOL_RESTARTS
+
+        def fail_queue(name):
+            pending = queues[name]
+            while pending:
+                task, _ = pending.popleft()
+                on_result(task, types[name], {'success': False,
+                                              'error': f"{name} pool kept dying; not run"})
+
+        def fill():
+            for name, pending in queues.items():
+                task_type = types[name]
+                while pending and in_flight[name] < task_type.max_concurrency:
+                    task, params = pending.popleft()
+                    if on_start is not None:
+                        on_start(task, task_type)
+                    executor = self._executor(task_type)
+                    try:
+                        future = executor.submit(_timed_run, task_type.run, params)
+                    except BrokenProcessPool:
+                        # A worker died since the last result was collected
+                        pending.appendleft((task, params))
+                        if not pool_broken(task_type, executor):
+                            fail_queue(name)
+                        continue
+                    futures[future] = (task, task_type, executor)
+                    in_flight[name] += 1
+
+        try:
+            fill()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, task_type, executor = futures.pop(future)
+                    in_flight[task_type.name] -= 1
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        # This task, or another one on the same pool, killed a worker
+                        result = {'success': False, 'error': str(e) or type(e).__name__}
+                        if not pool_broken(task_type, executor):
+                            fail_queue(task_type.name)
+                    except Exception as e:
+                        # e.g. MemoryError raised under the worker's memory limit
+                        result = {'success': False, 'error': str(e) or type(e).__name__}
+                    on_result(task, task_type, result)
+                fill()
+        finally:
+            self.close()
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors = {}
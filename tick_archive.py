@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Tick Archive
+Compact long-term storage for the silver price history, Gorilla-style:
+delta-of-delta timestamps and XOR-encoded float prices, packed into
+fixed-size blocks with a block index for time-range reads.
+
+An archive round-trips byte-for-byte with the CSV it was packed from, and
+`read_arrays` decodes straight into NumPy arrays (pip install numpy): the
+bit stream is parsed once, then timestamps are rebuilt with cumsum and
+prices with a cumulative XOR. Rows need not be in time order; the block
+index stores each block's earliest and latest timestamp.
+
+Usage:
+    python3 tick_archive.py pack data/silver_prices.csv data/silver_prices.ticks
+    python3 tick_archive.py unpack data/silver_prices.ticks restored.csv
+    python3 tick_archive.py info data/silver_prices.ticks
+"""
+
+import csv
+import io
+import json
+import os
+import struct
+import sys
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+MAGIC = b'SLVTICK1'
+FOOTER = struct.Struct('<QQI8s')      # meta offset, index offset, block count, magic
+INDEX_ENTRY = struct.Struct('<QIIqq')  # offset, length, ticks, min ts, max ts
+DEFAULT_BLOCK_SIZE = 1024
+CSV_FIELDS = ['timestamp', 'date', 'price_usd', 'source', 'url']
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+MASK64 = (1 << 64) - 1
+
+# How each field's original text is rebuilt from the decoded value; a row
+# whose text matches none of these cannot be archived exactly.
+TIMESTAMP_STYLES = [
+    lambda dt: dt.isoformat(),                      # 2026-02-03T14:25:27.996007
+    lambda dt: dt.strftime('%Y-%m-%d %H:%M:%S'),    # 2026-02-03 14:25:27
+    lambda dt: dt.isoformat(sep=' '),               # 2026-02-03 14:25:27.996007
+]
+PRICE_STYLES = [
+    lambda price: f"{price:.2f}",                   # 85.03
+    lambda price: repr(price),                      # 85.0312
+]
+
+# Delta-of-delta buckets (microseconds, zigzag-encoded): (prefix, prefix bits, value bits)
+DOD_BUCKETS = [
+    (0b10, 2, 24),      # within ±8 s of the previous interval
+    (0b110, 3, 34),     # within ±2.4 h
+    (0b1110, 4, 44),    # within ±101 days
+    (0b1111, 4, 64),
+]
+
+
+class ArchiveError(Exception):
+    """Raised for unreadable archives or CSV rows that cannot round-trip."""
+
+
+class BitWriter:
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.nbits = 0
+
+    def write(self, value, nbits):
+        self.acc = (self.acc << nbits) | value
+        self.nbits += nbits
+        while self.nbits >= 8:
+            self.nbits -= 8
+            self.out.append((self.acc >> self.nbits) & 0xFF)
+        self.acc &= (1 << self.nbits) - 1
+
+    def getvalue(self):
+        if self.nbits:
+            return bytes(self.out) + bytes([(self.acc << (8 - self.nbits)) & 0xFF])
+        return bytes(self.out)
+
+
+class BitReader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def read(self, nbits):
+        start = self.pos >> 3
+        skip = self.pos & 7
+        nbytes = (skip + nbits + 7) >> 3
+        chunk = int.from_bytes(self.data[start:start + nbytes], 'big')
+        self.pos += nbits
+        return (chunk >> (nbytes * 8 - skip - nbits)) & ((1 << nbits) - 1)
+
+    def read_bit(self):
+        bit = (self.data[self.pos >> 3] >> (7 - (self.pos & 7))) & 1
+        self.pos += 1
+        return bit
+
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(z):
+    return z >> 1 if not z & 1 else -((z + 1) >> 1)
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    shift = result = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _float_bits(value):
+    return struct.unpack('<Q', struct.pack('<d', value))[0]
+
+
+def _bits_float(bits):
+    return struct.unpack('<d', struct.pack('<Q', bits))[0]
+
+
+def encode_block(timestamps, prices, runs):
+    """
+    Encode one block.
+
+    `runs` is a run-length list of (count, timestamp style, price style,
+    source id, url id) covering the block's rows.
+    """
+    out = bytearray()
+    _write_varint(out, len(runs))
+    for run in runs:
+        for value in run:
+            _write_varint(out, value)
+
+    bits = BitWriter()
+    prev_ts = prev_delta = 0
+    prev_bits = 0
+    prev_lead = prev_trail = None
+
+    for i, (ts, price) in enumerate(zip(timestamps, prices)):
+        # Timestamp: raw first value, then delta-of-delta
+        if i == 0:
+            bits.write(ts & MASK64, 64)
+        else:
+            delta = ts - prev_ts
+            dod = delta - prev_delta
+            if dod == 0:
+                bits.write(0, 1)
+            else:
+                z = _zigzag(dod)
+                for prefix, prefix_bits, value_bits in DOD_BUCKETS:
+                    if z < (1 << value_bits):
+                        bits.write(prefix, prefix_bits)
+                        bits.write(z, value_bits)
+                        break
+                else:
+                    raise ArchiveError(f"timestamp {ts} jumps too far from the one before "
+                                       f"(delta-of-delta {dod} us) to encode")
+            prev_delta = delta
+        prev_ts = ts
+
+        # Price: XOR with the previous value, reusing its leading/trailing window
+        value_bits = _float_bits(price)
+        if i == 0:
+            bits.write(value_bits, 64)
+        else:
+            xor = value_bits ^ prev_bits
+            if xor == 0:
+                bits.write(0, 1)
+            else:
+                bits.write(1, 1)
+                lead = min(64 - xor.bit_length(), 31)
+                trail = (xor & -xor).bit_length() - 1
+                if prev_lead is not None and lead >= prev_lead and trail >= prev_trail:
+                    bits.write(0, 1)
+                    bits.write(xor >> prev_trail, 64 - prev_lead - prev_trail)
+                else:
+                    significant = 64 - lead - trail
+                    bits.write(1, 1)
+                    bits.write(lead, 5)
+                    bits.write(significant - 1, 6)
+                    bits.write(xor >> trail, significant)
+                    prev_lead, prev_trail = lead, trail
+        prev_bits = value_bits
+
+    return bytes(out) + bits.getvalue()
+
+
+def _read_block(data, count):
+    """
+    Parse one block's bit stream: (runs, first timestamp, delta-of-deltas,
+    first price bits, price XORs), the last two with count - 1 entries.
+    """
+    n_runs, pos = _read_varint(data, 0)
+    runs = []
+    for _ in range(n_runs):
+        run = []
+        for _ in range(5):
+            value, pos = _read_varint(data, pos)
+            run.append(value)
+        runs.append(tuple(run))
+
+    reader = BitReader(data[pos:])
+    first_ts = reader.read(64)
+    if first_ts >> 63:
+        first_ts -= 1 << 64
+    first_bits = reader.read(64)
+    dods = []
+    xors = []
+    lead = trail = 0
+
+    for _ in range(count - 1):
+        if reader.read_bit() == 0:
+            dods.append(0)
+        else:
+            prefix_bits = 1
+            while prefix_bits < 4 and reader.read_bit():
+                prefix_bits += 1
+            dods.append(_unzigzag(reader.read(DOD_BUCKETS[prefix_bits - 1][2])))
+
+        if reader.read_bit() == 0:
+            xors.append(0)
+        else:
+            if reader.read_bit():
+                lead = reader.read(5)
+                significant = reader.read(6) + 1
+                trail = 64 - lead - significant
+            xors.append(reader.read(64 - lead - trail) << trail)
+
+    return runs, first_ts, dods, first_bits, xors
+
+
+def decode_block(data, count):
+    """Decode one block into (timestamps, prices, runs)."""
+    runs, first_ts, dods, first_bits, xors = _read_block(data, count)
+    timestamps = list(accumulate(accumulate(dods), initial=first_ts))
+    price_bits = list(accumulate(xors, lambda a, b: a ^ b, initial=first_bits))
+    prices = list(struct.unpack(f'<{count}d', struct.pack(f'<{count}Q', *price_bits)))
+    return timestamps, prices, runs
+
+
+def decode_block_arrays(data, count):
+    """Decode one block into NumPy arrays: (timestamps int64 us, prices float64, runs)."""
+    import numpy as np
+
+    runs, first_ts, dods, first_bits, xors = _read_block(data, count)
+    timestamps = np.empty(count, dtype=np.int64)
+    timestamps[0] = first_ts
+    np.cumsum(np.cumsum(np.array(dods, dtype=np.int64)), out=timestamps[1:])
+    timestamps[1:] += first_ts
+    price_bits = np.empty(count, dtype=np.uint64)
+    price_bits[0] = first_bits
+    price_bits[1:] = xors
+    prices = np.bitwise_xor.accumulate(price_bits).view(np.float64)
+    return timestamps, prices, runs
+
+
+def _match_style(styles, value, text):
+    for index, render in enumerate(styles):
+        if render(value) == text:
+            return index
+    return None
+
+
+def _parse_rows(rows, strings):
+    """Turn CSV rows into (timestamps, prices, per-row style tuples)."""
+    string_ids = {s: i for i, s in enumerate(strings)}
+    timestamps, prices, styles = [], [], []
+    for line_no, row in enumerate(rows, start=2):
+        if len(row) != len(CSV_FIELDS):
+            raise ArchiveError(f"line {line_no}: expected {len(CSV_FIELDS)} fields")
+        ts_text, date_text, price_text, source, url = row
+        try:
+            dt = datetime.fromisoformat(ts_text)
+            price = float(price_text)
+        except ValueError as e:
+            raise ArchiveError(f"line {line_no}: {e}")
+        ts_style = _match_style(TIMESTAMP_STYLES, dt, ts_text)
+        price_style = _match_style(PRICE_STYLES, price, price_text)
+        if ts_style is None or price_style is None or date_text != dt.strftime('%Y-%m-%d'):
+            raise ArchiveError(f"line {line_no}: row cannot be reproduced exactly: {row}")
+        for s in (source, url):
+            if s not in string_ids:
+                string_ids[s] = len(strings)
+                strings.append(s)
+        timestamps.append((dt - EPOCH) // ONE_MICROSECOND)
+        prices.append(price)
+        styles.append((ts_style, price_style, string_ids[source], string_ids[url]))
+    return timestamps, prices, styles
+
+
+def _runs(styles):
+    runs = []
+    for style in styles:
+        if runs and runs[-1][1:] == style:
+            runs[-1] = (runs[-1][0] + 1,) + style
+        else:
+            runs.append((1,) + style)
+    return runs
+
+
+def pack(csv_path, archive_path, block_size=DEFAULT_BLOCK_SIZE):
+    """Pack a price CSV into an archive, verifying the exact round trip."""
+    with open(csv_path, 'rb') as f:
+        original = f.read()
+
+    text = original.decode('utf-8')
+    first_line_end = text.find('\n')
+    terminator = '\r\n' if text[first_line_end - 1:first_line_end + 1] == '\r\n' else '\n'
+    rows = list(csv.reader(io.StringIO(text, newline='')))
+    if not rows or rows[0] != CSV_FIELDS:
+        raise ArchiveError(f"unexpected CSV header in {csv_path}")
+
+    strings = []
+    timestamps, prices, styles = _parse_rows(rows[1:], strings)
+
+    with open(archive_path, 'wb') as f:
+        f.write(MAGIC)
+        index = []
+        for start in range(0, len(timestamps), block_size):
+            end = start + block_size
+            block_ts = timestamps[start:end]
+            block = encode_block(block_ts, prices[start:end], _runs(styles[start:end]))
+            # min/max rather than first/last: range reads stay correct for unsorted rows
+            index.append((f.tell(), len(block), len(block_ts), min(block_ts), max(block_ts)))
+            f.write(block)
+
+        meta = {
+            'version': 1,
+            'block_size': block_size,
+            'line_terminator': terminator,
+            'strings': strings,
+            'ticks': len(timestamps),
+        }
+        meta_offset = f.tell()
+        f.write(json.dumps(meta).encode())
+        index_offset = f.tell()
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(FOOTER.pack(meta_offset, index_offset, len(index), MAGIC))
+
+    if to_csv_bytes(archive_path) != original:
+        raise ArchiveError(f"round trip of {csv_path} did not reproduce the original bytes")
+    return {'ticks': len(timestamps), 'blocks': len(index),
+            'csv_bytes': len(original), 'archive_bytes': os.path.getsize(archive_path)}
+
+
+class TickArchive:
+    """Random access to an archive's blocks via its index."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        if len(self.data) < len(MAGIC) + FOOTER.size or not self.data.startswith(MAGIC):
+            raise ArchiveError(f"{path} is not a tick archive")
+        meta_offset, index_offset, n_blocks, magic = FOOTER.unpack(self.data[-FOOTER.size:])
+        if magic != MAGIC:
+            raise ArchiveError(f"{path} has a corrupt footer")
+        self.meta = json.loads(self.data[meta_offset:index_offset])
+        self.index = [INDEX_ENTRY.unpack_from(self.data, index_offset + i * INDEX_ENTRY.size)
+                      for i in range(n_blocks)]
+
+    def blocks(self, start_us=None, end_us=None, decode=decode_block):
+        """Yield blocks overlapping [start_us, end_us], decoded with `decode`."""
+        for offset, length, count, min_ts, max_ts in self.index:
+            if start_us is not None and max_ts < start_us:
+                continue
+            if end_us is not None and min_ts > end_us:
+                continue
+            yield decode(self.data[offset:offset + length], count)
+
+
+def to_csv_bytes(archive_path):
+    """Rebuild the original CSV bytes from an archive."""
+    archive = TickArchive(archive_path)
+    strings = archive.meta['strings']
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer, lineterminator=archive.meta['line_terminator'])
+    writer.writerow(CSV_FIELDS)
+    for timestamps, prices, runs in archive.blocks():
+        row = 0
+        for count, ts_style, price_style, source_id, url_id in runs:
+            render_ts = TIMESTAMP_STYLES[ts_style]
+            render_price = PRICE_STYLES[price_style]
+            for i in range(row, row + count):
+                dt = EPOCH + timedelta(microseconds=timestamps[i])
+                writer.writerow([render_ts(dt), dt.strftime('%Y-%m-%d'),
+                                 render_price(prices[i]), strings[source_id], strings[url_id]])
+            row += count
+    return buffer.getvalue().encode('utf-8')
+
+
+def read_arrays(archive_path, start=None, end=None):
+    """
+    Decode an archive into NumPy arrays, optionally limited to ticks between
+    `start` and `end` (datetimes). Returns a dict with 'timestamp'
+    (datetime64[us]), 'price_usd' (float64) and 'source' (object).
+    """
+    import numpy as np
+
+    start_us = None if start is None else (start - EPOCH) // ONE_MICROSECOND
+    end_us = None if end is None else (end - EPOCH) // ONE_MICROSECOND
+
+    archive = TickArchive(archive_path)
+    strings = np.array(archive.meta['strings'], dtype=object)
+    timestamps, prices, sources = [], [], []
+    for block_ts, block_prices, runs in archive.blocks(start_us, end_us, decode_block_arrays):
+        counts = [run[0] for run in runs]
+        source_ids = [run[3] for run in runs]
+        keep = np.ones(len(block_ts), dtype=bool)
+        if start_us is not None:
+            keep &= block_ts >= start_us
+        if end_us is not None:
+            keep &= block_ts <= end_us
+        timestamps.append(block_ts[keep])
+        prices.append(block_prices[keep])
+        sources.append(np.repeat(strings[source_ids], counts)[keep])
+
+    if not timestamps:
+        return {'timestamp': np.array([], dtype='datetime64[us]'),
+                'price_usd': np.array([], dtype='float64'),
+                'source': np.array([], dtype=object)}
+    return {
+        'timestamp': np.concatenate(timestamps).astype('datetime64[us]'),
+        'price_usd': np.concatenate(prices),
+        'source': np.concatenate(sources),
+    }
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('pack', 'unpack', 'info'):
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        return 1
+    command = sys.argv[1]
+
+    try:
+        if command == 'pack' and len(sys.argv) == 4:
+            result = pack(sys.argv[2], sys.argv[3])
+            per_tick = result['archive_bytes'] / max(result['ticks'], 1)
+            print(f"✅ Packed {result['ticks']} ticks into {result['blocks']} block(s)")
+            print(f"📦 {result['csv_bytes']} CSV bytes → {result['archive_bytes']} archive bytes "
+                  f"({per_tick:.1f} bytes/tick)")
+        elif command == 'unpack' and len(sys.argv) == 4:
+            with open(sys.argv[3], 'wb') as f:
+                f.write(to_csv_bytes(sys.argv[2]))
+            print(f"✅ Restored {sys.argv[3]}")
+        elif command == 'info':
+            archive = TickArchive(sys.argv[2])
+            print(f"📦 {archive.meta['ticks']} ticks in {len(archive.index)} block(s) "
+                  f"of up to {archive.meta['block_size']}")
+            for offset, length, count, min_ts, max_ts in archive.index:
+                first = EPOCH + timedelta(microseconds=min_ts)
+                last = EPOCH + timedelta(microseconds=max_ts)
+                print(f"   {first} → {last}: {count} ticks, {length} bytes")
+        else:
+            print(__doc__.strip().split('Usage:')[1].rstrip())
+            return 1
+    except (ArchiveError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
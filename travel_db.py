@@ -0,0 +1,788 @@
+#!/usr/bin/env python3
+"""
+Travel Database Access
+Shared data-access layer for the travel development scripts: one pooled
+connection per process instead of a psql subprocess per query,
+parameterised SQL, and rows returned as named tuples.
+
+The database is chosen with TRAVEL_DATABASE_URL:
+    postgresql://fudongli@localhost/travel_website   (default; psycopg or psycopg2)
+    sqlite:////path/to/travel.db                      (local stand-in)
+    sqlite://:memory:
+
+For SQLite the file is attached as schema `travel`, so the same
+`travel.travel_development_ideas` SQL works against both backends.
+"""
+
+import csv
+import io
+import json
+import os
+import queue
+import select
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+DEFAULT_DATABASE_URL = 'postgresql://fudongli@localhost/travel_website'
+DATABASE_URL = os.environ.get('TRAVEL_DATABASE_URL', DEFAULT_DATABASE_URL)
+TASKS_TABLE = 'travel.travel_development_ideas'
+# NOTIFY channel fired by the insert trigger (see install_task_trigger)
+TASKS_CHANNEL = 'travel_new_tasks'
+# How long a thread waits for a pooled connection before giving up
+POOL_TIMEOUT_SECONDS = float(os.environ.get('TRAVEL_DB_POOL_TIMEOUT', '30'))
+
+
+class DatabaseError(Exception):
+    """Raised for any driver error, whichever backend is in use."""
+
+
+def _load_postgres_driver():
+    try:
+        import psycopg
+        return psycopg
+    except ImportError:
+        pass
+    try:
+        import psycopg2
+        return psycopg2
+    except ImportError:
+        raise DatabaseError("no PostgreSQL driver available (pip install psycopg)")
+
+
+class _ConnectionPool:
+    """A small blocking pool; connections are created lazily up to max_size."""
+
+    def __init__(self, factory, max_size, timeout=POOL_TIMEOUT_SECONDS):
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                if self.created < self.max_size:
+                    self.created += 1
+                    try:
+                        return self.factory()
+                    except Exception:
+                        self.created -= 1
+                        raise
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DatabaseError(f"no database connection free after {self.timeout:g}s "
+                                    f"(pool of {self.max_size})")
+            # Wake up now and then: a discarded connection frees a slot
+            # without putting anything in `idle`
+            try:
+                return self.idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+
+    def release(self, conn):
+        self.idle.put(conn)
+
+    def discard(self, conn):
+        with self.lock:
+            self.created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Transaction:
+    """Cursor wrapper handed out by Database.transaction()."""
+
+    def __init__(self, db, cursor):
+        self.db = db
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        """Run a statement; returns the affected row count."""
+        self.db._run(self.cursor, sql, params)
+        return self.cursor.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        self.db.count_round_trip()
+        try:
+            self.cursor.executemany(self.db._sql(sql), seq_of_params)
+        except self.db.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+        return self.cursor.rowcount
+
+    def query(self, sql, params=()):
+        """Run a query; returns a list of named-tuple rows."""
+        self.db._run(self.cursor, sql, params)
+        return self.db._rows(self.cursor)
+
+    def scalar(self, sql, params=()):
+        rows = self.query(sql, params)
+        return rows[0][0] if rows else None
+
+
+class Database:
+    """
+    Pooled connections to PostgreSQL or a SQLite stand-in.
+    `round_trips` counts statements sent plus commits and rollbacks
+    (read by bench_travel_checker.py).
+    """
+
+    def __init__(self, url=DATABASE_URL, pool_size=4):
+        self.url = url
+        self.round_trips = 0
+        self._round_trips_lock = threading.Lock()
+        if url.startswith('sqlite://'):
+            self.dialect = 'sqlite'
+            self.path = url[len('sqlite://'):] or ':memory:'
+            self.driver_errors = (sqlite3.Error,)
+            # An in-memory database exists per connection, so share just one
+            size = 1 if self.path == ':memory:' else pool_size
+            self.pool = _ConnectionPool(self._connect_sqlite, size)
+        elif url.startswith(('postgresql://', 'postgres://')):
+            self.dialect = 'postgres'
+            self.driver = _load_postgres_driver()
+            self.driver_errors = (self.driver.Error,)
+            self.pool = _ConnectionPool(lambda: self.driver.connect(url), pool_size)
+        else:
+            raise DatabaseError(f"unsupported database URL: {url}")
+        self._row_types = {}
+
+    def _connect_sqlite(self):
+        conn = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+        conn.execute('ATTACH DATABASE ? AS travel', (self.path,))
+        conn.execute('PRAGMA travel.journal_mode = WAL')
+        return conn
+
+    def _sql(self, sql):
+        # Queries are written with %s placeholders (psycopg style)
+        return sql.replace('%s', '?') if self.dialect == 'sqlite' else sql
+
+    def count_round_trip(self):
+        # Transactions on several threads (heartbeat, completion batches) share this
+        with self._round_trips_lock:
+            self.round_trips += 1
+
+    def _run(self, cursor, sql, params):
+        self.count_round_trip()
+        try:
+            cursor.execute(self._sql(sql), tuple(params))
+        except self.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+
+    def _rows(self, cursor):
+        if cursor.description is None:
+            return []
+        columns = tuple(column[0] for column in cursor.description)
+        row_type = self._row_types.get(columns)
+        if row_type is None:
+            # rename=True turns unnamed columns such as COUNT(*) into _0, _1, ...
+            row_type = self._row_types[columns] = namedtuple('Row', columns, rename=True)
+        return [row_type(*row) for row in cursor.fetchall()]
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements on one pooled connection, atomically."""
+        try:
+            conn = self.pool.acquire()
+        except self.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+        cursor = conn.cursor()
+        try:
+            if self.dialect == 'sqlite':
+                self._run(cursor, 'BEGIN IMMEDIATE', ())
+            yield Transaction(self, cursor)
+            self._finish(conn, cursor, 'COMMIT')
+        except BaseException:
+            # Whatever happens while cleaning up, the original error is re-raised
+            if self.dialect == 'sqlite' and not conn.in_transaction:
+                # BEGIN itself failed (e.g. database is locked): nothing to roll back
+                self.pool.release(conn)
+                raise
+            try:
+                self._finish(conn, cursor, 'ROLLBACK')
+            except Exception:
+                # A connection that cannot roll back is not safe to reuse
+                self.pool.discard(conn)
+            else:
+                self.pool.release(conn)
+            raise
+        self.pool.release(conn)
+
+    def _finish(self, conn, cursor, action):
+        self.count_round_trip()
+        try:
+            if self.dialect == 'sqlite':
+                cursor.execute(action)
+            elif action == 'COMMIT':
+                conn.commit()
+            else:
+                conn.rollback()
+            cursor.close()
+        except self.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+
+    def query(self, sql, params=()):
+        with self.transaction() as tx:
+            return tx.query(sql, params)
+
+    def scalar(self, sql, params=()):
+        with self.transaction() as tx:
+            return tx.scalar(sql, params)
+
+    def execute(self, sql, params=()):
+        with self.transaction() as tx:
+            return tx.execute(sql, params)
+
+    def close(self):
+        self.pool.close()
+
+    def create_schema(self):
+        """
+        Create the tasks table if it is missing, then bring an existing one
+        up to date (migrate_schema). Run once per deployment, e.g. with
+        `python3 travel_db.py migrate`; workers never change the schema.
+        """
+        with self.transaction() as tx:
+            if self.dialect == 'sqlite':
+                tx.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {TASKS_TABLE} (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        idea TEXT NOT NULL,
+                        is_fixed BOOLEAN NOT NULL DEFAULT FALSE,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        fixed_at TIMESTAMP,
+                        claimed_by TEXT,
+                        lease_until TIMESTAMP,
+                        needs_review BOOLEAN NOT NULL DEFAULT FALSE
+                    )""")
+            else:
+                tx.execute("CREATE SCHEMA IF NOT EXISTS travel")
+                tx.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {TASKS_TABLE} (
+                        id SERIAL PRIMARY KEY,
+                        idea TEXT NOT NULL,
+                        is_fixed BOOLEAN NOT NULL DEFAULT FALSE,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        fixed_at TIMESTAMP,
+                        claimed_by TEXT,
+                        lease_until TIMESTAMP,
+                        needs_review BOOLEAN NOT NULL DEFAULT FALSE
+                    )""")
+        self.migrate_schema()
+
+    def migrate_schema(self):
+        """
+        Add claimed_by / lease_until / needs_review to tables created before
+        they existed, and the index import_ideas relies on.
+        """
+        with self.transaction() as tx:
+            if self.dialect == 'sqlite':
+                columns = {row.name for row in tx.query("PRAGMA travel.table_info(travel_development_ideas)")}
+            else:
+                columns = {row.column_name for row in tx.query("""
+                    SELECT column_name FROM information_schema.columns
+                    WHERE table_schema = 'travel' AND table_name = 'travel_development_ideas'""")}
+            if 'claimed_by' not in columns:
+                tx.execute(f"ALTER TABLE {TASKS_TABLE} ADD COLUMN claimed_by TEXT")
+            if 'lease_until' not in columns:
+                tx.execute(f"ALTER TABLE {TASKS_TABLE} ADD COLUMN lease_until TIMESTAMP")
+            if 'needs_review' not in columns:
+                tx.execute(f"ALTER TABLE {TASKS_TABLE} ADD COLUMN "
+                           f"needs_review BOOLEAN NOT NULL DEFAULT FALSE")
+            # Backs import_ideas' NOT EXISTS probe. PostgreSQL indexes a hash
+            # of the text, since a btree entry is limited to ~2.7 KB
+            if self.dialect == 'sqlite':
+                tx.execute("CREATE INDEX IF NOT EXISTS travel.travel_development_ideas_idea_idx "
+                           "ON travel_development_ideas (idea)")
+            else:
+                tx.execute("DROP INDEX IF EXISTS travel.travel_development_ideas_idea_idx")
+                tx.execute(f"CREATE INDEX IF NOT EXISTS travel_development_ideas_idea_md5_idx "
+                           f"ON {TASKS_TABLE} (md5(idea))")
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Return the process-wide Database, creating its pool on first use."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = Database()
+        return _db
+
+
+# Task queries shared by travel_development_checker.py and import_development_tasks.py
+
+def count_pending_tasks(db=None):
+    db = db or get_db()
+    return db.scalar(f"SELECT COUNT(*) FROM {TASKS_TABLE} WHERE is_fixed = false")
+
+
+def get_task_status(db=None):
+    """Return a row with total, completed and pending counts."""
+    db = db or get_db()
+    return db.query(f"""
+        SELECT
+            COUNT(*) AS total,
+            COUNT(CASE WHEN is_fixed THEN 1 END) AS completed,
+            COUNT(CASE WHEN NOT is_fixed THEN 1 END) AS pending
+        FROM {TASKS_TABLE}""")[0]
+
+
+# Completions only touch tasks still leased to the worker: a worker whose
+# lease expired must not finish (or annotate) a task someone else re-claimed.
+# Each returns the ids it updated; the rest were skipped.
+
+def complete_tasks(task_ids, worker_id, tx):
+    """Mark many tasks fixed with one set-based UPDATE."""
+    if not task_ids:
+        return set()
+    if tx.db.dialect == 'sqlite':
+        rows = tx.query(f"""
+            UPDATE {TASKS_TABLE}
+            SET is_fixed = true, fixed_at = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT value FROM json_each(%s)) AND claimed_by = %s
+            RETURNING id""", (json.dumps(list(task_ids)), worker_id))
+    else:
+        rows = tx.query(f"""
+            UPDATE {TASKS_TABLE}
+            SET is_fixed = true, fixed_at = CURRENT_TIMESTAMP
+            WHERE id = ANY(%s) AND claimed_by = %s
+            RETURNING id""", (list(task_ids), worker_id))
+    return {row.id for row in rows}
+
+
+def _update_with_suffixes(notes, worker_id, tx, assignments):
+    """UPDATE ... FROM a (task id, note) list, appending ' (note)' to each idea."""
+    if not notes:
+        return set()
+    suffixes = [(task_id, f" ({note})") for task_id, note in notes]
+    if tx.db.dialect == 'sqlite':
+        rows = tx.query(f"""
+            UPDATE {TASKS_TABLE} AS t
+            SET {assignments}, idea = t.idea || v.suffix
+            FROM (SELECT json_extract(value, '$[0]') AS id, json_extract(value, '$[1]') AS suffix
+                  FROM json_each(%s)) AS v
+            WHERE t.id = v.id AND t.claimed_by = %s
+            RETURNING id""", (json.dumps(suffixes), worker_id))
+    else:
+        values = ', '.join(['(%s, %s)'] * len(suffixes))
+        params = [value for pair in suffixes for value in pair]
+        rows = tx.query(f"""
+            UPDATE {TASKS_TABLE} AS t
+            SET {assignments}, idea = t.idea || v.suffix
+            FROM (VALUES {values}) AS v(id, suffix)
+            WHERE t.id = v.id::integer AND t.claimed_by = %s
+            RETURNING t.id""", params + [worker_id])
+    return {row.id for row in rows}
+
+
+def complete_tasks_with_notes(notes, worker_id, tx):
+    """Mark many tasks fixed, appending ' (note)' per task, with one UPDATE ... FROM."""
+    return _update_with_suffixes(notes, worker_id, tx,
+                                 "is_fixed = true, fixed_at = CURRENT_TIMESTAMP")
+
+
+def flag_tasks_for_review(notes, worker_id, tx):
+    """
+    Leave tasks pending but set them aside: append ' (note)', set
+    needs_review and drop the claim. claim_tasks() skips them until
+    someone clears needs_review.
+    """
+    return _update_with_suffixes(notes, worker_id, tx,
+                                 "needs_review = true, claimed_by = NULL, lease_until = NULL")
+
+
+class CompletionBatch:
+    """
+    Collects task completions and writes them in batches: one UPDATE for
+    plain completions and one for completions with a note, in a single
+    transaction per flush. A crash loses at most the unflushed batch.
+    Tasks to set aside for review (see flag_tasks_for_review) ride along.
+    Only tasks still leased to `worker_id` are updated.
+    """
+
+    def __init__(self, worker_id, db=None, batch_size=500):
+        self.worker_id = worker_id
+        self.db = db or get_db()
+        self.batch_size = batch_size
+        self.completed = []
+        self.noted = []
+        self.flagged = []
+
+    def __len__(self):
+        return len(self.completed) + len(self.noted) + len(self.flagged)
+
+    def add(self, task_id, note=None):
+        """Queue a completion; returns True once the batch is full."""
+        if note is None:
+            self.completed.append(task_id)
+        else:
+            self.noted.append((task_id, note))
+        return len(self) >= self.batch_size
+
+    def flag(self, task_id, note):
+        """Queue a task to be set aside for review; returns True once the batch is full."""
+        self.flagged.append((task_id, note))
+        return len(self) >= self.batch_size
+
+    def flush(self):
+        """
+        Write queued completions. Returns (ids updated, ids skipped because
+        their lease now belongs to another worker or has been released).
+        """
+        queued = set(self.completed) | {task_id for task_id, _ in self.noted + self.flagged}
+        if not queued:
+            return set(), set()
+        with self.db.transaction() as tx:
+            updated = complete_tasks(self.completed, self.worker_id, tx)
+            updated |= complete_tasks_with_notes(self.noted, self.worker_id, tx)
+            updated |= flag_tasks_for_review(self.flagged, self.worker_id, tx)
+        self.discard()
+        return updated, queued - updated
+
+    def discard(self):
+        """Drop queued completions, e.g. after a failed flush."""
+        self.completed = []
+        self.noted = []
+        self.flagged = []
+
+
+# Task claiming: a worker takes a lease on a batch of pending tasks so that
+# several checkers (on any number of hosts) never process the same task.
+# A lease that is not renewed expires and the tasks become claimable again.
+
+DEFAULT_LEASE_SECONDS = 300
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_tasks(worker_id, limit=100, lease_seconds=DEFAULT_LEASE_SECONDS, db=None):
+    """
+    Lease up to `limit` pending tasks that nobody holds (or whose lease has
+    expired) and return them. On PostgreSQL, FOR UPDATE SKIP LOCKED lets
+    concurrent claimers pass each other instead of waiting; on SQLite the
+    BEGIN IMMEDIATE transaction serialises them.
+    """
+    db = db or get_db()
+    if db.dialect == 'sqlite':
+        return db.query(f"""
+            UPDATE {TASKS_TABLE}
+            SET claimed_by = %s, lease_until = datetime('now', '+' || %s || ' seconds')
+            WHERE id IN (
+                SELECT id FROM {TASKS_TABLE}
+                WHERE is_fixed = false AND needs_review = false
+                  AND (lease_until IS NULL OR lease_until < datetime('now'))
+                ORDER BY id
+                LIMIT %s)
+            RETURNING id, idea, created_at""", (worker_id, int(lease_seconds), limit))
+    return db.query(f"""
+        UPDATE {TASKS_TABLE}
+        SET claimed_by = %s,
+            lease_until = LOCALTIMESTAMP + make_interval(secs => %s)
+        WHERE id IN (
+            SELECT id FROM {TASKS_TABLE}
+            WHERE is_fixed = false AND needs_review = false
+              AND (lease_until IS NULL OR lease_until < LOCALTIMESTAMP)
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED)
+        RETURNING id, idea, created_at""", (worker_id, lease_seconds, limit))
+
+
+def renew_leases(worker_id, lease_seconds=DEFAULT_LEASE_SECONDS, db=None):
+    """Extend every unfinished lease held by `worker_id`; returns how many."""
+    db = db or get_db()
+    if db.dialect == 'sqlite':
+        return db.execute(f"""
+            UPDATE {TASKS_TABLE}
+            SET lease_until = datetime('now', '+' || %s || ' seconds')
+            WHERE claimed_by = %s AND is_fixed = false""", (int(lease_seconds), worker_id))
+    return db.execute(f"""
+        UPDATE {TASKS_TABLE}
+        SET lease_until = LOCALTIMESTAMP + make_interval(secs => %s)
+        WHERE claimed_by = %s AND is_fixed = false""", (lease_seconds, worker_id))
+
+
+def release_claims(worker_id, db=None):
+    """Give back unfinished tasks so another worker can take them right away."""
+    db = db or get_db()
+    return db.execute(f"""
+        UPDATE {TASKS_TABLE}
+        SET claimed_by = NULL, lease_until = NULL
+        WHERE claimed_by = %s AND is_fixed = false""", (worker_id,))
+
+
+class LeaseHeartbeat:
+    """
+    Background thread renewing a worker's leases every `interval` seconds
+    (a third of the lease by default) while long tasks run.
+    """
+
+    def __init__(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS, interval=None, db=None):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = interval or lease_seconds / 3
+        self.db = db
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                renew_leases(self.worker_id, self.lease_seconds, self.db)
+            except DatabaseError as e:
+                print(f"⚠️ Could not renew task leases: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def _stage_ideas(tx, ideas):
+    """
+    Load ideas into the temp table import_ideas (COPY on PostgreSQL), with
+    `n`, their position in the input, so inserts can keep that order.
+    """
+    if tx.db.dialect == 'sqlite':
+        tx.execute("CREATE TEMP TABLE IF NOT EXISTS import_ideas (n INTEGER NOT NULL, idea TEXT NOT NULL)")
+        tx.execute("DELETE FROM import_ideas")
+        tx.executemany("INSERT INTO import_ideas (n, idea) VALUES (%s, %s)", list(enumerate(ideas)))
+        return
+
+    tx.execute("CREATE TEMP TABLE import_ideas (n BIGINT NOT NULL, idea TEXT NOT NULL) ON COMMIT DROP")
+    cursor = tx.cursor
+    tx.db.count_round_trip()
+    try:
+        if hasattr(cursor, 'copy'):
+            # psycopg 3
+            with cursor.copy("COPY import_ideas (n, idea) FROM STDIN") as copy:
+                for row in enumerate(ideas):
+                    copy.write_row(row)
+        else:
+            # psycopg2
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(enumerate(ideas))
+            buffer.seek(0)
+            cursor.copy_expert("COPY import_ideas (n, idea) FROM STDIN WITH (FORMAT csv)", buffer)
+    except tx.db.driver_errors as e:
+        raise DatabaseError(str(e)) from e
+
+
+def import_ideas(ideas, db=None):
+    """
+    Insert the ideas that are not in the table yet, in one transaction:
+    stage them in a temp table, then a single INSERT ... SELECT ... WHERE
+    NOT EXISTS. New ids follow the order of `ideas` (first occurrence).
+    Returns (imported, skipped); duplicates within `ideas` count as
+    skipped. Needs the index from create_schema() / `travel_db.py migrate`.
+    """
+    db = db or get_db()
+    ideas = list(ideas)
+    if not ideas:
+        return 0, 0
+
+    with db.transaction() as tx:
+        _stage_ideas(tx, ideas)
+        if db.dialect == 'sqlite':
+            imported = tx.execute(f"""
+                INSERT INTO {TASKS_TABLE} (idea)
+                SELECT s.idea
+                FROM import_ideas s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {TASKS_TABLE} t WHERE t.idea = s.idea
+                )
+                GROUP BY s.idea
+                ORDER BY MIN(s.n)""")
+            tx.execute("DROP TABLE import_ideas")
+        else:
+            # md5() matches the index; the text comparison settles collisions
+            imported = tx.execute(f"""
+                INSERT INTO {TASKS_TABLE} (idea)
+                SELECT first.idea
+                FROM (
+                    SELECT DISTINCT ON (s.idea) s.idea, s.n
+                    FROM import_ideas s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM {TASKS_TABLE} t
+                        WHERE md5(t.idea) = md5(s.idea) AND t.idea = s.idea
+                    )
+                    ORDER BY s.idea, s.n
+                ) AS first
+                ORDER BY first.n""")
+    return imported, len(ideas) - imported
+
+
+def install_task_trigger(db=None):
+    """
+    Create the statement-level insert trigger that sends NOTIFY on
+    TASKS_CHANNEL (PostgreSQL only; SQLite has no NOTIFY). One bulk import
+    is one notification.
+    """
+    db = db or get_db()
+    if db.dialect != 'postgres':
+        raise DatabaseError("LISTEN/NOTIFY needs PostgreSQL")
+    with db.transaction() as tx:
+        tx.execute(f"""
+            CREATE OR REPLACE FUNCTION travel.notify_new_tasks() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{TASKS_CHANNEL}', '');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql""")
+        tx.execute(f"DROP TRIGGER IF EXISTS notify_new_tasks ON {TASKS_TABLE}")
+        tx.execute(f"""
+            CREATE TRIGGER notify_new_tasks
+            AFTER INSERT ON {TASKS_TABLE}
+            FOR EACH STATEMENT EXECUTE FUNCTION travel.notify_new_tasks()""")
+
+
+class TaskListener:
+    """
+    A dedicated (unpooled) autocommit connection LISTENing on a channel.
+    While waiting it only blocks on the socket; no queries are sent.
+    """
+
+    def __init__(self, db=None, channel=TASKS_CHANNEL):
+        db = db or get_db()
+        if db.dialect != 'postgres':
+            raise DatabaseError("LISTEN/NOTIFY needs PostgreSQL")
+        self.driver = db.driver
+        self.driver_errors = db.driver_errors
+        self._handled = None    # notifications collected by a handler (psycopg < 3.2)
+        try:
+            self.conn = self.driver.connect(db.url)
+            self.conn.autocommit = True
+            self.conn.cursor().execute(f"LISTEN {channel}")
+        except self.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+
+    def _pending(self, readable=False):
+        """
+        True if notifications arrived; consumes all of them. `readable`: the
+        socket has data waiting.
+        """
+        if hasattr(self.conn, 'poll'):
+            # psycopg2 collects notifications into conn.notifies on poll()
+            self.conn.poll()
+            received = bool(self.conn.notifies)
+            self.conn.notifies.clear()
+            return received
+        if self._handled is None:
+            try:
+                # psycopg 3.2+: drain what has already arrived without blocking
+                return sum(1 for _ in self.conn.notifies(timeout=0)) > 0
+            except TypeError:
+                # psycopg 3.0/3.1: notifies() cannot time out. Collect them
+                # with a handler instead, which runs as statements read input
+                self._handled = []
+                self.conn.add_notify_handler(self._handled.append)
+        if readable:
+            self.conn.execute("SELECT 1")
+        received = bool(self._handled)
+        self._handled.clear()
+        return received
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; True if a notification arrived."""
+        try:
+            if self._pending():
+                return True
+            readable, _, _ = select.select([self.conn.fileno()], [], [], timeout)
+            return bool(readable) and self._pending(readable=True)
+        except (OSError, ValueError) + self.driver_errors as e:
+            raise DatabaseError(str(e)) from e
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class SqliteChangeWatcher:
+    """
+    Stand-in for TaskListener on SQLite: watches the database and WAL files
+    with os.stat, so waiting does no database work either. Any write wakes
+    it, including the checker's own completions (one extra empty cycle).
+    """
+
+    def __init__(self, db=None, interval=1.0):
+        db = db or get_db()
+        self.paths = [db.path, db.path + '-wal']
+        self.interval = interval
+        self.signature = self._signature()
+
+    def _signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return signature
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = self._signature()
+            if signature != self.signature:
+                self.signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def task_listener(db=None):
+    """TaskListener on PostgreSQL, SqliteChangeWatcher on the SQLite stand-in."""
+    db = db or get_db()
+    if db.dialect == 'postgres':
+        return TaskListener(db)
+    return SqliteChangeWatcher(db)
+
+
+def format_task_status(status):
+    return (f"Total: {status.total} | Completed: {status.completed} | "
+            f"Pending: {status.pending}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['migrate']:
+        print("Usage: travel_db.py migrate")
+        sys.exit(1)
+    get_db().create_schema()
+    print(f"✅ {TASKS_TABLE} is up to date")
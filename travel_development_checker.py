@@ -2,278 +2,368 @@
 """
 Travel Development Ideas Checker
 Checks the travel_development_ideas table every half hour for pending tasks,
-completes them, and checks in changes to GitHub.
+completes them, and checks in changes to GitHub. With --watch it stays
+resident instead and wakes up when new tasks are inserted. Only one run
+at a time per data directory; an interrupted run is resumed from its
+journal (see run_journal.py).
 """
 
+import argparse
 import os
+import signal
 import sys
 import subprocess
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 
-def run_command(cmd, cwd=None):
-    """Run a shell command and return output."""
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, cwd=cwd)
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return 1, "", str(e)
+import travel_db
+from run_journal import LockHeld, RunJournal, RunLock
+from run_report import RunReport, format_summary
+from image_optimizer import (MEMORY_BUDGET_MB, OptimizationManifest, image_decode_cost,
+                             optimize_image)
+from task_dispatcher import TaskDispatcher, TaskRegistry, TaskType
+from travel_db import DatabaseError
 
-def check_database_for_tasks():
-    """Check database for pending development tasks."""
-    print("🔍 Checking travel_development_ideas table for pending tasks...")
-    
-    # Query database for pending tasks
-    cmd = """
-    psql -d travel_website -U fudongli -h localhost -c "
-    SELECT id, idea, created_at 
-    FROM travel.travel_development_ideas 
-    WHERE is_fixed = false 
-    ORDER BY id;" -t -A -F '|'
-    """
-    
-    returncode, stdout, stderr = run_command(cmd)
+# Tasks are claimed in batches under a lease, so overlapping runs and
+# checkers on other hosts never work on the same task
+CLAIM_BATCH_SIZE = int(os.environ.get('CHECKER_CLAIM_BATCH', '200'))
+LEASE_SECONDS = int(os.environ.get('CHECKER_LEASE_SECONDS', str(travel_db.DEFAULT_LEASE_SECONDS)))
+WORKER_ID = os.environ.get('CHECKER_WORKER_ID') or travel_db.default_worker_id()
+
+def check_database_for_tasks(limit=CLAIM_BATCH_SIZE):
+    """Claim a batch of pending development tasks for this worker."""
+    print("🔍 Claiming pending tasks from travel_development_ideas...")
     
-    if returncode != 0:
-        print(f"❌ Error querying database: {stderr}")
+    # Lease tasks no other worker holds
+    try:
+        rows = travel_db.claim_tasks(WORKER_ID, limit, LEASE_SECONDS)
+    except DatabaseError as e:
+        print(f"❌ Error querying database: {e}")
         return []
     
-    tasks = []
-    for line in stdout.strip().split('\n'):
-        if line:
-            parts = line.split('|')
-            if len(parts) >= 3:
-                tasks.append({
-                    'id': parts[0].strip(),
-                    'idea': parts[1].strip(),
-                    'created_at': parts[2].strip()
-                })
-    
-    return tasks
-
-def complete_image_optimization_tasks(tasks):
-    """Complete image optimization tasks."""
+    return [{'id': row.id, 'idea': row.idea, 'created_at': row.created_at}
+            for row in rows]
+
+COMPLETION_BATCH_SIZE = int(os.environ.get('CHECKER_BATCH_SIZE', '500'))
+
+# Image work runs in process pools. Each job has a decode memory budget;
+# images whose full decode would not fit go to a small "oversized" pool with
+# a bigger budget so only a few huge decodes ever run at once. Every worker
+# also gets an address-space limit (MB, 0 = unlimited).
+IMAGE_WORKERS = int(os.environ.get('CHECKER_IMAGE_WORKERS', str(os.cpu_count() or 1)))
+WORKER_MEMORY_LIMIT_MB = int(os.environ.get('CHECKER_WORKER_MEMORY_MB', '2048'))
+LARGE_IMAGE_WORKERS = int(os.environ.get('CHECKER_LARGE_DECODES', '1'))
+LARGE_WORKER_MEMORY_LIMIT_MB = int(os.environ.get('CHECKER_LARGE_WORKER_MEMORY_MB', '4096'))
+LARGE_JOB_BUDGET_MB = int(os.environ.get('CHECKER_LARGE_BUDGET_MB', '1536'))
+# Shared thread pool for io-kind task types (file checks, DB-only tasks)
+IO_WORKERS = int(os.environ.get('CHECKER_IO_WORKERS', '8'))
+
+_image_manifest = None
+_job_budget_mb = MEMORY_BUDGET_MB
+
+def _init_image_worker(memory_limit_mb, job_budget_mb, manifest_path):
+    """
+    Process pool initializer: apply the memory limit, remember the job
+    budget and keep a read-only copy of the optimization manifest.
+    """
+    global _image_manifest, _job_budget_mb
+    _job_budget_mb = job_budget_mb
+    _image_manifest = OptimizationManifest.load(manifest_path)
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"   ⚠️  Could not limit worker memory: {e}")
+
+def _optimize_in_worker(params):
+    return optimize_image(params['image_path'], manifest=_image_manifest,
+                          memory_budget_mb=_job_budget_mb)
+
+def parse_image_task(idea):
+    """Return the image path of an "Optimize image X for city Y" task, else None."""
+    if 'Optimize image' not in idea or 'for city' not in idea:
+        return None
+    image_path = idea.replace('Optimize image ', '').split(' for city ')[0].strip()
+    # Fix path if it starts with ../
+    if image_path.startswith('../'):
+        image_path = image_path[3:]
+    return image_path
+
+def _match_missing_image(idea):
+    image_path = parse_image_task(idea)
+    if image_path is not None and not os.path.exists(image_path):
+        return {'image_path': image_path}
+    return None
+
+def _match_image(idea, oversized):
+    image_path = parse_image_task(idea)
+    if image_path is None or not os.path.exists(image_path):
+        return None
+    # Route by decode cost, read from the image header
+    if (image_decode_cost(image_path) > MEMORY_BUDGET_MB * 1024 * 1024) != oversized:
+        return None
+    return {'image_path': image_path}
+
+def _report_missing_image(params):
+    return {'success': True, 'message': f"Image file not found: {params['image_path']}",
+            'note': "image file not found"}
+
+def _auto_complete(params):
+    # We don't have automation for non-image tasks yet
+    return {'success': True, 'message': "Non-image task auto-completed",
+            'note': "auto-completed by checker"}
+
+def build_task_registry(manifest_path, workers=IMAGE_WORKERS):
+    """The checker's task types, most specific first."""
+    registry = TaskRegistry()
+    registry.register(TaskType('missing_image', 'io', _match_missing_image, _report_missing_image,
+                               max_concurrency=IO_WORKERS))
+    # Images whose full decode would not fit the job budget get their own
+    # small pool with a bigger budget, so only a few huge decodes run at once
+    registry.register(TaskType('optimize_large_image', 'cpu',
+                               lambda idea: _match_image(idea, oversized=True), _optimize_in_worker,
+                               max_concurrency=LARGE_IMAGE_WORKERS,
+                               initializer=_init_image_worker,
+                               initargs=(LARGE_WORKER_MEMORY_LIMIT_MB, LARGE_JOB_BUDGET_MB,
+                                         manifest_path)))
+    registry.register(TaskType('optimize_image', 'cpu',
+                               lambda idea: _match_image(idea, oversized=False), _optimize_in_worker,
+                               max_concurrency=workers,
+                               initializer=_init_image_worker,
+                               initargs=(WORKER_MEMORY_LIMIT_MB, MEMORY_BUDGET_MB, manifest_path)))
+    registry.register(TaskType('auto_complete', 'io', lambda idea: {}, _auto_complete,
+                               max_concurrency=IO_WORKERS))
+    return registry
+
+def complete_image_optimization_tasks(tasks, batch_size=COMPLETION_BATCH_SIZE,
+                                     workers=IMAGE_WORKERS, touched=None, journal=None,
+                                     report=None):
+    """
+    Complete tasks through the task dispatcher (images, missing files, the
+    rest). Files the handlers changed are added to the `touched` set.
+    With a `journal`, each task's start and finish are checkpointed, tasks
+    an interrupted run already finished are recorded without redoing them,
+    and tasks that started in too many interrupted runs are flagged for
+    review instead of run again; they stay pending.
+    Every outcome and the DB time are added to `report`.
+    """
     completed_tasks = []
-    
-    for task in tasks:
-        task_id = task['id']
-        idea = task['idea']
-        
-        print(f"\n🔹 Task {task_id}: {idea}")
-        
-        # Check if it's an image optimization task
-        if 'Optimize image' in idea and 'for city' in idea:
-            # Extract image path
-            image_path = idea.replace('Optimize image ', '').split(' for city ')[0].strip()
-            
-            # Fix path if it starts with ../
-            if image_path.startswith('../'):
-                image_path = image_path[3:]
-            
-            # Check if file exists
-            if os.path.exists(image_path):
-                print(f"   📁 Found image: {image_path}")
-                
-                # Optimize the image
-                optimize_result = optimize_image(image_path)
-                
-                if optimize_result['success']:
-                    # Mark task as completed in database
-                    if mark_task_completed(task_id):
-                        print(f"   ✅ Task completed: {optimize_result['message']}")
-                        completed_tasks.append({
-                            'id': task_id,
-                            'idea': idea,
-                            'result': optimize_result
-                        })
-                    else:
-                        print(f"   ⚠️  Image optimized but database update failed")
-                else:
-                    print(f"   ❌ Image optimization failed")
-            else:
-                print(f"   ❌ Image file not found: {image_path}")
-                # Mark as completed with note
-                if mark_task_completed_with_note(task_id, "image file not found"):
-                    print(f"   ✅ Marked as completed (file not found)")
-                    completed_tasks.append({
-                        'id': task_id,
-                        'idea': idea,
-                        'result': {'message': 'File not found'}
-                    })
+    report = report or RunReport()
+    
+    # Completions are written in batches; a task only counts as completed
+    # once its batch has been flushed to the database
+    batch = travel_db.CompletionBatch(WORKER_ID, batch_size=batch_size)
+    unflushed = []
+    
+    def flush():
+        try:
+            with report.timer('db'):
+                _, skipped = batch.flush()
+            if skipped:
+                # Our lease ran out and another worker re-claimed these; its result wins
+                print(f"   ⚠️  {len(skipped)} task(s) not recorded, lease lost: "
+                      f"{', '.join(str(task_id) for task_id in sorted(skipped))}")
+            completed_tasks.extend(task for task in unflushed if task['id'] not in skipped)
+        except DatabaseError as e:
+            print(f"   ⚠️  Database update failed for {len(unflushed)} task(s): {e}")
+            batch.discard()
+        unflushed.clear()
+    
+    def record(task_id, idea, result, note=None):
+        unflushed.append({'id': task_id, 'idea': idea, 'result': result})
+        if batch.add(task_id, note):
+            flush()
+    
+    # Image workers only read the manifest; this process merges their records
+    manifest = OptimizationManifest.load()
+    
+    def on_result(task, task_type, result):
+        # Runs here in the main process as each task finishes
+        print(f"\n🔹 Task {task['id']}: {task['idea']}")
+        if task_type is not None:
+            print(f"   🏷️  {task_type.name}")
+        report.add_task(task, task_type.name if task_type is not None else None, result)
+        if result['success']:
+            print(f"   ✅ Task completed: {result['message']}")
+            if journal is not None:
+                journal.task_done(task['id'], result)
+            manifest.update(result)
+            if touched is not None:
+                touched.update(result.get('touched', ()))
+                if journal is not None and task['id'] in journal.attempts:
+                    # The interrupted run may have rewritten the file without journaling it
+                    image_path = parse_image_task(task['idea'])
+                    if image_path is not None:
+                        touched.add(os.path.abspath(image_path))
+            record(task['id'], task['idea'], result, result.get('note'))
         else:
-            print(f"   ℹ️  Non-image task")
-            # For now, mark as completed since we don't have automation for non-image tasks
-            if mark_task_completed_with_note(task_id, "auto-completed by checker"):
-                print(f"   ✅ Marked as completed (non-image task)")
-                completed_tasks.append({
-                    'id': task_id,
-                    'idea': idea,
-                    'result': {'message': 'Non-image task auto-completed'}
-                })
+            # MemoryError under the worker limit has an empty message
+            error = result.get('error') or 'out of memory or unknown error'
+            print(f"   ❌ Task failed: {error}")
+    
+    if journal is not None:
+        journal.claimed(task['id'] for task in tasks)
+        pending = []
+        for task in tasks:
+            if task['id'] in journal.done:
+                # Finished before the interruption; only the DB update was lost
+                result = dict(journal.done[task['id']], success=True)
+                print(f"\n♻️  Task {task['id']}: finished by the interrupted run")
+                report.add_task(task, 'resumed', result)
+                manifest.update(result)
+                if touched is not None:
+                    touched.update(result.get('touched', ()))
+                record(task['id'], task['idea'], result, result.get('note'))
+            elif journal.gave_up(task['id']):
+                attempts = journal.attempts[task['id']]
+                print(f"\n⏭️  Task {task['id']}: started in {attempts} interrupted runs, "
+                      f"flagging it for review")
+                report.add_task(task, 'gave_up', {'success': False,
+                                                  'error': f"flagged after {attempts} interrupted runs"})
+                if batch.flag(task['id'], f"needs review: interrupted {attempts} runs"):
+                    flush()
+            else:
+                pending.append(task)
+        tasks = pending
     
+    dispatcher = TaskDispatcher(build_task_registry(manifest.path, workers), io_workers=IO_WORKERS)
+    on_start = None
+    if journal is not None:
+        on_start = lambda task, task_type: journal.started(task['id'])
+    dispatcher.run(tasks, on_result, on_start)
+    manifest.save()
+    
+    flush()
     return completed_tasks
 
-def optimize_image(image_path, quality=85):
-    """Optimize a single image using PIL/Pillow."""
-    try:
-        from PIL import Image
-    except ImportError:
-        return {'success': False, 'error': 'PIL/Pillow not available'}
-    
-    if not os.path.exists(image_path):
-        return {'success': False, 'error': 'File not found'}
-    
-    original_size = os.path.getsize(image_path)
-    
+# The website repository the checker's tasks change
+TRAVEL_WEBSITE_PATH = os.environ.get('TRAVEL_WEBSITE_PATH', "/Users/fudongli/clawd/travel-website")
+
+# Cap on path bytes per `git status` call (status has no --pathspec-from-file)
+GIT_STATUS_CHUNK_BYTES = 32 * 1024
+
+def run_git(args, cwd, paths=None):
+    """
+    Run git with an argument list (no shell). `paths` are passed as a
+    NUL-separated --pathspec-from-file on stdin, so spaces, quotes and huge
+    change sets are all safe. Pathspecs are literal (GIT_LITERAL_PATHSPECS),
+    so a file named with `*`, `?`, `[` or a leading `:` only matches itself.
+    The untracked cache is enabled for speed; a configured fsmonitor is used
+    as usual.
+    """
+    command = ['git', '-c', 'core.untrackedCache=true', *args]
+    env = dict(os.environ, GIT_LITERAL_PATHSPECS='1')
+    stdin = None
+    if paths is not None:
+        command += ['--pathspec-from-file=-', '--pathspec-file-nul']
+        stdin = b''.join(os.fsencode(path) + b'\0' for path in paths)
     try:
-        with Image.open(image_path) as img:
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            width, height = img.size
-            
-            # Create temp path
-            temp_path = image_path + '.optimized'
-            
-            # Save with optimization
-            img.save(
-                temp_path,
-                'JPEG',
-                quality=quality,
-                optimize=True,
-                progressive=True
-            )
-            
-            optimized_size = os.path.getsize(temp_path)
-            savings = original_size - optimized_size
-            savings_percent = (savings / original_size) * 100 if original_size > 0 else 0
-            
-            # Replace if smaller
-            if optimized_size < original_size:
-                os.replace(temp_path, image_path)
-                return {
-                    'success': True,
-                    'original_size': original_size,
-                    'optimized_size': optimized_size,
-                    'savings': savings,
-                    'savings_percent': savings_percent,
-                    'dimensions': f"{width}x{height}",
-                    'message': f"Reduced by {savings_percent:.1f}%"
-                }
-            else:
-                os.remove(temp_path)
-                return {
-                    'success': True,
-                    'original_size': original_size,
-                    'optimized_size': original_size,
-                    'savings': 0,
-                    'savings_percent': 0,
-                    'dimensions': f"{width}x{height}",
-                    'message': "Already optimized"
-                }
-    except Exception as e:
-        # Clean up temp file
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
-        return {'success': False, 'error': str(e)}
-
-def mark_task_completed(task_id):
-    """Mark a task as completed in the database."""
-    cmd = f"""
-    psql -d travel_website -U fudongli -h localhost -c "
-    UPDATE travel.travel_development_ideas 
-    SET is_fixed = true, fixed_at = NOW() 
-    WHERE id = {task_id};"
+        result = subprocess.run(command, input=stdin, capture_output=True, cwd=cwd, env=env)
+    except OSError as e:
+        return 1, "", str(e)
+    return (result.returncode, result.stdout.decode('utf-8', errors='replace'),
+            result.stderr.decode('utf-8', errors='replace'))
+
+def _is_log_or_status_file(filename):
+    return (filename.endswith('.log') or
+            filename.endswith('_status.json') or
+            filename.endswith('_report.json') or
+            'SEND_TO_TELEGRAM' in filename or
+            'TELEGRAM_NOW' in filename)
+
+def changed_paths(paths, repo_path):
     """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    return returncode == 0
-
-def mark_task_completed_with_note(task_id, note):
-    """Mark a task as completed with a note."""
-    cmd = f"""
-    psql -d travel_website -U fudongli -h localhost -c "
-    UPDATE travel.travel_development_ideas 
-    SET is_fixed = true, fixed_at = NOW(), 
-        idea = idea || ' ({note})'
-    WHERE id = {task_id};"
+    `git status` restricted to `paths` (repo-relative), in argv chunks so
+    the cost follows the number of files touched, not the repo size.
+    Returns the paths that differ from HEAD, or None on error.
     """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    return returncode == 0
+    changed = []
+    chunk, chunk_bytes = [], 0
+    for path in list(paths) + [None]:
+        if path is not None:
+            chunk.append(path)
+            chunk_bytes += len(path) + 1
+        if chunk and (path is None or chunk_bytes >= GIT_STATUS_CHUNK_BYTES):
+            returncode, stdout, stderr = run_git(
+                ['status', '--porcelain=v1', '-z', '--untracked-files=all', '--', *chunk],
+                cwd=repo_path)
+            if returncode != 0:
+                print(f"❌ Error checking git status: {stderr}")
+                return None
+            entries = stdout.split('\0')
+            index = 0
+            while index < len(entries):
+                entry = entries[index]
+                index += 1
+                if len(entry) < 4:
+                    continue
+                changed.append(entry[3:])
+                if entry[0] in 'RC':
+                    index += 1  # the rename source follows
+            chunk, chunk_bytes = [], 0
+    return changed
 
-def check_in_changes_to_github():
-    """Check if there are changes to commit and push to GitHub."""
+def check_in_changes_to_github(touched=()):
+    """Commit the files this run touched, then push to GitHub."""
     print("\n🔍 Checking for changes to commit to GitHub...")
     
-    # Navigate to travel-website directory
-    travel_website_path = "/Users/fudongli/clawd/travel-website"
-    
-    # Check git status
-    returncode, stdout, stderr = run_command("git status --porcelain", cwd=travel_website_path)
-    
-    if returncode != 0:
-        print(f"❌ Error checking git status: {stderr}")
-        return False
+    travel_website_path = os.path.realpath(TRAVEL_WEBSITE_PATH)
     
-    changes = stdout.strip().split('\n')
-    changes = [c for c in changes if c]  # Remove empty lines
+    # Only files our handlers changed, relative to the website repository
+    candidates = set()
+    for path in touched:
+        relative = os.path.relpath(os.path.realpath(path), travel_website_path)
+        if relative.startswith('..') or os.path.isabs(relative):
+            print(f"   ⏭️  Skipping: {path} (outside {travel_website_path})")
+            continue
+        if _is_log_or_status_file(relative):
+            # Skip log files and temporary files
+            print(f"   ⏭️  Skipping: {relative} (log/status file)")
+            continue
+        candidates.add(relative.replace(os.sep, '/'))
     
-    if not changes:
+    if not candidates:
         print("✅ No changes to commit")
         return True
     
-    print(f"📁 Found {len(changes)} changes to commit")
-    
-    # Filter out log files and other files that shouldn't be committed
-    files_to_commit = []
-    for change in changes:
-        status = change[:2]
-        filename = change[3:]
-        
-        # Skip log files and temporary files
-        if (filename.endswith('.log') or 
-            filename.endswith('_status.json') or
-            filename.endswith('_report.json') or
-            'SEND_TO_TELEGRAM' in filename or
-            'TELEGRAM_NOW' in filename):
-            print(f"   ⏭️  Skipping: {filename} (log/status file)")
-            continue
-        
-        files_to_commit.append(filename)
-    
+    files_to_commit = changed_paths(sorted(candidates), travel_website_path)
+    if files_to_commit is None:
+        return False
     if not files_to_commit:
-        print("✅ No relevant changes to commit (only log files)")
+        print("✅ No changes to commit (touched files match HEAD)")
         return True
     
     print(f"📝 Committing {len(files_to_commit)} files:")
-    for file in files_to_commit:
+    for file in files_to_commit[:20]:
         print(f"   + {file}")
+    if len(files_to_commit) > 20:
+        print(f"   ... and {len(files_to_commit) - 20} more")
     
     # Add files
-    add_cmd = f"git add {' '.join(files_to_commit)}"
-    returncode, stdout, stderr = run_command(add_cmd, cwd=travel_website_path)
+    returncode, stdout, stderr = run_git(['add'], travel_website_path, files_to_commit)
     
     if returncode != 0:
         print(f"❌ Error adding files: {stderr}")
         return False
     
-    # Commit
+    # Commit only these paths, whatever else happens to be staged
     commit_message = f"Auto-commit: {datetime.now().strftime('%Y-%m-%d %H:%M')} - Completed development tasks"
-    commit_cmd = f'git commit -m "{commit_message}"'
-    returncode, stdout, stderr = run_command(commit_cmd, cwd=travel_website_path)
+    returncode, stdout, stderr = run_git(['commit', '-m', commit_message], travel_website_path,
+                                         files_to_commit)
     
     if returncode != 0:
-        print(f"❌ Error committing: {stderr}")
+        print(f"❌ Error committing: {stderr or stdout}")
         return False
     
     print(f"✅ Committed: {commit_message}")
     
     # Push to GitHub
     print("🚀 Pushing to GitHub...")
-    returncode, stdout, stderr = run_command("git push origin main", cwd=travel_website_path)
+    returncode, stdout, stderr = run_git(['push', 'origin', 'main'], travel_website_path)
     
     if returncode != 0:
         print(f"❌ Error pushing to GitHub: {stderr}")
@@ -287,74 +377,241 @@ def check_and_import_new_tasks():
     print("🔍 Checking for pending tasks...")
     
     # First check current pending count
-    cmd = """
-    psql -d travel_website -U fudongli -h localhost -c "
-    SELECT COUNT(*) 
-    FROM travel.travel_development_ideas 
-    WHERE is_fixed = false;" -t -A
+    try:
+        pending_count = travel_db.count_pending_tasks()
+        print(f"📊 Found {pending_count} pending task(s)")
+        return pending_count
+    except DatabaseError as e:
+        print(f"❌ Could not check pending task count: {e}")
+        return None
+
+def count_pending(report):
+    """Queue depth for the run report (None if the query fails)."""
+    try:
+        with report.timer('db'):
+            return travel_db.count_pending_tasks()
+    except DatabaseError:
+        return None
+
+# Resident mode: LISTEN for inserts, plus a slow safety poll in case a
+# notification is missed (e.g. while reconnecting)
+SAFETY_POLL_SECONDS = int(os.environ.get('CHECKER_SAFETY_POLL', '1800'))
+RECONNECT_DELAY_SECONDS = 30
+
+def drain_tasks(journal=None, report=None):
     """
+    Claim and complete batches until no claimable task is left.
+    Returns (tasks claimed, completed tasks, files touched). Leases are renewed in the
+    background meanwhile; tasks that failed are released at the end so the
+    next run (here or elsewhere) can retry them. Files an interrupted run
+    touched but did not commit are included in the touched set.
+    """
+    report = report or RunReport()
+    claimed = 0
+    completed_tasks = []
+    touched = set()
+    if journal is not None:
+        if journal.resumed:
+            print(f"🔄 Resuming an interrupted run: {len(journal.done)} finished task(s), "
+                  f"{len(journal.uncommitted)} uncommitted file(s)")
+        touched.update(journal.uncommitted)
+    with travel_db.LeaseHeartbeat(WORKER_ID, LEASE_SECONDS):
+        try:
+            while True:
+                with report.timer('db'):
+                    tasks = check_database_for_tasks()
+                if not tasks:
+                    break
+                # Failed tasks stay leased to us, so they are not claimed again here
+                print(f"📋 Claimed {len(tasks)} pending task(s)")
+                claimed += len(tasks)
+                report.claimed = claimed
+                completed_tasks.extend(complete_image_optimization_tasks(
+                    tasks, touched=touched, journal=journal, report=report))
+        finally:
+            try:
+                with report.timer('db'):
+                    travel_db.release_claims(WORKER_ID)
+            except DatabaseError as e:
+                print(f"⚠️ Could not release task claims (they expire in {LEASE_SECONDS}s): {e}")
+    if journal is not None:
+        journal.drained()
+    return claimed, completed_tasks, touched
+
+def finish_run(journal, touched, report):
+    """Commit what the run touched; the journal is only dropped once that worked."""
+    with report.timer('git'):
+        checked_in = not touched or check_in_changes_to_github(touched)
+    if not checked_in:
+        print("⚠️ Keeping the run journal so the next run commits these files")
+        journal.close()
+        return
+    journal.committed()
+    journal.finish()
+
+def save_report(report):
+    """Write the run report and print where the time went."""
+    report.pending_after = count_pending(report)
+    try:
+        path = report.save()
+    except OSError as e:
+        print(f"⚠️ Could not write the run report: {e}")
+        return
+    print(format_summary(report.finish()['summary']))
+    print(f"📁 Run report: {path}")
+
+def process_pending_tasks():
+    """One pickup cycle without the status counts: claim, complete, commit."""
+    report = RunReport(mode='watch')
+    report.pending_before = count_pending(report)
+    journal = RunJournal()
+    try:
+        claimed, completed_tasks, touched = drain_tasks(journal, report)
+    except BaseException:
+        journal.close()
+        raise
+    if completed_tasks:
+        print(f"\n📊 Completed {len(completed_tasks)} task(s)")
+    finish_run(journal, touched, report)
+    # Wake-ups that found nothing to do are not worth a report
+    if claimed or touched:
+        save_report(report)
+    return len(completed_tasks)
+
+def watch(safety_poll=SAFETY_POLL_SECONDS):
+    """
+    Stay resident: drain the backlog, then sleep on the task channel and
+    run a cycle when new tasks arrive, or every `safety_poll` seconds.
+    Idle waiting sends no queries.
+    """
+    print("=" * 60)
+    print("👀 TRAVEL DEVELOPMENT IDEAS CHECKER - WATCH MODE")
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🔁 Safety poll every {safety_poll}s")
+    print("=" * 60)
     
-    returncode, stdout, stderr = run_command(cmd)
-    
-    if returncode == 0 and stdout.strip().isdigit():
-        pending_count = int(stdout.strip())
-        print(f"📊 Found {pending_count} pending task(s)")
-    else:
-        print("❌ Could not check pending task count")
+    listener = None
+    try:
+        while True:
+            if listener is None:
+                try:
+                    listener = travel_db.task_listener()
+                except DatabaseError as e:
+                    print(f"❌ Could not listen for new tasks: {e}")
+                    time.sleep(RECONNECT_DELAY_SECONDS)
+                    continue
+                # Anything inserted while we were not listening
+                woke = True
+            
+            if woke:
+                try:
+                    process_pending_tasks()
+                except DatabaseError as e:
+                    print(f"❌ Error processing tasks: {e}")
+            
+            try:
+                notified = listener.wait(safety_poll)
+            except DatabaseError as e:
+                print(f"⚠️ Lost the task listener, reconnecting: {e}")
+                listener.close()
+                listener = None
+                time.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+            if notified:
+                print(f"\n🔔 Task table changed at {datetime.now().strftime('%H:%M:%S')}")
+            else:
+                print(f"\n🔁 Safety poll at {datetime.now().strftime('%H:%M:%S')}")
+            woke = True
+    except KeyboardInterrupt:
+        print("\n👋 Stopping watch mode")
+    finally:
+        if listener is not None:
+            listener.close()
+
+def _exit_on_sigterm(signum, frame):
+    # Unwind normally so claims and the lock are released
+    sys.exit(128 + signum)
 
 def main():
+    parser = argparse.ArgumentParser(description='Complete pending travel development tasks')
+    parser.add_argument('--watch', action='store_true',
+                        help='stay resident and pick up new tasks as they are inserted')
+    parser.add_argument('--safety-poll', type=int, default=SAFETY_POLL_SECONDS, metavar='SECONDS',
+                        help='in watch mode, also check this often without a notification')
+    parser.add_argument('--install-trigger', action='store_true',
+                        help='create the PostgreSQL insert trigger that --watch listens to')
+    args = parser.parse_args()
+    
+    if args.install_trigger:
+        try:
+            travel_db.install_task_trigger()
+            print(f"✅ Insert trigger installed; notifying channel {travel_db.TASKS_CHANNEL}")
+        except DatabaseError as e:
+            print(f"❌ Could not install trigger: {e}")
+            return
+    if args.install_trigger and not args.watch:
+        return
+    
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        with RunLock():
+            if args.watch:
+                watch(args.safety_poll)
+            else:
+                run_once()
+    except LockHeld as e:
+        print(f"⏭️ Another checker run is active ({e}); exiting")
+
+def run_once():
+    """A single scheduled run: claim, complete and commit the backlog, then report."""
     print("=" * 60)
     print("🚀 TRAVEL DEVELOPMENT IDEAS CHECKER")
     print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    # Check for pending tasks (import script is NOT run automatically)
-    check_and_import_new_tasks()
+    report = RunReport()
     
-    # Check for pending tasks
-    pending_tasks = check_database_for_tasks()
+    # Check for pending tasks (import script is NOT run automatically)
+    with report.timer('db'):
+        report.pending_before = check_and_import_new_tasks()
     
-    if not pending_tasks:
+    # Claim and complete pending tasks, batch by batch
+    journal = RunJournal()
+    try:
+        claimed, completed_tasks, touched = drain_tasks(journal, report)
+    except BaseException:
+        # Killed or failed mid-run: the journal lets the next run resume
+        journal.close()
+        raise
+    
+    if not claimed and not touched:
+        journal.finish()
         print("✅ No pending tasks found in travel_development_ideas table")
-        
-        # Still check for any changes to commit
-        check_in_changes_to_github()
+        save_report(report)
         return
     
-    print(f"📋 Found {len(pending_tasks)} pending task(s)")
-    
-    # Complete tasks
-    completed_tasks = complete_image_optimization_tasks(pending_tasks)
-    
-    if completed_tasks:
+    if completed_tasks or touched:
         print(f"\n📊 Completed {len(completed_tasks)} task(s)")
-        
-        # Check in changes to GitHub
-        check_in_changes_to_github()
     else:
         print("\n⚠️ No tasks were completed")
+    # Commit exactly the files this run changed, once
+    finish_run(journal, touched, report)
     
     # Print summary
     print("\n" + "=" * 60)
     print("📈 SUMMARY")
-    print(f"Pending tasks checked: {len(pending_tasks)}")
+    print(f"Pending tasks checked: {claimed}")
     print(f"Tasks completed: {len(completed_tasks)}")
     
     # Check database status
     print("\n📊 DATABASE STATUS:")
-    cmd = """
-    psql -d travel_website -U fudongli -h localhost -c "
-    SELECT 
-        COUNT(*) as total,
-        COUNT(CASE WHEN is_fixed THEN 1 END) as completed,
-        COUNT(CASE WHEN NOT is_fixed THEN 1 END) as pending
-    FROM travel.travel_development_ideas;"
-    """
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if returncode == 0:
-        print(stdout.strip())
+    try:
+        print(travel_db.format_task_status(travel_db.get_task_status()))
+    except DatabaseError as e:
+        print(f"❌ Could not read database status: {e}")
     
+    print()
+    save_report(report)
     print("=" * 60)
 
 if __name__ == "__main__":